@@ -0,0 +1,58 @@
+"""resume query indexes
+
+为 list_resumes / get_my_tasks / SLAService.check_overdue_resumes 的过滤与排序条件建立组合索引和部分索引
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-17 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0001'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# app.models.resume.SLA_PENDING_CONDITION 的副本：迁移固定建索引时的定义，不引用应用代码
+# （tests/test_resume_indexes.py 检查模型与最近一次定义该条件的迁移一致）
+SLA_PENDING_CONDITION = (
+    "status IN ('WAIT_IDENTIFY', 'WAIT_CONNECTION', 'WAIT_FEEDBACK') AND is_overdue = false"
+)
+
+COMPOSITE_INDEXES = [
+    ("ix_resumes_created_at_id", ["created_at", "id"]),
+    ("ix_resumes_status_created_at", ["status", "created_at"]),
+    ("ix_resumes_l2_dept_created_at", ["l2_department_id", "created_at"]),
+    ("ix_resumes_l3_dept_created_at", ["l3_department_id", "created_at"]),
+    ("ix_resumes_l2_dept_status_created_at", ["l2_department_id", "status", "created_at"]),
+    ("ix_resumes_l3_dept_status_created_at", ["l3_department_id", "status", "created_at"]),
+    ("ix_resumes_expert_status_created_at", ["expert_id", "status", "created_at"]),
+]
+
+
+def upgrade() -> None:
+    for name, columns in COMPOSITE_INDEXES:
+        op.create_index(name, "resumes", columns)
+    op.create_index(
+        "ix_resumes_l2_dept_overdue", "resumes", ["l2_department_id", "created_at"],
+        postgresql_where=sa.text("is_overdue = true"),
+        sqlite_where=sa.text("is_overdue = 1"),
+    )
+    op.create_index(
+        "ix_resumes_sla_pending", "resumes", ["sla_deadline"],
+        postgresql_where=sa.text(SLA_PENDING_CONDITION),
+        sqlite_where=sa.text(SLA_PENDING_CONDITION.replace("false", "0")),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_resumes_sla_pending", table_name="resumes")
+    op.drop_index("ix_resumes_l2_dept_overdue", table_name="resumes")
+    for name, _ in reversed(COMPOSITE_INDEXES):
+        op.drop_index(name, table_name="resumes")
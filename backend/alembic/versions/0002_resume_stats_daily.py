@@ -0,0 +1,46 @@
+"""resume stats daily rollup
+
+新增 resume_stats_daily 汇总表；升级后执行 python rebuild_stats.py 回填历史数据
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # 复用 resumes 表已创建的枚举类型
+    status_enum = postgresql.ENUM(name="resumestatus", create_type=False).with_variant(
+        sa.String(17), "sqlite"
+    )
+    source_enum = postgresql.ENUM(name="source", create_type=False).with_variant(
+        sa.String(1), "sqlite"
+    )
+    op.create_table(
+        "resume_stats_daily",
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("status", status_enum, nullable=False),
+        sa.Column("source", source_enum, nullable=False),
+        sa.Column("l2_department_id", sa.String(36), nullable=False),
+        sa.Column("l3_department_id", sa.String(36), nullable=False),
+        sa.Column("count", sa.Integer(), nullable=False),
+        sa.Column("overdue_count", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("day", "status", "source", "l2_department_id", "l3_department_id"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("resume_stats_daily")
@@ -0,0 +1,43 @@
+"""sla reminder ledger
+
+新增 sla_reminders 台账，避免即将超期提醒重复发送
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0003'
+down_revision: Union[str, None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    status_enum = postgresql.ENUM(name="resumestatus", create_type=False).with_variant(
+        sa.String(17), "sqlite"
+    )
+    op.create_table(
+        "sla_reminders",
+        sa.Column("id", sa.String(36), primary_key=True),
+        sa.Column("resume_id", sa.String(36), sa.ForeignKey("resumes.id"), nullable=False),
+        sa.Column("stage", status_enum, nullable=False),
+        sa.Column("sla_deadline", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("hours_before", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.UniqueConstraint("resume_id", "stage", "sla_deadline", "hours_before", name="uq_sla_reminders_stage"),
+    )
+    op.create_index("ix_sla_reminders_sla_deadline", "sla_reminders", ["sla_deadline"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_sla_reminders_sla_deadline", table_name="sla_reminders")
+    op.drop_table("sla_reminders")
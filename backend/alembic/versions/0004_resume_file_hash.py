@@ -0,0 +1,30 @@
+"""resume file size and hash
+
+简历记录上传文件的大小与 SHA-256（上传时流式计算）
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0004'
+down_revision: Union[str, None] = '0003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("resumes", sa.Column("file_size", sa.Integer(), nullable=True))
+    op.add_column("resumes", sa.Column("file_hash", sa.String(64), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("resumes", "file_hash")
+    op.drop_column("resumes", "file_size")
@@ -0,0 +1,37 @@
+"""content addressed resume blobs
+
+新增 resume_blobs 引用计数表与 resumes.file_hash 索引（重复简历提示）
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-17 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0005'
+down_revision: Union[str, None] = '0004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "resume_blobs",
+        sa.Column("hash", sa.String(64), primary_key=True),
+        sa.Column("path", sa.String(500), nullable=False),
+        sa.Column("size", sa.Integer(), nullable=False),
+        sa.Column("ref_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    op.create_index("ix_resumes_file_hash", "resumes", ["file_hash"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_resumes_file_hash", table_name="resumes")
+    op.drop_table("resume_blobs")
@@ -0,0 +1,49 @@
+"""resume text extraction
+
+新增 resume_texts，保存服务端提取的简历文本与解析信息
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-17 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0006'
+down_revision: Union[str, None] = '0005'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+EXTRACTION_STATUSES = ("PENDING", "PROCESSING", "DONE", "FAILED", "TIMEOUT", "UNSUPPORTED")
+
+
+def upgrade() -> None:
+    op.create_table(
+        "resume_texts",
+        sa.Column("resume_id", sa.String(36), sa.ForeignKey("resumes.id"), primary_key=True),
+        sa.Column("status", sa.Enum(*EXTRACTION_STATUSES, name="extractionstatus"), nullable=False),
+        sa.Column("content", sa.Text(), nullable=True),
+        sa.Column("parser", sa.String(50), nullable=True),
+        sa.Column("page_count", sa.Integer(), nullable=True),
+        sa.Column("char_count", sa.Integer(), nullable=True),
+        sa.Column("duration_ms", sa.Integer(), nullable=True),
+        sa.Column("error", sa.Text(), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=True),
+    )
+    op.create_index("ix_resume_texts_status", "resume_texts", ["status"])
+    # 已有简历补登记为待提取，启动时由提取队列处理
+    op.execute(
+        "INSERT INTO resume_texts (resume_id, status) SELECT id, 'PENDING' FROM resumes"
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_resume_texts_status", table_name="resume_texts")
+    op.drop_table("resume_texts")
+    sa.Enum(name="extractionstatus").drop(op.get_bind(), checkfirst=True)
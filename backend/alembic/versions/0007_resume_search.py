@@ -0,0 +1,58 @@
+"""resume full text search
+
+resume_texts 新增 search_vector（GIN 索引）；数据库提供 pg_trgm 时为姓名建 trigram 索引。
+已有简历的搜索文档通过 python rebuild_search_index.py 生成。
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-17 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0007'
+down_revision: Union[str, None] = '0006'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _is_postgres() -> bool:
+    return op.get_bind().dialect.name == "postgresql"
+
+
+def upgrade() -> None:
+    op.add_column(
+        "resume_texts",
+        sa.Column("search_vector", postgresql.TSVECTOR().with_variant(sa.Text(), "sqlite"), nullable=True),
+    )
+    if not _is_postgres():
+        return
+
+    op.create_index(
+        "ix_resume_texts_search_vector", "resume_texts", ["search_vector"], postgresql_using="gin"
+    )
+    trigram_available = op.get_bind().execute(
+        sa.text("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")
+    ).first()
+    if trigram_available:
+        op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        op.create_index(
+            "ix_resumes_candidate_name_trgm",
+            "resumes",
+            ["candidate_name"],
+            postgresql_using="gin",
+            postgresql_ops={"candidate_name": "gin_trgm_ops"},
+        )
+
+
+def downgrade() -> None:
+    if _is_postgres():
+        op.execute("DROP INDEX IF EXISTS ix_resumes_candidate_name_trgm")
+        op.drop_index("ix_resume_texts_search_vector", table_name="resume_texts")
+    op.drop_column("resume_texts", "search_vector")
@@ -0,0 +1,39 @@
+"""notification counters
+
+新增 notification_counters（每个用户的通知总数/未读数），并根据现有通知回填
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-17 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0008'
+down_revision: Union[str, None] = '0007'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "notification_counters",
+        sa.Column("user_id", sa.String(36), sa.ForeignKey("users.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("total", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("unread", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    op.execute(
+        "INSERT INTO notification_counters (user_id, total, unread) "
+        "SELECT user_id, COUNT(*), SUM(CASE WHEN is_read THEN 0 ELSE 1 END) "
+        "FROM notifications GROUP BY user_id"
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("notification_counters")
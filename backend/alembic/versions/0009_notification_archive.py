@@ -0,0 +1,59 @@
+"""notification archive
+
+新增 notifications_archive 归档表；notifications 的 user_id 单列索引
+替换为 (user_id, is_read, created_at) 复合索引
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-17 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0009'
+down_revision: Union[str, None] = '0008'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # 复用 notifications 表已有的 notificationtype 枚举类型
+    notification_type = postgresql.ENUM(
+        "INFO", "WARNING", "URGENT", "SUCCESS", name="notificationtype", create_type=False
+    )
+    op.create_table(
+        "notifications_archive",
+        sa.Column("id", sa.String(36), primary_key=True),
+        sa.Column("user_id", sa.String(36), nullable=False),
+        sa.Column("resume_id", sa.String(36), nullable=True),
+        sa.Column("title", sa.String(200), nullable=False),
+        sa.Column("message", sa.Text(), nullable=False),
+        sa.Column("type", notification_type, nullable=True),
+        sa.Column("is_read", sa.Boolean(), nullable=True),
+        sa.Column("current_handler", sa.String(100), nullable=True),
+        sa.Column("current_stage", sa.String(50), nullable=True),
+        sa.Column("overdue_time", sa.String(50), nullable=True),
+        sa.Column("link", sa.String(200), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("archived_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    op.create_index(
+        "ix_notifications_archive_user_created_at", "notifications_archive", ["user_id", "created_at"]
+    )
+    op.create_index(
+        "ix_notifications_user_read_created_at", "notifications", ["user_id", "is_read", "created_at"]
+    )
+    op.drop_index("ix_notifications_user_id", table_name="notifications")
+
+
+def downgrade() -> None:
+    op.create_index("ix_notifications_user_id", "notifications", ["user_id"])
+    op.drop_index("ix_notifications_user_read_created_at", table_name="notifications")
+    op.drop_index("ix_notifications_archive_user_created_at", table_name="notifications_archive")
+    op.drop_table("notifications_archive")
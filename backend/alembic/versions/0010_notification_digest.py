@@ -0,0 +1,36 @@
+"""notification digest
+
+notifications / notifications_archive 新增摘要列：digest_key、item_count、resume_ids
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-17 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0010'
+down_revision: Union[str, None] = '0009'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLES = ["notifications", "notifications_archive"]
+
+
+def upgrade() -> None:
+    for table in TABLES:
+        op.add_column(table, sa.Column("digest_key", sa.String(50), nullable=True))
+        op.add_column(table, sa.Column("item_count", sa.Integer(), nullable=False, server_default="1"))
+        op.add_column(table, sa.Column("resume_ids", sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    for table in TABLES:
+        op.drop_column(table, "resume_ids")
+        op.drop_column(table, "item_count")
+        op.drop_column(table, "digest_key")
@@ -0,0 +1,28 @@
+"""resume text created_at index
+
+resume_texts.created_at 建索引：搜索按时间倒序取最近的匹配作为候选，只对候选计算得分
+
+Revision ID: 0012
+Revises: 0011
+Create Date: 2026-10-17 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0012'
+down_revision: Union[str, None] = '0011'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_resume_texts_created_at", "resume_texts", ["created_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_resume_texts_created_at", table_name="resume_texts")
@@ -1,13 +1,16 @@
 """
 认证路由
 """
+from typing import Optional
+
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
 
 from app.core.database import get_db
-from app.core.security import verify_password, create_access_token
+from app.core.security import password_hasher, PasswordHasherBusy, create_access_token
 from app.models import User
 from app.api.deps import get_current_user
 
@@ -32,20 +35,43 @@ class UserResponse(BaseModel):
         from_attributes = True
 
 
+def _find_user(db: Session, username: str) -> Optional[User]:
+    return db.query(User).filter(User.username == username).first()
+
+
+def _update_password_hash(db: Session, user: User, new_hash: str) -> None:
+    user.password_hash = new_hash
+    db.commit()
+
+
 @router.post("/login", response_model=Token)
-def login(
+async def login(
     form_data: OAuth2PasswordRequestForm = Depends(),
     db: Session = Depends(get_db)
 ):
-    """用户登录"""
-    user = db.query(User).filter(User.username == form_data.username).first()
+    """用户登录
+
+    bcrypt 验证在专用哈希线程池中执行，数据库操作在通用线程池中执行，
+    登录高峰不会占满处理其他请求的线程。
+    """
+    user = await run_in_threadpool(_find_user, db, form_data.username)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="用户名或密码错误"
         )
     
-    if not verify_password(form_data.password, user.password_hash):
+    try:
+        valid, new_hash = await password_hasher.verify_and_update(
+            form_data.password, user.password_hash
+        )
+    except PasswordHasherBusy:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="登录请求过多，请稍后重试",
+            headers={"Retry-After": "1"}
+        )
+    if not valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="用户名或密码错误"
@@ -58,6 +84,11 @@ def login(
         )
     
     access_token = create_access_token({"sub": user.id, "role": user.role.value})
+    
+    # 哈希轮数与当前配置不一致时，用本次登录的明文透明地重新哈希
+    if new_hash:
+        await run_in_threadpool(_update_password_hash, db, user, new_hash)
+    
     return {"access_token": access_token, "token_type": "bearer"}
 
 
@@ -1,23 +1,28 @@
 """
 依赖注入
 """
-from fastapi import Depends, HTTPException, status
+import hmac
+
+from fastapi import Depends, HTTPException, Query, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 
-from app.core.database import get_db
+from app.core.config import settings
+from app.core.database import SessionLocal, get_db
 from app.core.security import decode_access_token
+from app.core.principal_cache import principal_cache
 from app.models import User, Role
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
+optional_oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login", auto_error=False)
 
 
 def get_current_user(
     token: str = Depends(oauth2_scheme),
     db: Session = Depends(get_db)
 ) -> User:
-    """获取当前用户"""
+    """获取当前用户（优先读取 principal 缓存，命中时不查询 users 表）"""
     payload = decode_access_token(token)
     if not payload:
         raise HTTPException(
@@ -33,7 +38,7 @@ def get_current_user(
             detail="令牌中缺少用户信息"
         )
     
-    user = db.query(User).filter(User.id == user_id).first()
+    user = principal_cache.load(db, user_id)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -48,6 +53,28 @@ def get_current_user(
     return user
 
 
+def get_stream_user(
+    header_token: Optional[str] = Depends(optional_oauth2_scheme),
+    token: Optional[str] = Query(None, description="EventSource 无法设置请求头时通过查询参数传递令牌")
+) -> User:
+    """长连接（推送）的当前用户
+
+    使用独立的短会话认证后立即关闭，不在整个连接期间占用数据库连接。
+    """
+    token = header_token or token
+    if not token:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="未提供认证令牌",
+            headers={"WWW-Authenticate": "Bearer"}
+        )
+    db = SessionLocal()
+    try:
+        return get_current_user(token, db)
+    finally:
+        db.close()
+
+
 def require_roles(*roles: Role):
     """角色权限检查"""
     def role_checker(current_user: User = Depends(get_current_user)) -> User:
@@ -63,3 +90,19 @@ def require_roles(*roles: Role):
 def require_any_role(current_user: User = Depends(get_current_user)) -> User:
     """允许任意已登录用户"""
     return current_user
+
+
+def require_metrics_access(
+    token: Optional[str] = Depends(optional_oauth2_scheme),
+    db: Session = Depends(get_db)
+) -> None:
+    """运行指标访问控制：METRICS_TOKEN 或管理员登录令牌"""
+    if token and settings.METRICS_TOKEN and hmac.compare_digest(token, settings.METRICS_TOKEN):
+        return
+    if not token:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="未提供认证令牌",
+            headers={"WWW-Authenticate": "Bearer"}
+        )
+    require_roles(Role.ADMIN)(get_current_user(token, db))
@@ -1,16 +1,23 @@
 """
 通知管理路由
 """
+import asyncio
+import json
+
 from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from pydantic import BaseModel
 from datetime import datetime
 
+from app.core.config import settings
 from app.core.database import get_db
+from app.core.pubsub import notification_hub
 from app.models import Notification, User
 from app.models.enums import NotificationType
-from app.api.deps import get_current_user
+from app.api.deps import get_current_user, get_stream_user
+from app.services.notifications import NotificationCounterService
 
 router = APIRouter()
 
@@ -26,6 +33,8 @@ class NotificationResponse(BaseModel):
     current_stage: Optional[str] = None
     overdue_time: Optional[str] = None
     link: Optional[str] = None
+    item_count: int = 1
+    resume_ids: Optional[List[str]] = None
     created_at: datetime
     
     class Config:
@@ -67,6 +76,8 @@ def list_notifications(
         current_stage=n.current_stage,
         overdue_time=n.overdue_time,
         link=n.link,
+        item_count=n.item_count,
+        resume_ids=n.resume_ids,
         created_at=n.created_at
     ) for n in notifications]
 
@@ -76,17 +87,41 @@ def get_notification_count(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """获取通知数量统计"""
-    total = db.query(Notification).filter(
-        Notification.user_id == current_user.id
-    ).count()
+    """获取通知数量统计（读取计数表）"""
+    total, unread = NotificationCounterService(db).get(current_user.id)
+    return NotificationCount(total=total, unread=unread)
+
+
+@router.get("/stream")
+async def stream_notifications(current_user: User = Depends(get_stream_user)):
+    """通知推送（Server-Sent Events）
+
+    事件：ready（连接建立）、notification（新通知，字段同通知列表）、
+    resync（可能丢失了事件，客户端应重新拉取列表与数量）。
+    连接期间轮询可降为低频兜底。
+    """
+    subscription = notification_hub.subscribe(current_user.id)
+    heartbeat = settings.NOTIFICATION_STREAM_HEARTBEAT_SECONDS
     
-    unread = db.query(Notification).filter(
-        Notification.user_id == current_user.id,
-        Notification.is_read == False
-    ).count()
+    async def events():
+        try:
+            yield "retry: 5000\nevent: ready\ndata: {}\n\n"
+            while True:
+                try:
+                    event = await asyncio.wait_for(subscription.queue.get(), timeout=heartbeat)
+                except asyncio.TimeoutError:
+                    yield ": ping\n\n"
+                    continue
+                data = json.dumps(event["data"], ensure_ascii=False, default=str)
+                yield f"event: {event['event']}\ndata: {data}\n\n"
+        finally:
+            notification_hub.unsubscribe(subscription)
     
-    return NotificationCount(total=total, unread=unread)
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 @router.put("/{notification_id}/read")
@@ -99,12 +134,14 @@ def mark_as_read(
     notification = db.query(Notification).filter(
         Notification.id == notification_id,
         Notification.user_id == current_user.id
-    ).first()
+    ).with_for_update().first()
     
     if not notification:
         raise HTTPException(status_code=404, detail="通知不存在")
     
-    notification.is_read = True
+    if not notification.is_read:
+        notification.is_read = True
+        NotificationCounterService(db).apply({current_user.id: (0, -1)})
     db.commit()
     return {"message": "已标记为已读"}
 
@@ -115,10 +152,11 @@ def mark_all_as_read(
     current_user: User = Depends(get_current_user)
 ):
     """标记所有通知为已读"""
-    db.query(Notification).filter(
+    updated = db.query(Notification).filter(
         Notification.user_id == current_user.id,
         Notification.is_read == False
-    ).update({"is_read": True})
+    ).update({"is_read": True}, synchronize_session=False)
+    NotificationCounterService(db).apply({current_user.id: (0, -updated)})
     db.commit()
     return {"message": "已全部标记为已读"}
 
@@ -133,11 +171,12 @@ def delete_notification(
     notification = db.query(Notification).filter(
         Notification.id == notification_id,
         Notification.user_id == current_user.id
-    ).first()
+    ).with_for_update().first()
     
     if not notification:
         raise HTTPException(status_code=404, detail="通知不存在")
     
     db.delete(notification)
+    NotificationCounterService(db).apply({current_user.id: (-1, 0 if notification.is_read else -1)})
     db.commit()
     return {"message": "删除成功"}
@@ -1,21 +1,37 @@
 """
 简历管理路由 - 核心业务逻辑
 """
-from fastapi import APIRouter, Depends, HTTPException, Query, UploadFile, File, Form
-from sqlalchemy.orm import Session
-from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, UploadFile, File, Form
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import and_, or_, func, literal, select, union_all
+from sqlalchemy.orm import Session, joinedload
+from typing import Callable, List, Optional, Tuple
 from pydantic import BaseModel, EmailStr
-from datetime import datetime
+from datetime import date, datetime
+import asyncio
+import base64
+import binascii
+import json
 import os
-import uuid
-import shutil
+import zipfile
+from collections import Counter
+from functools import partial
 
 from app.core.database import get_db
 from app.core.config import settings
-from app.models import Resume, User, Department, WorkflowLog
+from app.core.downloads import file_response
+from app.core.storage import (
+    StoredFile, UploadTooLarge, resolve_upload_path, save_stream, save_upload
+)
+from app.models import Resume, ResumeText, User, Department, WorkflowLog
 from app.models.enums import ResumeStatus, Source, Role, ActionType
 from app.api.deps import get_current_user, require_roles
-from app.services.workflow import WorkflowService
+from app.services.workflow import WorkflowService, WorkflowConflict
+from app.services.stats import ResumeStatsService
+from app.services.resume_import import ResumeImportService
+from app.services.blobs import BlobMissing, ResumeBlobService
+from app.services.extraction import text_extraction
+from app.services.search import ResumeSearchService
 
 router = APIRouter()
 
@@ -30,6 +46,8 @@ class ResumeResponse(BaseModel):
     source: str
     status: str
     resume_url: str
+    file_size: Optional[int] = None
+    file_hash: Optional[str] = None
     l2_department_id: Optional[str] = None
     l2_department_name: Optional[str] = None
     l3_department_id: Optional[str] = None
@@ -68,9 +86,58 @@ class WorkflowLogResponse(BaseModel):
 
 class ResumeListResponse(BaseModel):
     items: List[ResumeResponse]
-    total: int
+    total: Optional[int] = None          # 游标模式下默认不统计
+    total_is_exact: bool = True          # False 表示 total 为截断后的下限
     page: int
     page_size: int
+    next_cursor: Optional[str] = None    # 下一页游标，为空表示没有更多数据
+
+
+class ResumeSearchItem(ResumeResponse):
+    score: float
+
+
+class ResumeSearchResponse(BaseModel):
+    items: List[ResumeSearchItem]
+
+
+class ResumeTextResponse(BaseModel):
+    resume_id: str
+    status: str
+    content: Optional[str] = None
+    parser: Optional[str] = None
+    page_count: Optional[int] = None
+    char_count: Optional[int] = None
+    duration_ms: Optional[int] = None
+    error: Optional[str] = None
+    updated_at: Optional[datetime] = None
+
+
+class DuplicateResume(BaseModel):
+    id: str
+    candidate_name: str
+    source: str
+    status: str
+    created_at: datetime
+
+
+class UploadResumeResponse(ResumeResponse):
+    # 文件内容与已有简历相同时给出提示（同一候选人经多个渠道投递）
+    duplicates: List[DuplicateResume] = []
+
+
+class BulkUploadItem(BaseModel):
+    filename: str
+    success: bool
+    resume_id: Optional[str] = None
+    error: Optional[str] = None
+
+
+class BulkUploadResponse(BaseModel):
+    total: int
+    created: int
+    failed: int
+    items: List[BulkUploadItem]
 
 
 class DistributeL2Request(BaseModel):
@@ -108,8 +175,126 @@ class OverdueReasonRequest(BaseModel):
     reason: str
 
 
+class BatchDistributeL2Request(DistributeL2Request):
+    resume_ids: List[str]
+
+
+class BatchDistributeL3Request(DistributeL3Request):
+    resume_ids: List[str]
+
+
+class BatchAssignExpertRequest(AssignExpertRequest):
+    resume_ids: List[str]
+
+
+class BatchReleaseRequest(ReleaseRequest):
+    resume_ids: List[str]
+
+
+class BatchTransitionItem(BaseModel):
+    resume_id: str
+    success: bool
+    error: Optional[str] = None
+
+
+class BatchTransitionResponse(BaseModel):
+    total: int
+    succeeded: int
+    failed: int
+    items: List[BatchTransitionItem]
+
+
 # ==================== 辅助函数 ====================
 
+# ResumeResponse 需要的关联（部门名称、人员名称），统一通过 JOIN 预加载，
+# 避免 _build_resume_response 对每一行触发懒加载查询
+RESUME_RESPONSE_OPTIONS = (
+    joinedload(Resume.l2_department),
+    joinedload(Resume.l3_department),
+    joinedload(Resume.uploader),
+    joinedload(Resume.current_handler),
+    joinedload(Resume.expert),
+)
+
+
+def _resume_query(db: Session):
+    """构建带关联预加载的简历查询（所有返回 ResumeResponse 的接口共用）"""
+    return db.query(Resume).options(*RESUME_RESPONSE_OPTIONS)
+
+
+def _reload_resume(db: Session, resume_id: str) -> Resume:
+    """提交后重新加载简历及其关联（单条查询）"""
+    return _resume_query(db).populate_existing().filter(Resume.id == resume_id).one()
+
+
+def _run_batch_transition(
+    db: Session,
+    resume_ids: List[str],
+    transition: Callable[[List[Resume]], List[Tuple[str, Optional[str]]]]
+) -> BatchTransitionResponse:
+    """批量流转：一次查询加载简历，在同一事务内执行，返回每份简历的结果"""
+    resume_ids = list(dict.fromkeys(resume_ids))
+    if not resume_ids:
+        raise HTTPException(status_code=400, detail="请选择简历")
+    if len(resume_ids) > settings.WORKFLOW_BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"单次最多操作 {settings.WORKFLOW_BATCH_MAX_ITEMS} 份简历"
+        )
+    
+    # 按ID顺序加行锁；正被其他事务修改的简历不等待，直接记为冲突
+    resumes = (
+        db.query(Resume)
+        .filter(Resume.id.in_(resume_ids))
+        .order_by(Resume.id)
+        .with_for_update(skip_locked=True)
+        .all()
+    )
+    errors = {}
+    if len(resumes) < len(resume_ids):
+        skipped = set(resume_ids) - {resume.id for resume in resumes}
+        for (resume_id,) in db.query(Resume.id).filter(Resume.id.in_(skipped)):
+            errors[resume_id] = "简历正在被其他人处理，请稍后重试"
+    try:
+        errors.update(transition(resumes))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except WorkflowConflict as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    
+    items = [
+        BatchTransitionItem(
+            resume_id=resume_id,
+            success=resume_id in errors and errors[resume_id] is None,
+            error=errors.get(resume_id, "简历不存在")
+        )
+        for resume_id in resume_ids
+    ]
+    succeeded = sum(1 for item in items if item.success)
+    return BatchTransitionResponse(
+        total=len(items),
+        succeeded=succeeded,
+        failed=len(items) - succeeded,
+        items=items
+    )
+
+
+def _encode_cursor(resume: Resume) -> str:
+    """将 (created_at, id) 编码为不透明游标"""
+    raw = json.dumps([resume.created_at.isoformat(), resume.id])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    """解析游标，格式错误时抛出400"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, resume_id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(created_at), str(resume_id)
+    except (binascii.Error, ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="无效的分页游标")
+
+
 def _build_resume_response(resume: Resume) -> ResumeResponse:
     """构建简历响应对象"""
     response = ResumeResponse(
@@ -120,6 +305,8 @@ def _build_resume_response(resume: Resume) -> ResumeResponse:
         source=resume.source.value,
         status=resume.status.value,
         resume_url=resume.resume_url,
+        file_size=resume.file_size,
+        file_hash=resume.file_hash,
         l2_department_id=resume.l2_department_id,
         l3_department_id=resume.l3_department_id,
         uploader_id=resume.uploader_id,
@@ -146,6 +333,70 @@ def _build_resume_response(resume: Resume) -> ResumeResponse:
     return response
 
 
+def _visibility_condition(user: User):
+    """当前用户可查看的简历范围（None 表示全部可见）"""
+    if user.role in (Role.HR, Role.ADMIN):
+        # HR/管理员看所有
+        return None
+    if user.role == Role.L2_MANAGER:
+        # 二层经理看本部门相关
+        return Resume.l2_department_id == user.department_id
+    if user.role == Role.L3_ASSISTANT:
+        # 三层助理看本部门
+        return Resume.l3_department_id == user.department_id
+    if user.role == Role.EXPERT:
+        # 专家看分配给自己的
+        return Resume.expert_id == user.id
+    # 其他角色无权限
+    raise HTTPException(status_code=403, detail="无权限查看简历列表")
+
+
+def _task_buckets(user: User) -> List[Tuple[str, object]]:
+    """当前用户的待办分组：[(分组名称, 过滤条件)]"""
+    if user.role == Role.HR:
+        return [
+            ("待分发", Resume.status == ResumeStatus.POOL_HR),
+        ]
+    if user.role == Role.L2_MANAGER:
+        in_dept = Resume.l2_department_id == user.department_id
+        return [
+            ("待分发给三层", and_(in_dept, Resume.status == ResumeStatus.POOL_L2)),
+            ("待填联系方式", and_(in_dept, Resume.status == ResumeStatus.WAIT_CONTACT_INFO)),
+            ("超期简历", and_(in_dept, Resume.is_overdue == True)),
+        ]
+    if user.role == Role.L3_ASSISTANT:
+        in_dept = Resume.l3_department_id == user.department_id
+        return [
+            ("待指派专家", and_(in_dept, Resume.status == ResumeStatus.POOL_L3)),
+        ]
+    if user.role == Role.EXPERT:
+        mine = Resume.expert_id == user.id
+        return [
+            ("待识别", and_(mine, Resume.status == ResumeStatus.WAIT_IDENTIFY)),
+            ("待建联", and_(mine, Resume.status == ResumeStatus.WAIT_CONNECTION)),
+            ("待反馈", and_(mine, Resume.status == ResumeStatus.WAIT_FEEDBACK)),
+        ]
+    return []
+
+
+def _empty_stats_counts() -> dict:
+    """/stats 各统计项的初始计数"""
+    names = ["total", "overdue", "today_uploaded"]
+    names += [status.value for status in ResumeStatus]
+    names += [f"source:{source.value}" for source in Source]
+    return dict.fromkeys(names, 0)
+
+
+def _shape_stats(counts: dict) -> dict:
+    """按 /stats 原有返回结构组织统计结果"""
+    stats = {status.value: counts[status.value] for status in ResumeStatus}
+    stats["overdue"] = counts["overdue"]
+    stats["by_source"] = {source.value: counts[f"source:{source.value}"] for source in Source}
+    stats["today_uploaded"] = counts["today_uploaded"]
+    stats["total"] = counts["total"]
+    return stats
+
+
 # ==================== API端点 ====================
 
 @router.get("/", response_model=ResumeListResponse)
@@ -155,28 +406,24 @@ def list_resumes(
     is_overdue: Optional[bool] = Query(None),
     page: int = Query(1, ge=1),
     page_size: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="游标分页：上一页返回的 next_cursor"),
+    with_total: Optional[bool] = Query(None, description="是否统计总数（页码模式默认是，游标模式默认否）"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """获取简历列表（根据角色过滤）"""
-    query = db.query(Resume)
+    """获取简历列表（根据角色过滤）
+
+    支持两种分页方式：
+    - 页码模式（page/page_size）：兼容旧接口，返回精确 total
+    - 游标模式（cursor）：按 (created_at, id) 定位，深翻页不再随 OFFSET 线性变慢；
+      total 仅在 with_total=true 时统计，且最多数到 RESUME_COUNT_CAP
+    """
+    query = _resume_query(db)
     
     # 根据角色过滤
-    if current_user.role == Role.HR:
-        # HR看所有
-        pass
-    elif current_user.role == Role.L2_MANAGER:
-        # 二层经理看本部门相关
-        query = query.filter(Resume.l2_department_id == current_user.department_id)
-    elif current_user.role == Role.L3_ASSISTANT:
-        # 三层助理看本部门
-        query = query.filter(Resume.l3_department_id == current_user.department_id)
-    elif current_user.role == Role.EXPERT:
-        # 专家看分配给自己的
-        query = query.filter(Resume.expert_id == current_user.id)
-    elif current_user.role != Role.ADMIN:
-        # 其他角色无权限
-        raise HTTPException(status_code=403, detail="无权限查看简历列表")
+    visibility = _visibility_condition(current_user)
+    if visibility is not None:
+        query = query.filter(visibility)
     
     # 应用筛选条件
     if status:
@@ -186,154 +433,164 @@ def list_resumes(
     if is_overdue is not None:
         query = query.filter(Resume.is_overdue == is_overdue)
     
-    # 分页
-    total = query.count()
-    resumes = query.order_by(Resume.created_at.desc()).offset(
-        (page - 1) * page_size
-    ).limit(page_size).all()
+    # 统计总数
+    if with_total is None:
+        with_total = cursor is None
+    total = None
+    total_is_exact = True
+    if with_total:
+        if cursor is None:
+            total = query.count()
+        else:
+            # 游标模式下只数到上限，避免大表全量 COUNT
+            cap = settings.RESUME_COUNT_CAP
+            capped = query.enable_eagerloads(False).with_entities(Resume.id).limit(cap + 1).subquery()
+            total = db.query(func.count()).select_from(capped).scalar()
+            if total > cap:
+                total, total_is_exact = cap, False
+    
+    # 分页（多取一条用于判断是否还有下一页）
+    query = query.order_by(Resume.created_at.desc(), Resume.id.desc())
+    if cursor:
+        cursor_created_at, cursor_id = _decode_cursor(cursor)
+        query = query.filter(or_(
+            Resume.created_at < cursor_created_at,
+            and_(Resume.created_at == cursor_created_at, Resume.id < cursor_id)
+        ))
+    else:
+        query = query.offset((page - 1) * page_size)
+    resumes = query.limit(page_size + 1).all()
+    
+    next_cursor = None
+    if len(resumes) > page_size:
+        resumes = resumes[:page_size]
+        next_cursor = _encode_cursor(resumes[-1])
     
     items = [_build_resume_response(r) for r in resumes]
     
     return ResumeListResponse(
         items=items,
         total=total,
+        total_is_exact=total_is_exact,
         page=page,
-        page_size=page_size
+        page_size=page_size,
+        next_cursor=next_cursor
     )
 
 
 @router.get("/my-tasks")
 def get_my_tasks(
+    limit: int = Query(10, ge=1, le=100, description="每个分组最多返回的简历数"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """获取当前用户的待办任务"""
-    tasks = []
+    """获取当前用户的待办任务
+
+    无论待办积压多少，固定两条语句：
+    1. 一条聚合语句，用 COUNT(*) FILTER 统计各分组数量
+    2. 一条 UNION ALL 语句，每个分组按创建时间倒序最多取 limit 条
+    """
+    buckets = _task_buckets(current_user)
+    if not buckets:
+        return {"tasks": []}
     
-    if current_user.role == Role.HR:
-        # HR: 待分发的简历
-        pool_hr = db.query(Resume).filter(Resume.status == ResumeStatus.POOL_HR).all()
-        tasks.append({
-            "type": "待分发",
-            "count": len(pool_hr),
-            "items": [_build_resume_response(r) for r in pool_hr[:10]]
-        })
+    conditions = [condition for _, condition in buckets]
+    counts = db.query(
+        *[func.count().filter(condition) for condition in conditions]
+    ).select_from(Resume).filter(or_(*conditions)).one()
     
-    elif current_user.role == Role.L2_MANAGER:
-        # 二层经理: 待分发给三层 + 待填联系方式
-        pool_l2 = db.query(Resume).filter(
-            Resume.status == ResumeStatus.POOL_L2,
-            Resume.l2_department_id == current_user.department_id
-        ).all()
-        tasks.append({
-            "type": "待分发给三层",
-            "count": len(pool_l2),
-            "items": [_build_resume_response(r) for r in pool_l2[:10]]
-        })
-        
-        wait_contact = db.query(Resume).filter(
-            Resume.status == ResumeStatus.WAIT_CONTACT_INFO,
-            Resume.l2_department_id == current_user.department_id
-        ).all()
-        tasks.append({
-            "type": "待填联系方式",
-            "count": len(wait_contact),
-            "items": [_build_resume_response(r) for r in wait_contact[:10]]
-        })
-        
-        # 超期简历
-        overdue = db.query(Resume).filter(
-            Resume.l2_department_id == current_user.department_id,
-            Resume.is_overdue == True
-        ).all()
-        tasks.append({
-            "type": "超期简历",
-            "count": len(overdue),
-            "items": [_build_resume_response(r) for r in overdue[:10]]
-        })
+    # 每个分组单独 ORDER BY + LIMIT（可走索引提前结束），再 UNION ALL 成一条语句
+    branches = []
+    for index, condition in enumerate(conditions):
+        top = select(Resume.id, Resume.created_at).where(condition).order_by(
+            Resume.created_at.desc(), Resume.id.desc()
+        ).limit(limit).subquery()
+        branches.append(select(
+            top.c.id.label("resume_id"),
+            literal(index).label("bucket"),
+            top.c.created_at.label("created_at")
+        ))
+    ranked = union_all(*branches).subquery()
+    rows = _resume_query(db).join(ranked, ranked.c.resume_id == Resume.id).add_columns(
+        ranked.c.bucket
+    ).order_by(ranked.c.bucket, ranked.c.created_at.desc(), Resume.id.desc()).all()
     
-    elif current_user.role == Role.L3_ASSISTANT:
-        # 三层助理: 待指派专家
-        pool_l3 = db.query(Resume).filter(
-            Resume.status == ResumeStatus.POOL_L3,
-            Resume.l3_department_id == current_user.department_id
-        ).all()
-        tasks.append({
-            "type": "待指派专家",
-            "count": len(pool_l3),
-            "items": [_build_resume_response(r) for r in pool_l3[:10]]
-        })
+    items_by_bucket = {index: [] for index in range(len(buckets))}
+    for resume, index in rows:
+        items_by_bucket[index].append(_build_resume_response(resume))
     
-    elif current_user.role == Role.EXPERT:
-        # 专家: 待识别 + 待建联 + 待反馈
-        wait_identify = db.query(Resume).filter(
-            Resume.status == ResumeStatus.WAIT_IDENTIFY,
-            Resume.expert_id == current_user.id
-        ).all()
-        tasks.append({
-            "type": "待识别",
-            "count": len(wait_identify),
-            "items": [_build_resume_response(r) for r in wait_identify]
-        })
-        
-        wait_connection = db.query(Resume).filter(
-            Resume.status == ResumeStatus.WAIT_CONNECTION,
-            Resume.expert_id == current_user.id
-        ).all()
-        tasks.append({
-            "type": "待建联",
-            "count": len(wait_connection),
-            "items": [_build_resume_response(r) for r in wait_connection]
-        })
-        
-        wait_feedback = db.query(Resume).filter(
-            Resume.status == ResumeStatus.WAIT_FEEDBACK,
-            Resume.expert_id == current_user.id
-        ).all()
+    tasks = []
+    for index, (task_type, _) in enumerate(buckets):
         tasks.append({
-            "type": "待反馈",
-            "count": len(wait_feedback),
-            "items": [_build_resume_response(r) for r in wait_feedback]
+            "type": task_type,
+            "count": counts[index],
+            "items": items_by_bucket[index]
         })
-    
     return {"tasks": tasks}
 
 
 @router.get("/stats")
 def get_resume_stats(
+    start_date: Optional[date] = Query(None, description="上传日期起（含）"),
+    end_date: Optional[date] = Query(None, description="上传日期止（含）"),
+    by_department: bool = Query(False, description="是否返回按二层/三层部门的细分"),
     db: Session = Depends(get_db),
     current_user: User = Depends(require_roles(Role.ADMIN, Role.HR))
 ):
-    """获取简历统计数据（管理员/HR）"""
-    stats = {}
-    
-    # 按状态统计
-    for status in ResumeStatus:
-        count = db.query(Resume).filter(Resume.status == status).count()
-        stats[status.value] = count
-    
-    # 超期统计
-    overdue_count = db.query(Resume).filter(Resume.is_overdue == True).count()
-    stats["overdue"] = overdue_count
-    
-    # 按来源统计
-    source_stats = {}
-    for source in Source:
-        count = db.query(Resume).filter(Resume.source == source).count()
-        source_stats[source.value] = count
-    stats["by_source"] = source_stats
-    
-    # 今日上传
-    from datetime import date
-    today = date.today()
-    today_count = db.query(Resume).filter(
-        Resume.created_at >= datetime.combine(today, datetime.min.time())
-    ).count()
-    stats["today_uploaded"] = today_count
+    """获取简历统计数据（管理员/HR）
+
+    读取 resume_stats_daily 汇总表（由工作流操作在同一事务内增量维护），
+    查询代价只与统计桶数量相关，不扫描 resumes 表。
+    """
+    rows = ResumeStatsService(db).bucket_rows(start_date, end_date)
+    
+    totals = _empty_stats_counts()
+    by_l2, by_l3 = {}, {}
+    for l2_id, l3_id, status, source, count, overdue, today_count in rows:
+        targets = [totals]
+        if by_department:
+            if l2_id:
+                targets.append(by_l2.setdefault(l2_id, _empty_stats_counts()))
+            if l3_id:
+                targets.append(by_l3.setdefault(l3_id, _empty_stats_counts()))
+        for counts in targets:
+            counts["total"] += count
+            counts[status.value] += count
+            counts[f"source:{source.value}"] += count
+            counts["overdue"] += overdue
+            counts["today_uploaded"] += today_count
+    
+    stats = _shape_stats(totals)
+    if by_department:
+        stats["by_l2_department"] = {dept_id: _shape_stats(c) for dept_id, c in by_l2.items()}
+        stats["by_l3_department"] = {dept_id: _shape_stats(c) for dept_id, c in by_l3.items()}
     
     return stats
 
 
+@router.get("/search", response_model=ResumeSearchResponse)
+def search_resumes(
+    q: str = Query(..., min_length=1, max_length=100, description="姓名、邮箱、电话或简历内容关键词"),
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """全文搜索简历（按相关度排序，可见范围与简历列表一致）"""
+    hits = ResumeSearchService(db).search(q, _visibility_condition(current_user), limit)
+    if not hits:
+        return ResumeSearchResponse(items=[])
+    
+    resumes = {
+        r.id: r for r in _resume_query(db).filter(Resume.id.in_([resume_id for resume_id, _ in hits]))
+    }
+    items = [
+        ResumeSearchItem(**_build_resume_response(resumes[resume_id]).model_dump(), score=score)
+        for resume_id, score in hits
+        if resume_id in resumes
+    ]
+    return ResumeSearchResponse(items=items)
+
+
 @router.get("/{resume_id}", response_model=ResumeResponse)
 def get_resume(
     resume_id: str,
@@ -341,13 +598,70 @@ def get_resume(
     current_user: User = Depends(get_current_user)
 ):
     """获取简历详情"""
-    resume = db.query(Resume).filter(Resume.id == resume_id).first()
+    resume = _resume_query(db).filter(Resume.id == resume_id).first()
     if not resume:
         raise HTTPException(status_code=404, detail="简历不存在")
     
     return _build_resume_response(resume)
 
 
+@router.get("/{resume_id}/file")
+def download_resume_file(
+    resume_id: str,
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """下载/预览简历文件（支持 Range、ETag 与长期缓存；仅限可查看该简历的用户）"""
+    query = db.query(Resume.resume_url, Resume.file_hash, Resume.candidate_name).filter(
+        Resume.id == resume_id
+    )
+    visibility = _visibility_condition(current_user)
+    if visibility is not None:
+        query = query.filter(visibility)
+    row = query.first()
+    if not row:
+        raise HTTPException(status_code=404, detail="简历不存在")
+    
+    path = resolve_upload_path(row.resume_url)
+    if not path:
+        raise HTTPException(status_code=404, detail="简历文件不存在")
+    
+    name = os.path.relpath(path, os.path.realpath(settings.UPLOAD_DIR))
+    download_name = row.candidate_name + os.path.splitext(path)[1]
+    return file_response(request, path, name, download_name, row.file_hash)
+
+
+@router.get("/{resume_id}/text", response_model=ResumeTextResponse)
+def get_resume_text(
+    resume_id: str,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """获取服务端提取的简历文本（仅限可查看该简历的用户）"""
+    query = db.query(ResumeText).join(Resume, Resume.id == ResumeText.resume_id).filter(
+        ResumeText.resume_id == resume_id
+    )
+    visibility = _visibility_condition(current_user)
+    if visibility is not None:
+        query = query.filter(visibility)
+    text = query.first()
+    if not text:
+        raise HTTPException(status_code=404, detail="简历文本不存在")
+    
+    return ResumeTextResponse(
+        resume_id=text.resume_id,
+        status=text.status.value,
+        content=text.content,
+        parser=text.parser,
+        page_count=text.page_count,
+        char_count=text.char_count,
+        duration_ms=text.duration_ms,
+        error=text.error,
+        updated_at=text.updated_at or text.created_at
+    )
+
+
 @router.get("/{resume_id}/logs", response_model=List[WorkflowLogResponse])
 def get_resume_logs(
     resume_id: str,
@@ -383,7 +697,7 @@ def get_resume_logs(
     return result
 
 
-@router.post("/upload", response_model=ResumeResponse)
+@router.post("/upload", response_model=UploadResumeResponse)
 async def upload_resume(
     candidate_name: str = Form(...),
     source: Source = Form(...),
@@ -400,23 +714,69 @@ async def upload_resume(
             detail=f"不支持的文件类型。允许: {settings.ALLOWED_EXTENSIONS}"
         )
     
-    # 保存文件
-    file_id = str(uuid.uuid4())
-    file_name = f"{file_id}{file_ext}"
-    file_path = os.path.join(settings.UPLOAD_DIR, file_name)
+    # 流式保存文件（边写边校验大小、计算哈希）
+    try:
+        stored = await save_upload(file, file_ext)
+    except UploadTooLarge:
+        raise HTTPException(
+            status_code=413,
+            detail=f"文件过大，最大允许 {settings.MAX_UPLOAD_SIZE // (1024 * 1024)}MB"
+        )
+    
+    # 数据库操作在线程池中执行，不阻塞事件循环
+    try:
+        response = await run_in_threadpool(
+            _create_uploaded_resume, db, current_user, candidate_name, source, stored
+        )
+    except BlobMissing:
+        await run_in_threadpool(_discard_files, db, [stored])
+        raise HTTPException(status_code=409, detail="相同内容的文件正在被清理，请重新上传")
+    except BaseException:
+        await run_in_threadpool(_discard_files, db, [stored])
+        raise
     
-    with open(file_path, "wb") as buffer:
-        shutil.copyfileobj(file.file, buffer)
+    # 提交后再投递文本提取
+    text_extraction.submit([response.id])
+    return response
+
+
+def _discard_files(db: Session, files: List[StoredFile]) -> None:
+    """写入失败后撤销本次保存的文件（回滚后加锁确认没有简历引用才删除）"""
+    db.rollback()
+    ResumeBlobService(db).discard(files)
+
+
+def _create_uploaded_resume(
+    db: Session,
+    current_user: User,
+    candidate_name: str,
+    source: Source,
+    stored: StoredFile
+) -> UploadResumeResponse:
+    """创建上传简历的记录、日志、文件引用与统计"""
+    blobs = ResumeBlobService(db)
+    duplicates = [
+        DuplicateResume(
+            id=r.id,
+            candidate_name=r.candidate_name,
+            source=r.source.value,
+            status=r.status.value,
+            created_at=r.created_at
+        )
+        for r in blobs.find_duplicates(stored.sha256)
+    ]
     
-    # 创建简历记录
     resume = Resume(
         candidate_name=candidate_name,
         source=source,
-        resume_url=f"/uploads/{file_name}",
+        resume_url=stored.url,
+        file_size=stored.size,
+        file_hash=stored.sha256,
         uploader_id=current_user.id,
         status=ResumeStatus.POOL_HR
     )
     db.add(resume)
+    db.flush()
     
     # 记录日志
     log = WorkflowLog(
@@ -427,10 +787,211 @@ async def upload_resume(
     )
     db.add(log)
     
+    blobs.add_references([stored])
+    db.add(ResumeText(resume_id=resume.id))
+    ResumeSearchService(db).refresh([resume.id])
+    
+    # 计入统计汇总
+    ResumeStatsService(db).record_upload(resume)
+    
     db.commit()
-    db.refresh(resume)
     
-    return _build_resume_response(resume)
+    response = _build_resume_response(_reload_resume(db, resume.id))
+    return UploadResumeResponse(**response.model_dump(), duplicates=duplicates)
+
+
+def _zip_member_name(info: zipfile.ZipInfo) -> str:
+    """zip 内文件名：未标记 UTF-8 的条目按 GBK 解码（Windows 中文系统压缩的文件）"""
+    if info.flag_bits & 0x800:
+        return info.filename
+    try:
+        return info.filename.encode("cp437").decode("gbk")
+    except (UnicodeEncodeError, UnicodeDecodeError):
+        return info.filename
+
+
+def _open_zip_members(upload: UploadFile) -> Tuple[zipfile.ZipFile, List[Tuple[str, zipfile.ZipInfo]]]:
+    """打开上传的 zip，返回其中的文件（忽略目录、隐藏文件与 __MACOSX）"""
+    archive = zipfile.ZipFile(upload.file)
+    members = []
+    for info in archive.infolist():
+        name = _zip_member_name(info)
+        if info.is_dir() or name.startswith("__MACOSX/") or os.path.basename(name).startswith("."):
+            continue
+        members.append((name, info))
+    return archive, members
+
+
+async def _save_zip_member(archive: zipfile.ZipFile, info: zipfile.ZipInfo, file_ext: str) -> StoredFile:
+    """流式解压 zip 内的一个文件到存储"""
+    member = await run_in_threadpool(archive.open, info)
+    try:
+        return await save_stream(partial(run_in_threadpool, member.read), file_ext)
+    finally:
+        member.close()
+
+
+@router.post("/bulk-upload", response_model=BulkUploadResponse)
+async def bulk_upload_resumes(
+    source: Source = Form(...),
+    files: List[UploadFile] = File(...),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_roles(Role.HR, Role.ADMIN))
+):
+    """批量导入简历（HR/管理员）
+
+    可同时上传多个简历文件或 zip 压缩包，候选人姓名取文件名（不含扩展名）。
+    文件并发流式写入存储，数据库按批次批量写入，返回每个文件的导入结果。
+    """
+    items: List[BulkUploadItem] = []
+    # 待保存的文件：(结果下标, 声明大小, 保存函数)
+    entries = []
+    archives = []
+    try:
+        for upload in files:
+            if os.path.splitext(upload.filename)[1].lower() != ".zip":
+                items.append(BulkUploadItem(filename=upload.filename, success=False))
+                entries.append((len(items) - 1, upload.size, partial(save_upload, upload)))
+                continue
+            try:
+                archive, members = await run_in_threadpool(_open_zip_members, upload)
+            except zipfile.BadZipFile:
+                items.append(BulkUploadItem(filename=upload.filename, success=False, error="无效的zip文件"))
+                continue
+            archives.append(archive)
+            for name, info in members:
+                items.append(BulkUploadItem(filename=name, success=False))
+                entries.append((len(items) - 1, info.file_size, partial(_save_zip_member, archive, info)))
+        
+        if len(entries) > settings.BULK_UPLOAD_MAX_FILES:
+            raise HTTPException(
+                status_code=400,
+                detail=f"单次最多导入 {settings.BULK_UPLOAD_MAX_FILES} 个文件"
+            )
+        
+        # 并发流式保存文件
+        semaphore = asyncio.Semaphore(settings.BULK_UPLOAD_CONCURRENCY)
+        
+        async def store(index: int, declared_size: Optional[int], save) -> Optional[StoredFile]:
+            item = items[index]
+            file_ext = os.path.splitext(item.filename)[1].lower()
+            if file_ext not in settings.ALLOWED_EXTENSIONS:
+                item.error = "不支持的文件类型"
+                return None
+            if declared_size is not None and declared_size > settings.MAX_UPLOAD_SIZE:
+                item.error = "文件过大"
+                return None
+            async with semaphore:
+                try:
+                    return await save(file_ext)
+                except UploadTooLarge:
+                    item.error = "文件过大"
+                except (OSError, zipfile.BadZipFile, RuntimeError) as e:
+                    item.error = f"文件保存失败: {e}"
+            return None
+        
+        stored_files = await asyncio.gather(*(store(*entry) for entry in entries))
+    finally:
+        for archive in archives:
+            archive.close()
+    
+    # 按批次写入数据库（每批一个事务），批次失败时清理该批文件
+    saved = [
+        (entry[0], stored)
+        for entry, stored in zip(entries, stored_files)
+        if stored is not None
+    ]
+    hash_counts = Counter(stored.sha256 for _, stored in saved)
+    import_service = ResumeImportService(db)
+    for start in range(0, len(saved), settings.BULK_UPLOAD_BATCH_SIZE):
+        batch = saved[start:start + settings.BULK_UPLOAD_BATCH_SIZE]
+        rows = [
+            (os.path.splitext(os.path.basename(items[index].filename))[0][:100], stored)
+            for index, stored in batch
+        ]
+        try:
+            resume_ids = await run_in_threadpool(
+                import_service.insert_batch, rows, source, current_user
+            )
+        except Exception as e:
+            # 同一内容被其他批次共用时保留文件
+            await run_in_threadpool(
+                _discard_files, db, [stored for _, stored in batch if hash_counts[stored.sha256] == 1]
+            )
+            for index, _ in batch:
+                items[index].error = f"保存失败: {e.__class__.__name__}"
+            continue
+        for (index, _), resume_id in zip(batch, resume_ids):
+            items[index].success = True
+            items[index].resume_id = resume_id
+        text_extraction.submit(resume_ids)
+    
+    created = sum(1 for item in items if item.success)
+    return BulkUploadResponse(
+        total=len(items),
+        created=created,
+        failed=len(items) - created,
+        items=items
+    )
+
+
+@router.post("/batch/distribute-l2", response_model=BatchTransitionResponse)
+def batch_distribute_to_l2(
+    request: BatchDistributeL2Request,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_roles(Role.HR, Role.ADMIN))
+):
+    """批量分发给二层部门（HR）
+
+    所有简历在一个事务内流转，状态不符的简历记为失败，不影响其他简历。
+    """
+    workflow = WorkflowService(db)
+    return _run_batch_transition(
+        db, request.resume_ids,
+        lambda resumes: workflow.distribute_to_l2_batch(resumes, current_user, request.l2_department_id)
+    )
+
+
+@router.post("/batch/distribute-l3", response_model=BatchTransitionResponse)
+def batch_distribute_to_l3(
+    request: BatchDistributeL3Request,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_roles(Role.L2_MANAGER, Role.ADMIN))
+):
+    """批量分发给三层部门（二层经理）"""
+    workflow = WorkflowService(db)
+    return _run_batch_transition(
+        db, request.resume_ids,
+        lambda resumes: workflow.distribute_to_l3_batch(resumes, current_user, request.l3_department_id)
+    )
+
+
+@router.post("/batch/assign-expert", response_model=BatchTransitionResponse)
+def batch_assign_expert(
+    request: BatchAssignExpertRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_roles(Role.L3_ASSISTANT, Role.ADMIN))
+):
+    """批量指派专家（三层助理）"""
+    workflow = WorkflowService(db)
+    return _run_batch_transition(
+        db, request.resume_ids,
+        lambda resumes: workflow.assign_expert_batch(resumes, current_user, request.expert_id)
+    )
+
+
+@router.post("/batch/release", response_model=BatchTransitionResponse)
+def batch_release(
+    request: BatchReleaseRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_roles(Role.L2_MANAGER, Role.ADMIN))
+):
+    """批量释放简历（二层经理）"""
+    workflow = WorkflowService(db)
+    return _run_batch_transition(
+        db, request.resume_ids,
+        lambda resumes: workflow.release_batch(resumes, current_user, request.reason)
+    )
 
 
 @router.post("/{resume_id}/distribute-l2", response_model=ResumeResponse)
@@ -450,8 +1011,10 @@ def distribute_to_l2(
         resume = workflow.distribute_to_l2(resume, current_user, request.l2_department_id)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
+    except WorkflowConflict as e:
+        raise HTTPException(status_code=409, detail=str(e))
     
-    return _build_resume_response(resume)
+    return _build_resume_response(_reload_resume(db, resume_id))
 
 
 @router.post("/{resume_id}/distribute-l3", response_model=ResumeResponse)
@@ -471,8 +1034,10 @@ def distribute_to_l3(
         resume = workflow.distribute_to_l3(resume, current_user, request.l3_department_id)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
+    except WorkflowConflict as e:
+        raise HTTPException(status_code=409, detail=str(e))
     
-    return _build_resume_response(resume)
+    return _build_resume_response(_reload_resume(db, resume_id))
 
 
 @router.post("/{resume_id}/assign-expert", response_model=ResumeResponse)
@@ -492,8 +1057,10 @@ def assign_expert(
         resume = workflow.assign_expert(resume, current_user, request.expert_id)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
+    except WorkflowConflict as e:
+        raise HTTPException(status_code=409, detail=str(e))
     
-    return _build_resume_response(resume)
+    return _build_resume_response(_reload_resume(db, resume_id))
 
 
 @router.post("/{resume_id}/identify", response_model=ResumeResponse)
@@ -513,8 +1080,10 @@ def identify_resume(
         resume = workflow.identify(resume, current_user, request.identified, request.comment)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
+    except WorkflowConflict as e:
+        raise HTTPException(status_code=409, detail=str(e))
     
-    return _build_resume_response(resume)
+    return _build_resume_response(_reload_resume(db, resume_id))
 
 
 @router.post("/{resume_id}/fill-contact", response_model=ResumeResponse)
@@ -534,8 +1103,10 @@ def fill_contact_info(
         resume = workflow.fill_contact_info(resume, current_user, request.email, request.phone)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
+    except WorkflowConflict as e:
+        raise HTTPException(status_code=409, detail=str(e))
     
-    return _build_resume_response(resume)
+    return _build_resume_response(_reload_resume(db, resume_id))
 
 
 @router.post("/{resume_id}/start-connection", response_model=ResumeResponse)
@@ -554,8 +1125,10 @@ def start_connection(
         resume = workflow.start_connection(resume, current_user)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
+    except WorkflowConflict as e:
+        raise HTTPException(status_code=409, detail=str(e))
     
-    return _build_resume_response(resume)
+    return _build_resume_response(_reload_resume(db, resume_id))
 
 
 @router.post("/{resume_id}/feedback", response_model=ResumeResponse)
@@ -575,8 +1148,10 @@ def submit_feedback(
         resume = workflow.submit_feedback(resume, current_user, request.feedback, request.archive)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
+    except WorkflowConflict as e:
+        raise HTTPException(status_code=409, detail=str(e))
     
-    return _build_resume_response(resume)
+    return _build_resume_response(_reload_resume(db, resume_id))
 
 
 @router.post("/{resume_id}/release", response_model=ResumeResponse)
@@ -596,8 +1171,10 @@ def release_resume(
         resume = workflow.release(resume, current_user, request.reason)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
+    except WorkflowConflict as e:
+        raise HTTPException(status_code=409, detail=str(e))
     
-    return _build_resume_response(resume)
+    return _build_resume_response(_reload_resume(db, resume_id))
 
 
 @router.post("/{resume_id}/overdue-reason", response_model=ResumeResponse)
@@ -617,5 +1194,7 @@ def submit_overdue_reason(
         resume = workflow.submit_overdue_reason(resume, current_user, request.reason)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
+    except WorkflowConflict as e:
+        raise HTTPException(status_code=409, detail=str(e))
     
-    return _build_resume_response(resume)
+    return _build_resume_response(_reload_resume(db, resume_id))
@@ -7,7 +7,8 @@ from typing import List, Optional
 from pydantic import BaseModel, EmailStr
 
 from app.core.database import get_db
-from app.core.security import get_password_hash
+from app.core.security import get_password_hash, PasswordHasherBusy
+from app.core.principal_cache import principal_cache
 from app.models import User, Department, Role
 from app.api.deps import get_current_user, require_roles
 
@@ -90,10 +91,19 @@ def create_user(
     if db.query(User).filter(User.email == user_in.email).first():
         raise HTTPException(status_code=400, detail="邮箱已存在")
     
+    try:
+        password_hash = get_password_hash(user_in.password)
+    except PasswordHasherBusy:
+        raise HTTPException(
+            status_code=503,
+            detail="密码处理繁忙，请稍后重试",
+            headers={"Retry-After": "1"}
+        )
+    
     user = User(
         username=user_in.username,
         email=user_in.email,
-        password_hash=get_password_hash(user_in.password),
+        password_hash=password_hash,
         role=user_in.role,
         department_id=user_in.department_id,
         is_active=True
@@ -153,6 +163,7 @@ def update_user(
         setattr(user, field, value)
     
     db.commit()
+    principal_cache.invalidate(user_id)
     db.refresh(user)
     
     response = UserResponse(
@@ -184,4 +195,5 @@ def delete_user(
     
     db.delete(user)
     db.commit()
+    principal_cache.invalidate(user_id)
     return {"message": "删除成功"}
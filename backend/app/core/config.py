@@ -14,15 +14,75 @@ class Settings(BaseSettings):
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 480  # 8小时
     
+    # 密码哈希（bcrypt 为 CPU 密集操作，在独立的有界线程池中执行）
+    BCRYPT_ROUNDS: int = 12              # 调整后旧哈希在用户下次登录时自动重新哈希
+    PASSWORD_HASH_WORKERS: int = 2       # 哈希线程数（建议不超过 CPU 核数）
+    PASSWORD_HASH_MAX_QUEUE: int = 64    # 排队上限，超出时登录返回 503
+    
+    # 当前用户缓存（禁用/改角色在其他进程最长 TTL 秒后生效；配置 Redis 后立即生效）
+    PRINCIPAL_CACHE_TTL_SECONDS: int = 60   # 0 表示关闭缓存
+    PRINCIPAL_CACHE_MAX_SIZE: int = 10000
+    PRINCIPAL_CACHE_REDIS_URL: Optional[str] = None
+    
     # 文件上传
     UPLOAD_DIR: str = "/app/uploads"
     MAX_UPLOAD_SIZE: int = 10 * 1024 * 1024  # 10MB
     ALLOWED_EXTENSIONS: set = {".pdf", ".doc", ".docx"}
+    SERVE_UPLOADS_STATIC: bool = False   # 是否开放无鉴权的 /uploads 静态访问（会绕过 /api/resumes/{id}/file 的权限校验，仅用于兼容旧链接）
+    FILE_ACCEL_REDIRECT_PREFIX: Optional[str] = None  # nginx internal location，如 /protected-uploads
+    BULK_UPLOAD_MAX_FILES: int = 1000    # 批量导入单次最多文件数（含 zip 内文件）
+    BULK_UPLOAD_CONCURRENCY: int = 8     # 批量导入并发写文件数
+    BULK_UPLOAD_BATCH_SIZE: int = 200    # 批量导入每个事务写入的简历数
+    
+    # 简历文本提取（服务端解析 PDF/DOCX，独立进程池）
+    TEXT_EXTRACTION_ENABLED: bool = True
+    TEXT_EXTRACTION_WORKERS: int = 2              # 解析进程数
+    TEXT_EXTRACTION_TIMEOUT_SECONDS: int = 30     # 单个文件解析超时
+    TEXT_EXTRACTION_MEMORY_MB: int = 512          # 每个解析进程的内存上限（0 表示不限制）
+    TEXT_EXTRACTION_TASKS_PER_WORKER: int = 200   # 解析进程处理多少个文件后重启（释放碎片内存）
+    TEXT_EXTRACTION_MAX_CHARS: int = 200000       # 保存的最大字符数
+    TEXT_EXTRACTION_RECOVER_MINUTES: int = 1      # leader 补投遗留提取任务的间隔（0 表示不补投）
+    TEXT_EXTRACTION_RECOVER_BATCH_SIZE: int = 200  # 每次补投后本进程最多排队的任务数
+    
+    # 简历搜索
+    SEARCH_INDEX_MAX_CHARS: int = 20000           # 正文前多少字符进入全文索引
+    SEARCH_MAX_CANDIDATES: int = 200              # 每个匹配分支只对最近的多少个匹配计算得分并参与合并排序
+    SEARCH_BACKEND: Optional[str] = None          # postgres / inverted_index，默认按数据库类型选择
+    SEARCH_INDEX_PATH: Optional[str] = None       # 倒排索引文件路径（默认系统临时目录，不要放在 /uploads 下；仅限单 worker）
+    SEARCH_INDEX_SAVE_EVERY: int = 500            # 倒排索引累计多少份文档变更后由后台线程合并写入磁盘
+    
+    # 列表分页
+    RESUME_COUNT_CAP: int = 10000  # 游标分页时 total 最多统计到的行数
+    
+    # 工作流批量操作
+    WORKFLOW_BATCH_MAX_ITEMS: int = 500  # 批量流转单次最多简历数（同一事务提交）
     
     # SLA配置（小时）
     SLA_IDENTIFY_HOURS: int = 24       # 识别：1天
     SLA_CONNECTION_HOURS: int = 24     # 建联：1天
     SLA_FEEDBACK_HOURS: int = 120      # 反馈：5天
+    SLA_SWEEP_BATCH_SIZE: int = 1000   # 超期扫描每批处理的简历数
+    SLA_REMINDER_HOURS: list = [4]     # 截止前多少小时发送即将超期提醒（每档每阶段只发一次）
+    SLA_SCHEDULER_MAX_SLEEP_MINUTES: int = 30  # SLA检查的最长休眠时间（兜底其他进程登记的截止时间）
+    
+    # 通知
+    NOTIFICATION_COUNTER_RECONCILE_MINUTES: int = 60  # 通知计数对账间隔（0 表示不对账）
+    NOTIFICATION_DIGEST_WINDOW_MINUTES: int = 30     # 同类未读通知合并为摘要的时间窗口（0 表示不合并）
+    NOTIFICATION_DIGEST_MAX_RESUMES: int = 100       # 摘要最多记录的简历数
+    NOTIFICATION_RETENTION_DAYS: int = 90            # 已读通知保留天数，超过后归档（0 表示不归档）
+    NOTIFICATION_ARCHIVE_INTERVAL_MINUTES: int = 360 # 归档任务执行间隔
+    NOTIFICATION_ARCHIVE_BATCH_SIZE: int = 1000      # 归档每个事务处理的通知数
+    NOTIFICATION_CHANNEL: str = "resume_notifications"  # 跨进程推送的 PostgreSQL LISTEN/NOTIFY 频道
+    NOTIFICATION_STREAM_QUEUE_SIZE: int = 100        # 每个推送连接最多积压的事件数（超出时要求客户端重新拉取）
+    NOTIFICATION_STREAM_HEARTBEAT_SECONDS: int = 15  # 推送连接心跳间隔（防止代理断开空闲连接）
+    
+    # 定时任务选主（多 worker 部署只有 leader 执行SLA任务）
+    SCHEDULER_LOCK_KEY: int = 72_010_001          # PostgreSQL advisory lock 键
+    SCHEDULER_LOCK_FILE: Optional[str] = None     # 非PostgreSQL时使用的文件锁路径（默认系统临时目录）
+    SCHEDULER_HEARTBEAT_SECONDS: int = 15         # 选主心跳间隔（leader 失效后的最长接管时间）
+    
+    # 运行指标（/metrics 仅管理员可访问；配置令牌后监控系统可用 Bearer 令牌抓取）
+    METRICS_TOKEN: Optional[str] = None
     
     # CORS
     CORS_ORIGINS: list = ["http://localhost:5173", "http://localhost:3000"]
@@ -20,6 +20,18 @@ SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
 
+def upsert(db, table):
+    """返回当前数据库方言下支持 ON CONFLICT 的 INSERT 语句"""
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        raise NotImplementedError(f"不支持的数据库方言: {dialect}")
+    return insert(table)
+
+
 def get_db():
     """获取数据库会话依赖"""
     db = SessionLocal()
@@ -0,0 +1,125 @@
+"""
+简历文件下载响应 - 条件请求、Range 与零拷贝
+
+内容寻址的文件内容不会变化：ETag 直接使用内容哈希，并允许浏览器长期缓存（immutable）；
+If-None-Match 命中返回 304，Range 请求返回 206（单一区间）。
+配置 FILE_ACCEL_REDIRECT_PREFIX 后交给前置 nginx 通过 X-Accel-Redirect 发送文件
+（sendfile 零拷贝，Range 也由 nginx 处理），应用只做鉴权与缓存头。
+"""
+import mimetypes
+import os
+from typing import Optional, Tuple
+from urllib.parse import quote
+
+import aiofiles
+from fastapi import Request
+from fastapi.responses import FileResponse, Response, StreamingResponse
+
+from app.core.config import settings
+from app.core.storage import CHUNK_SIZE
+
+IMMUTABLE_CACHE_CONTROL = "private, max-age=31536000, immutable"
+REVALIDATE_CACHE_CONTROL = "private, no-cache"
+
+
+def _parse_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """解析单一区间的 Range 头，返回 [start, end]；无法满足时抛出 ValueError，多区间/格式不支持时返回 None"""
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+    start_text, sep, end_text = spec.strip().partition("-")
+    if not sep:
+        return None
+    try:
+        if not start_text:
+            # bytes=-N：最后 N 个字节
+            length = int(end_text)
+            if length <= 0:
+                raise ValueError
+            return max(size - length, 0), size - 1
+        start = int(start_text)
+        end = int(end_text) if end_text else size - 1
+    except ValueError:
+        return None
+    if start >= size or start > end:
+        raise ValueError("range not satisfiable")
+    return start, min(end, size - 1)
+
+
+def _etag_matches(header: Optional[str], etag: str) -> bool:
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    # 弱比较：忽略 W/ 前缀
+    candidates = [value.strip().removeprefix("W/") for value in header.split(",")]
+    return etag.removeprefix("W/") in candidates
+
+
+async def _iter_file(path: str, start: int, length: int):
+    async with aiofiles.open(path, "rb") as f:
+        await f.seek(start)
+        while length > 0:
+            chunk = await f.read(min(CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+
+
+def file_response(
+    request: Request,
+    path: str,
+    name: str,
+    download_name: str,
+    content_hash: Optional[str] = None
+) -> Response:
+    """构建文件下载响应
+
+    path 为文件绝对路径，name 为相对 UPLOAD_DIR 的路径（用于 X-Accel-Redirect），
+    content_hash 为内容哈希（没有时按文件大小与修改时间生成弱 ETag，且不允许长期缓存）。
+    """
+    stat = os.stat(path)
+    if content_hash:
+        etag = f'"{content_hash}"'
+        cache_control = IMMUTABLE_CACHE_CONTROL
+    else:
+        etag = f'W/"{stat.st_size:x}-{int(stat.st_mtime):x}"'
+        cache_control = REVALIDATE_CACHE_CONTROL
+
+    headers = {
+        "ETag": etag,
+        "Cache-Control": cache_control,
+        "Accept-Ranges": "bytes",
+        "Content-Disposition": f"inline; filename*=UTF-8''{quote(download_name)}",
+    }
+    media_type = mimetypes.guess_type(download_name)[0] or "application/octet-stream"
+
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+
+    if settings.FILE_ACCEL_REDIRECT_PREFIX:
+        headers["X-Accel-Redirect"] = settings.FILE_ACCEL_REDIRECT_PREFIX.rstrip("/") + "/" + quote(name)
+        return Response(headers=headers, media_type=media_type)
+
+    range_header = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    if range_header and (not if_range or if_range.strip() == etag):
+        try:
+            byte_range = _parse_range(range_header, stat.st_size)
+        except ValueError:
+            headers["Content-Range"] = f"bytes */{stat.st_size}"
+            return Response(status_code=416, headers=headers)
+        if byte_range is not None:
+            start, end = byte_range
+            length = end - start + 1
+            headers["Content-Range"] = f"bytes {start}-{end}/{stat.st_size}"
+            headers["Content-Length"] = str(length)
+            return StreamingResponse(
+                _iter_file(path, start, length),
+                status_code=206,
+                headers=headers,
+                media_type=media_type,
+            )
+
+    return FileResponse(path, headers=headers, media_type=media_type, stat_result=stat)
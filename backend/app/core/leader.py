@@ -0,0 +1,210 @@
+"""
+进程间选主 - 多 worker 部署时保证只有一个进程执行 SLA 定时任务
+
+PostgreSQL 使用会话级 advisory lock（持有锁的连接断开即自动释放，其他进程下一次心跳接管）；
+其他数据库（SQLite/测试环境）退化为本机文件锁。
+"""
+import fcntl
+import os
+import socket
+import tempfile
+import threading
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import NullPool
+
+from app.core.config import settings
+
+
+def worker_id() -> str:
+    """当前进程标识：主机名:PID"""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class LeaderElection:
+    """选主基类：子类实现 _acquire / _check / _release / current_leader"""
+
+    backend = "none"
+
+    def __init__(self):
+        self.worker_id = worker_id()
+        self.is_leader = False
+        self.acquired_at: Optional[datetime] = None
+        self.last_heartbeat: Optional[datetime] = None
+        self.leadership_changes = 0
+        self._lock = threading.Lock()
+
+    def heartbeat(self) -> bool:
+        """尝试获取或确认领导权，返回当前是否为 leader"""
+        with self._lock:
+            self.last_heartbeat = datetime.utcnow()
+            was_leader = self.is_leader
+            try:
+                self.is_leader = self._check() if was_leader else self._acquire()
+            except Exception as e:
+                print(f"[Leader] 选主失败: {e}")
+                self._safe_release()
+                self.is_leader = False
+
+            if self.is_leader != was_leader:
+                self.leadership_changes += 1
+                self.acquired_at = datetime.utcnow() if self.is_leader else None
+                state = "成为" if self.is_leader else "失去"
+                print(f"[Leader] {self.worker_id} {state} SLA 任务 leader（{self.backend}）")
+            return self.is_leader
+
+    def release(self) -> None:
+        """主动释放领导权（进程退出时）"""
+        with self._lock:
+            self._safe_release()
+            self.is_leader = False
+            self.acquired_at = None
+
+    def status(self) -> dict:
+        """选主状态（用于 /metrics）"""
+        try:
+            leader = self.current_leader()
+        except Exception:
+            leader = None
+        return {
+            "backend": self.backend,
+            "worker_id": self.worker_id,
+            "is_leader": self.is_leader,
+            "leader": leader,
+            "acquired_at": self.acquired_at,
+            "last_heartbeat": self.last_heartbeat,
+            "leadership_changes": self.leadership_changes,
+        }
+
+    def _safe_release(self) -> None:
+        try:
+            self._release()
+        except Exception:
+            pass
+
+    def _acquire(self) -> bool:
+        raise NotImplementedError
+
+    def _check(self) -> bool:
+        raise NotImplementedError
+
+    def _release(self) -> None:
+        raise NotImplementedError
+
+    def current_leader(self) -> Optional[str]:
+        raise NotImplementedError
+
+
+class PostgresLeaderElection(LeaderElection):
+    """基于 pg_try_advisory_lock 的选主，锁由一条专用连接持有"""
+
+    backend = "postgres_advisory_lock"
+
+    def __init__(self, database_url: str, lock_key: int):
+        super().__init__()
+        self.lock_key = lock_key
+        # 专用连接不进连接池；application_name 便于从 pg_stat_activity 查到 leader
+        self._engine = create_engine(
+            database_url,
+            poolclass=NullPool,
+            connect_args={"application_name": f"resume-tracker-leader:{self.worker_id}"}
+        )
+        self._conn = None
+
+    def _acquire(self) -> bool:
+        if self._conn is None:
+            self._conn = self._engine.connect()
+        acquired = self._conn.execute(
+            text("SELECT pg_try_advisory_lock(:key)"), {"key": self.lock_key}
+        ).scalar()
+        self._conn.commit()
+        return bool(acquired)
+
+    def _check(self) -> bool:
+        # 连接仍存活即仍持有锁；连接断开时锁已被数据库释放
+        self._conn.execute(text("SELECT 1"))
+        self._conn.commit()
+        return True
+
+    def _release(self) -> None:
+        if self._conn is not None:
+            try:
+                self._conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": self.lock_key})
+                self._conn.commit()
+            finally:
+                self._conn.close()
+                self._conn = None
+
+    def current_leader(self) -> Optional[str]:
+        with self._engine.connect() as conn:
+            name = conn.execute(text(
+                "SELECT a.application_name FROM pg_locks l "
+                "JOIN pg_stat_activity a ON a.pid = l.pid "
+                "WHERE l.locktype = 'advisory' AND l.granted "
+                "AND l.classid = 0 AND l.objid = :key AND l.objsubid = 1"
+            ), {"key": self.lock_key}).scalar()
+        return name.split(":", 1)[1] if name else None
+
+
+class FileLeaderElection(LeaderElection):
+    """基于 flock 的本机选主（SQLite/测试环境）"""
+
+    backend = "file_lock"
+
+    def __init__(self, path: str):
+        super().__init__()
+        self.path = path
+        self._fd: Optional[int] = None
+
+    def _acquire(self) -> bool:
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            return False
+        os.ftruncate(fd, 0)
+        os.write(fd, self.worker_id.encode())
+        self._fd = fd
+        return True
+
+    def _check(self) -> bool:
+        return self._fd is not None
+
+    def _release(self) -> None:
+        if self._fd is not None:
+            try:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+            finally:
+                os.close(self._fd)
+                self._fd = None
+
+    def current_leader(self) -> Optional[str]:
+        if self.is_leader:
+            return self.worker_id
+        try:
+            fd = os.open(self.path, os.O_RDONLY)
+        except FileNotFoundError:
+            return None
+        try:
+            # 能拿到共享锁说明没有进程持有排他锁，即当前没有 leader
+            fcntl.flock(fd, fcntl.LOCK_SH | fcntl.LOCK_NB)
+        except BlockingIOError:
+            return os.read(fd, 256).decode().strip() or None
+        else:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+            return None
+        finally:
+            os.close(fd)
+
+
+def create_leader_election() -> LeaderElection:
+    """根据数据库类型创建选主实现"""
+    if settings.DATABASE_URL.startswith("postgresql"):
+        return PostgresLeaderElection(settings.DATABASE_URL, settings.SCHEDULER_LOCK_KEY)
+    lock_file = settings.SCHEDULER_LOCK_FILE or os.path.join(
+        tempfile.gettempdir(), "resume_tracker_scheduler.lock"
+    )
+    return FileLeaderElection(lock_file)
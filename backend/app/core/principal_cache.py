@@ -0,0 +1,172 @@
+"""
+当前用户（principal）缓存 - 认证请求跳过 users 表查询
+
+缓存内容为 User 的少量列（不含密码哈希），命中时通过 merge(load=False) 挂到当前会话，
+不发 SELECT；未缓存的列在访问时按需加载。
+用户被修改/删除时按版本号失效：失效会递增版本号，失效前开始的查询无法再写回旧数据。
+默认进程内 LRU + TTL（其他 worker 最长 TTL 秒后生效）；配置 PRINCIPAL_CACHE_REDIS_URL 后多进程共享。
+"""
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from sqlalchemy.orm import Session, make_transient_to_detached
+
+from app.core.config import settings
+from app.models import User, Role
+
+# 缓存的列（不含 password_hash 等敏感/大字段）
+CACHED_FIELDS = ("id", "username", "email", "role", "department_id", "is_active")
+
+
+class InMemoryBackend:
+    """进程内 LRU + TTL 缓存"""
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._entries: "OrderedDict[str, Tuple[float, int, dict]]" = OrderedDict()
+        self._versions = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Tuple[int, dict]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, version, data = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return version, data
+
+    def set(self, key: str, version: int, data: dict, ttl: int) -> None:
+        with self._lock:
+            # 期间已失效（版本号变化）的查询结果不写回
+            if self._versions.get(key, 0) != version:
+                return
+            self._entries[key] = (time.monotonic() + ttl, version, data)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def version(self, key: str) -> int:
+        with self._lock:
+            return self._versions.get(key, 0)
+
+    def invalidate(self, key: str) -> None:
+        with self._lock:
+            self._versions[key] = self._versions.get(key, 0) + 1
+            self._entries.pop(key, None)
+
+    def size(self) -> int:
+        return len(self._entries)
+
+
+class RedisBackend:
+    """Redis 共享缓存（多 worker/多实例共享失效）"""
+
+    def __init__(self, url: str):
+        import redis  # 可选依赖，仅配置了 PRINCIPAL_CACHE_REDIS_URL 时需要
+        self._redis = redis.Redis.from_url(url)
+
+    def get(self, key: str) -> Optional[Tuple[int, dict]]:
+        raw, version = self._redis.mget(f"principal:{key}", f"principal:ver:{key}")
+        if raw is None:
+            return None
+        entry = json.loads(raw)
+        # 条目版本落后于当前版本说明已失效
+        if entry["version"] != int(version or 0):
+            return None
+        return entry["version"], entry["data"]
+
+    def set(self, key: str, version: int, data: dict, ttl: int) -> None:
+        if int(self._redis.get(f"principal:ver:{key}") or 0) != version:
+            return
+        self._redis.set(
+            f"principal:{key}", json.dumps({"version": version, "data": data}), ex=ttl
+        )
+
+    def version(self, key: str) -> int:
+        return int(self._redis.get(f"principal:ver:{key}") or 0)
+
+    def invalidate(self, key: str) -> None:
+        pipe = self._redis.pipeline()
+        pipe.incr(f"principal:ver:{key}")
+        pipe.delete(f"principal:{key}")
+        pipe.execute()
+
+    def size(self) -> int:
+        return -1
+
+
+class PrincipalCache:
+    """当前用户缓存"""
+
+    def __init__(self, backend, ttl: int):
+        self.backend = backend
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def load(self, db: Session, user_id: str) -> Optional[User]:
+        """获取用户：命中缓存时不查询数据库"""
+        if self.ttl <= 0:
+            return db.query(User).filter(User.id == user_id).first()
+
+        cached = self.backend.get(user_id)
+        if cached is not None:
+            self.hits += 1
+            return self._attach(db, cached[1])
+
+        self.misses += 1
+        version = self.backend.version(user_id)
+        user = db.query(User).filter(User.id == user_id).first()
+        if user is not None:
+            self.backend.set(user_id, version, self._serialize(user), self.ttl)
+        return user
+
+    def invalidate(self, user_id: str) -> None:
+        """用户信息变更后失效缓存"""
+        self.invalidations += 1
+        self.backend.invalidate(user_id)
+
+    def stats(self) -> dict:
+        """缓存指标（用于 /metrics）"""
+        return {
+            "backend": type(self.backend).__name__,
+            "ttl_seconds": self.ttl,
+            "size": self.backend.size(),
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+        }
+
+    @staticmethod
+    def _serialize(user: User) -> dict:
+        data = {field: getattr(user, field) for field in CACHED_FIELDS}
+        data["role"] = user.role.value
+        return data
+
+    @staticmethod
+    def _attach(db: Session, data: dict) -> User:
+        """把缓存数据还原为已持久化的 User 并挂到当前会话（不发查询）"""
+        user = User(**{**data, "role": Role(data["role"])})
+        make_transient_to_detached(user)
+        return db.merge(user, load=False)
+
+
+def _create_principal_cache() -> PrincipalCache:
+    backend = InMemoryBackend(settings.PRINCIPAL_CACHE_MAX_SIZE)
+    if settings.PRINCIPAL_CACHE_REDIS_URL:
+        try:
+            backend = RedisBackend(settings.PRINCIPAL_CACHE_REDIS_URL)
+        except ImportError:
+            print("[PrincipalCache] 未安装 redis，使用进程内缓存")
+    return PrincipalCache(backend, settings.PRINCIPAL_CACHE_TTL_SECONDS)
+
+
+principal_cache = _create_principal_cache()
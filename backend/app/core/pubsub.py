@@ -0,0 +1,280 @@
+"""
+通知推送 - 进程内订阅中心 + 跨进程广播
+
+事务内发布的事件暂存在 Session.info 中，事务提交后才投递给订阅者（回滚则丢弃）：
+- PostgreSQL：提交前用 pg_notify 写入（随事务提交才对监听方可见），每个进程的监听线程
+  LISTEN 同一频道，收到后分发给本进程的订阅者（包括发布者所在进程）；
+- 其他数据库（SQLite/测试环境）：提交后直接分发给本进程的订阅者（仅适用于单进程部署）。
+订阅者为 SSE 连接，每个连接一个有界 asyncio.Queue；消费过慢时清空队列并通知客户端重新拉取。
+"""
+import asyncio
+import json
+import select
+import threading
+from typing import Dict, List, Optional, Set
+
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import NullPool
+
+from app.core.config import settings
+from app.core.leader import worker_id
+
+PENDING_KEY = "pubsub_pending_events"
+# pg_notify 的负载上限为 8000 字节
+MAX_PAYLOAD_BYTES = 7900
+RECONNECT_SECONDS = 5
+RESYNC_EVENT = {"event": "resync", "data": {}}
+
+
+class Subscription:
+    """一个 SSE 连接的订阅"""
+
+    __slots__ = ("user_id", "loop", "queue")
+
+    def __init__(self, user_id: str, loop: asyncio.AbstractEventLoop, queue: asyncio.Queue):
+        self.user_id = user_id
+        self.loop = loop
+        self.queue = queue
+
+
+class NotificationHub:
+    """进程内订阅中心：按用户分发事件（可在任意线程调用 dispatch）"""
+
+    def __init__(self, queue_size: int):
+        self.queue_size = queue_size
+        self._lock = threading.Lock()
+        self._subscribers: Dict[str, Set[Subscription]] = {}
+        self.dispatched = 0
+        self.delivered = 0
+        self.overflows = 0
+
+    def subscribe(self, user_id: str) -> Subscription:
+        """订阅用户的事件（在事件循环中调用）"""
+        subscription = Subscription(user_id, asyncio.get_running_loop(), asyncio.Queue(self.queue_size))
+        with self._lock:
+            self._subscribers.setdefault(user_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            subscriptions = self._subscribers.get(subscription.user_id)
+            if subscriptions is not None:
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    del self._subscribers[subscription.user_id]
+
+    def dispatch(self, events: List[dict]) -> None:
+        """把事件分发给对应用户的所有订阅者"""
+        with self._lock:
+            self.dispatched += len(events)
+            targets = [
+                (subscription, event)
+                for event in events
+                for subscription in self._subscribers.get(event["user_id"], ())
+            ]
+        for subscription, event in targets:
+            try:
+                subscription.loop.call_soon_threadsafe(self._put, subscription, event)
+            except RuntimeError:
+                # 事件循环已关闭（连接正在退出）
+                pass
+
+    def resync_all(self) -> None:
+        """通知所有订阅者重新拉取（跨进程广播中断后可能丢失事件）"""
+        with self._lock:
+            subscriptions = [s for group in self._subscribers.values() for s in group]
+        for subscription in subscriptions:
+            try:
+                subscription.loop.call_soon_threadsafe(self._put, subscription, RESYNC_EVENT)
+            except RuntimeError:
+                pass
+
+    def _put(self, subscription: Subscription, event: dict) -> None:
+        queue = subscription.queue
+        try:
+            queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # 客户端消费过慢：丢弃积压事件，让客户端重新拉取
+            while not queue.empty():
+                queue.get_nowait()
+            queue.put_nowait(RESYNC_EVENT)
+            with self._lock:
+                self.overflows += 1
+            return
+        with self._lock:
+            self.delivered += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "users": len(self._subscribers),
+                "connections": sum(len(group) for group in self._subscribers.values()),
+                "dispatched": self.dispatched,
+                "delivered": self.delivered,
+                "overflows": self.overflows,
+            }
+
+
+class NotificationBridge:
+    """跨进程广播基类：本地实现在提交后直接分发给本进程"""
+
+    backend = "local"
+
+    def __init__(self, hub: NotificationHub):
+        self.hub = hub
+
+    def start(self) -> None:
+        pass
+
+    def shutdown(self) -> None:
+        pass
+
+    def before_commit(self, session: Session, events: List[dict]) -> None:
+        pass
+
+    def after_commit(self, events: List[dict]) -> None:
+        self.hub.dispatch(events)
+
+    def status(self) -> dict:
+        return {"backend": self.backend}
+
+
+class PostgresNotificationBridge(NotificationBridge):
+    """PostgreSQL LISTEN/NOTIFY 广播，监听连接由后台线程持有"""
+
+    backend = "postgres_listen_notify"
+
+    def __init__(self, hub: NotificationHub, database_url: str, channel: str):
+        super().__init__(hub)
+        self.channel = channel
+        self._engine = create_engine(
+            database_url,
+            poolclass=NullPool,
+            connect_args={"application_name": f"resume-tracker-pubsub:{worker_id()}"}
+        )
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.connected = False
+        self.reconnects = 0
+        self.received = 0
+
+    def before_commit(self, session: Session, events: List[dict]) -> None:
+        payloads = []
+        for event in events:
+            payload = json.dumps(event, ensure_ascii=False, default=str)
+            if len(payload.encode()) > MAX_PAYLOAD_BYTES:
+                # 负载过大时只推送事件类型，客户端收到后重新拉取
+                payload = json.dumps({"user_id": event["user_id"], **RESYNC_EVENT})
+            payloads.append(payload)
+        session.execute(
+            text("SELECT pg_notify(:channel, payload) FROM unnest(CAST(:payloads AS text[])) AS payload"),
+            {"channel": self.channel, "payloads": payloads},
+        )
+
+    def after_commit(self, events: List[dict]) -> None:
+        # 由监听线程收到 NOTIFY 后分发
+        pass
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._listen, name="pubsub-listener", daemon=True)
+        self._thread.start()
+
+    def shutdown(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=RECONNECT_SECONDS + 1)
+            self._thread = None
+
+    def _listen(self) -> None:
+        first = True
+        while not self._stop.is_set():
+            conn = None
+            try:
+                conn = self._engine.raw_connection()
+                dbapi_conn = conn.driver_connection
+                dbapi_conn.autocommit = True
+                with dbapi_conn.cursor() as cursor:
+                    cursor.execute(f'LISTEN "{self.channel}"')
+                self.connected = True
+                if not first:
+                    # 断线期间的事件已丢失
+                    self.reconnects += 1
+                    self.hub.resync_all()
+                first = False
+                while not self._stop.is_set():
+                    if select.select([dbapi_conn], [], [], RECONNECT_SECONDS) == ([], [], []):
+                        continue
+                    dbapi_conn.poll()
+                    events = []
+                    while dbapi_conn.notifies:
+                        notify = dbapi_conn.notifies.pop(0)
+                        try:
+                            events.append(json.loads(notify.payload))
+                        except ValueError:
+                            continue
+                    if events:
+                        self.received += len(events)
+                        self.hub.dispatch(events)
+            except Exception as e:
+                print(f"[PubSub] 监听连接异常: {e}")
+                self._stop.wait(RECONNECT_SECONDS)
+            finally:
+                self.connected = False
+                if conn is not None:
+                    try:
+                        conn.close()
+                    except Exception:
+                        pass
+
+    def status(self) -> dict:
+        return {
+            "backend": self.backend,
+            "channel": self.channel,
+            "connected": self.connected,
+            "reconnects": self.reconnects,
+            "received": self.received,
+        }
+
+
+def create_notification_bridge(hub: NotificationHub) -> NotificationBridge:
+    """根据数据库类型创建跨进程广播实现"""
+    if settings.DATABASE_URL.startswith("postgresql"):
+        return PostgresNotificationBridge(hub, settings.DATABASE_URL, settings.NOTIFICATION_CHANNEL)
+    return NotificationBridge(hub)
+
+
+notification_hub = NotificationHub(settings.NOTIFICATION_STREAM_QUEUE_SIZE)
+notification_bridge = create_notification_bridge(notification_hub)
+
+
+def publish(db: Session, events: List[dict]) -> None:
+    """在事务内发布事件（每个事件包含 user_id / event / data），提交后投递"""
+    db.info.setdefault(PENDING_KEY, []).extend(events)
+
+
+@event.listens_for(Session, "before_commit")
+def _before_commit(session: Session) -> None:
+    events = session.info.get(PENDING_KEY)
+    if events:
+        notification_bridge.before_commit(session, events)
+
+
+@event.listens_for(Session, "after_commit")
+def _after_commit(session: Session) -> None:
+    events = session.info.pop(PENDING_KEY, None)
+    if events:
+        notification_bridge.after_commit(events)
+
+
+@event.listens_for(Session, "after_rollback")
+def _after_rollback(session: Session) -> None:
+    session.info.pop(PENDING_KEY, None)
+
+
+def pubsub_status() -> dict:
+    """推送指标（用于 /metrics）"""
+    return {**notification_bridge.status(), **notification_hub.stats()}
@@ -1,24 +1,123 @@
 """
 安全相关：密码哈希、JWT令牌
 """
+import asyncio
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Callable, Optional, Tuple
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from app.core.config import settings
 
-# 密码上下文
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# 密码上下文（轮数低于/高于 BCRYPT_ROUNDS 的哈希视为需要更新）
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__min_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__max_rounds=settings.BCRYPT_ROUNDS,
+)
+
+
+class PasswordHasherBusy(Exception):
+    """哈希线程池排队已满"""
+
+
+class PasswordHasher:
+    """密码哈希线程池
+
+    bcrypt 计算期间释放 GIL，放在独立的有界线程池中执行：
+    登录高峰只占用这里的线程，不占用处理其他请求的线程池，也不阻塞事件循环。
+    排队数超过上限时直接拒绝，避免请求无限堆积。
+    """
+
+    def __init__(self, workers: int, max_queue: int):
+        self.workers = workers
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password-hash")
+        self._lock = threading.Lock()
+        self._pending = 0
+        self.completed = 0
+        self.rejected = 0
+        self.rehashed = 0
+        self.total_wait_seconds = 0.0
+        self.total_run_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    def _submit(self, fn: Callable, *args) -> Future:
+        with self._lock:
+            if self._pending >= self.workers + self.max_queue:
+                self.rejected += 1
+                raise PasswordHasherBusy()
+            self._pending += 1
+        return self._executor.submit(self._run, time.monotonic(), fn, *args)
+
+    def _run(self, submitted_at: float, fn: Callable, *args):
+        started_at = time.monotonic()
+        try:
+            return fn(*args)
+        finally:
+            finished_at = time.monotonic()
+            wait = started_at - submitted_at
+            with self._lock:
+                self._pending -= 1
+                self.completed += 1
+                self.total_wait_seconds += wait
+                self.total_run_seconds += finished_at - started_at
+                self.max_wait_seconds = max(self.max_wait_seconds, wait)
+
+    async def verify_and_update(self, plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+        """异步验证密码；哈希参数与当前配置不一致时一并返回新哈希"""
+        valid, new_hash = await asyncio.wrap_future(
+            self._submit(pwd_context.verify_and_update, plain_password, hashed_password)
+        )
+        if new_hash:
+            with self._lock:
+                self.rehashed += 1
+        return valid, new_hash
+
+    def hash(self, password: str) -> str:
+        """在线程池中生成密码哈希（同步等待结果，同样受并发上限约束）"""
+        return self._submit(pwd_context.hash, password).result()
+
+    def verify(self, plain_password: str, hashed_password: str) -> bool:
+        """在线程池中验证密码（同步等待结果）"""
+        return self._submit(pwd_context.verify, plain_password, hashed_password).result()
+
+    def stats(self) -> dict:
+        """线程池指标（用于 /metrics）"""
+        with self._lock:
+            completed = self.completed or 1
+            return {
+                "workers": self.workers,
+                "max_queue": self.max_queue,
+                "in_flight": min(self._pending, self.workers),
+                "queued": max(self._pending - self.workers, 0),
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "rehashed": self.rehashed,
+                "avg_wait_ms": round(self.total_wait_seconds / completed * 1000, 1),
+                "max_wait_ms": round(self.max_wait_seconds * 1000, 1),
+                "avg_run_ms": round(self.total_run_seconds / completed * 1000, 1),
+            }
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+password_hasher = PasswordHasher(settings.PASSWORD_HASH_WORKERS, settings.PASSWORD_HASH_MAX_QUEUE)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """验证密码"""
-    return pwd_context.verify(plain_password, hashed_password)
+    return password_hasher.verify(plain_password, hashed_password)
 
 
 def get_password_hash(password: str) -> str:
     """生成密码哈希"""
-    return pwd_context.hash(password)
+    return password_hasher.hash(password)
 
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
@@ -0,0 +1,114 @@
+"""
+简历文件存储 - 内容寻址、流式写入
+
+按块读取上传内容，边写边计算 SHA-256 并检查大小上限，先写入临时文件；
+写完后按内容哈希放到分片目录 blobs/ab/cd/<sha256><扩展名>（原子重命名）。
+相同内容只保存一份：目标文件已存在时直接丢弃临时文件。失败时不会留下半截文件。
+写入数据库失败时由 ResumeBlobService.discard 在确认没有简历引用后删除文件。
+"""
+import hashlib
+import os
+import uuid
+from typing import Awaitable, Callable, Optional
+
+import aiofiles
+import aiofiles.os
+from fastapi import UploadFile
+
+from app.core.config import settings
+
+CHUNK_SIZE = 1024 * 1024  # 每次读写 1MB
+BLOB_DIR = "blobs"
+
+
+class UploadTooLarge(Exception):
+    """上传文件超过 MAX_UPLOAD_SIZE"""
+
+
+class StoredFile:
+    """已保存的文件"""
+
+    def __init__(self, name: str, path: str, size: int, sha256: str, created: bool):
+        self.name = name          # 相对 UPLOAD_DIR 的路径
+        self.path = path
+        self.size = size
+        self.sha256 = sha256
+        self.created = created    # False 表示内容已存在，本次未新增文件
+
+    @property
+    def url(self) -> str:
+        return f"/uploads/{self.name}"
+
+
+def blob_name(sha256: str, file_ext: str) -> str:
+    """内容哈希对应的存储路径（两级分片目录，避免单目录文件过多）"""
+    return f"{BLOB_DIR}/{sha256[:2]}/{sha256[2:4]}/{sha256}{file_ext}"
+
+
+async def save_upload(
+    upload: UploadFile,
+    file_ext: str,
+    max_size: Optional[int] = None,
+    upload_dir: Optional[str] = None
+) -> StoredFile:
+    """流式保存上传文件，超过大小上限时抛出 UploadTooLarge"""
+    max_size = max_size or settings.MAX_UPLOAD_SIZE
+
+    # 客户端声明了大小时提前拒绝，不落盘
+    if upload.size is not None and upload.size > max_size:
+        raise UploadTooLarge()
+    return await save_stream(upload.read, file_ext, max_size, upload_dir)
+
+
+async def save_stream(
+    read: Callable[[int], Awaitable[bytes]],
+    file_ext: str,
+    max_size: Optional[int] = None,
+    upload_dir: Optional[str] = None
+) -> StoredFile:
+    """从异步读取函数流式保存文件（read(n) 返回空字节表示结束）"""
+    max_size = max_size or settings.MAX_UPLOAD_SIZE
+    upload_dir = upload_dir or settings.UPLOAD_DIR
+
+    temp_path = os.path.join(upload_dir, f".{uuid.uuid4()}.part")
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        async with aiofiles.open(temp_path, "wb") as out:
+            while chunk := await read(CHUNK_SIZE):
+                size += len(chunk)
+                if size > max_size:
+                    raise UploadTooLarge()
+                digest.update(chunk)
+                await out.write(chunk)
+
+        sha256 = digest.hexdigest()
+        name = blob_name(sha256, file_ext)
+        path = os.path.join(upload_dir, name)
+        created = not await aiofiles.os.path.exists(path)
+        if created:
+            await aiofiles.os.makedirs(os.path.dirname(path), exist_ok=True)
+            await aiofiles.os.replace(temp_path, path)
+        else:
+            await remove_file(temp_path)
+    except BaseException:
+        await remove_file(temp_path)
+        raise
+    return StoredFile(name, path, size, sha256, created)
+
+
+def resolve_upload_path(resume_url: str) -> Optional[str]:
+    """简历 URL 对应的本地文件路径（不在 UPLOAD_DIR 内或文件不存在时返回 None）"""
+    upload_dir = os.path.realpath(settings.UPLOAD_DIR)
+    path = os.path.realpath(os.path.join(upload_dir, resume_url.removeprefix("/uploads/")))
+    if not path.startswith(upload_dir + os.sep) or not os.path.isfile(path):
+        return None
+    return path
+
+
+async def remove_file(path: str) -> None:
+    """删除文件（不存在时忽略）"""
+    try:
+        await aiofiles.os.remove(path)
+    except FileNotFoundError:
+        pass
@@ -0,0 +1,89 @@
+"""
+简历文本提取（在独立的工作进程中执行）
+
+本模块只依赖标准库与解析库，不导入数据库/应用配置，便于在 spawn 出的进程中快速加载。
+每个工作进程启动时设置地址空间上限（RLIMIT_AS），每个文件用 SIGALRM 限制解析时间。
+"""
+import resource
+import signal
+import time
+from typing import Optional
+
+# 提取结果状态（与 ExtractionStatus 的取值一致）
+DONE = "DONE"
+FAILED = "FAILED"
+TIMEOUT = "TIMEOUT"
+UNSUPPORTED = "UNSUPPORTED"
+
+
+class ExtractionTimeout(Exception):
+    """单个文件解析超时"""
+
+
+def init_worker(memory_limit_mb: Optional[int]) -> None:
+    """工作进程初始化：限制进程内存"""
+    if memory_limit_mb:
+        limit = memory_limit_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+
+def _on_alarm(signum, frame):
+    raise ExtractionTimeout()
+
+
+def _extract_pdf(path: str):
+    from pypdf import PdfReader
+
+    reader = PdfReader(path)
+    pages = [page.extract_text() or "" for page in reader.pages]
+    return "\n".join(pages), len(pages), "pypdf"
+
+
+def _extract_docx(path: str):
+    from docx import Document
+
+    document = Document(path)
+    lines = [paragraph.text for paragraph in document.paragraphs]
+    for table in document.tables:
+        for row in table.rows:
+            lines.append("\t".join(cell.text for cell in row.cells))
+    return "\n".join(lines), None, "python-docx"
+
+
+EXTRACTORS = {
+    ".pdf": _extract_pdf,
+    ".docx": _extract_docx,
+}
+
+
+def extract_text(path: str, file_ext: str, timeout_seconds: int, max_chars: int) -> dict:
+    """提取文件文本，返回 {status, content, parser, page_count, char_count, duration_ms, error}"""
+    extractor = EXTRACTORS.get(file_ext)
+    if extractor is None:
+        return {"status": UNSUPPORTED, "error": f"不支持提取 {file_ext} 文件"}
+
+    start = time.monotonic()
+    previous = signal.signal(signal.SIGALRM, _on_alarm)
+    signal.setitimer(signal.ITIMER_REAL, timeout_seconds)
+    try:
+        content, page_count, parser = extractor(path)
+    except ExtractionTimeout:
+        return {"status": TIMEOUT, "error": f"解析超过 {timeout_seconds} 秒"}
+    except MemoryError:
+        return {"status": FAILED, "error": "解析内存超限"}
+    except Exception as e:
+        return {"status": FAILED, "error": f"{e.__class__.__name__}: {e}"[:500]}
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+    # PostgreSQL 文本不能包含 NUL 字符
+    content = content.replace("\x00", "").strip()[:max_chars]
+    return {
+        "status": DONE,
+        "content": content,
+        "parser": parser,
+        "page_count": page_count,
+        "char_count": len(content),
+        "duration_ms": int((time.monotonic() - start) * 1000),
+    }
@@ -2,14 +2,20 @@
 FastAPI 主入口
 """
 from contextlib import asynccontextmanager
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 import os
 
 from app.core.config import settings
+from app.core.principal_cache import principal_cache
+from app.core.pubsub import notification_bridge, pubsub_status
+from app.core.security import password_hasher
 from app.api import auth, users, departments, resumes, notifications
-from app.services.scheduler import start_scheduler, shutdown_scheduler
+from app.api.deps import require_metrics_access
+from app.services.scheduler import start_scheduler, shutdown_scheduler, scheduler_status
+from app.services.extraction import text_extraction
+from app.services.search import search_backend
 
 
 @asynccontextmanager
@@ -17,9 +23,15 @@ async def lifespan(app: FastAPI):
     """应用生命周期管理"""
     # 启动时
     start_scheduler()
+    search_backend.start()
+    notification_bridge.start()
     yield
     # 关闭时
     shutdown_scheduler()
+    password_hasher.shutdown()
+    text_extraction.shutdown()
+    search_backend.shutdown()
+    notification_bridge.shutdown()
 
 
 # 创建应用
@@ -39,11 +51,12 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# 挂载静态文件（上传的简历）
+# 上传的简历通过 /api/resumes/{id}/file 鉴权下载；SERVE_UPLOADS_STATIC 仅为兼容旧链接保留无鉴权的静态访问
 upload_dir = settings.UPLOAD_DIR
 if not os.path.exists(upload_dir):
     os.makedirs(upload_dir)
-app.mount("/uploads", StaticFiles(directory=upload_dir), name="uploads")
+if settings.SERVE_UPLOADS_STATIC:
+    app.mount("/uploads", StaticFiles(directory=upload_dir), name="uploads")
 
 # 注册路由
 app.include_router(auth.router, prefix="/api/auth", tags=["认证"])
@@ -59,6 +72,19 @@ def health_check():
     return {"status": "healthy", "version": "1.0.0"}
 
 
+@app.get("/metrics", dependencies=[Depends(require_metrics_access)])
+def metrics():
+    """运行指标（管理员或 METRICS_TOKEN）"""
+    return {
+        "scheduler": scheduler_status(),
+        "principal_cache": principal_cache.stats(),
+        "password_hasher": password_hasher.stats(),
+        "text_extraction": text_extraction.stats(),
+        "search": search_backend.stats(),
+        "notification_push": pubsub_status(),
+    }
+
+
 @app.get("/")
 def root():
     """根路径"""
@@ -6,7 +6,13 @@ from app.models.department import Department
 from app.models.resume import Resume
 from app.models.workflow_log import WorkflowLog
 from app.models.notification import Notification
-from app.models.enums import Role, ResumeStatus, Source, ActionType, NotificationType
+from app.models.notification_counter import NotificationCounter
+from app.models.notification_archive import NotificationArchive
+from app.models.resume_stats import ResumeStatsDaily
+from app.models.sla_reminder import SLAReminder
+from app.models.resume_blob import ResumeBlob
+from app.models.resume_text import ResumeText
+from app.models.enums import Role, ResumeStatus, Source, ActionType, NotificationType, ExtractionStatus
 
 __all__ = [
     "User",
@@ -14,9 +20,16 @@ __all__ = [
     "Resume",
     "WorkflowLog",
     "Notification",
+    "NotificationCounter",
+    "NotificationArchive",
+    "ResumeStatsDaily",
+    "SLAReminder",
+    "ResumeBlob",
+    "ResumeText",
     "Role",
     "ResumeStatus",
     "Source",
     "ActionType",
-    "NotificationType"
+    "NotificationType",
+    "ExtractionStatus"
 ]
@@ -62,3 +62,13 @@ class NotificationType(str, enum.Enum):
     WARNING = "WARNING"
     URGENT = "URGENT"
     SUCCESS = "SUCCESS"
+
+
+class ExtractionStatus(str, enum.Enum):
+    """简历文本提取状态"""
+    PENDING = "PENDING"            # 等待提取
+    PROCESSING = "PROCESSING"      # 提取中
+    DONE = "DONE"                  # 已完成
+    FAILED = "FAILED"              # 解析失败
+    TIMEOUT = "TIMEOUT"            # 超时
+    UNSUPPORTED = "UNSUPPORTED"    # 不支持的格式（如 .doc）
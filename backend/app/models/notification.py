@@ -1,7 +1,7 @@
 """
 通知模型
 """
-from sqlalchemy import Column, String, Boolean, ForeignKey, DateTime, Enum, Text
+from sqlalchemy import Column, String, Boolean, ForeignKey, DateTime, Enum, Text, Index, Integer, JSON
 from sqlalchemy.sql import func
 import uuid
 
@@ -13,7 +13,7 @@ class Notification(Base):
     __tablename__ = "notifications"
     
     id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
-    user_id = Column(String(36), ForeignKey("users.id"), nullable=False, index=True)
+    user_id = Column(String(36), ForeignKey("users.id"), nullable=False)
     resume_id = Column(String(36), ForeignKey("resumes.id"), nullable=True)
     title = Column(String(200), nullable=False)
     message = Column(Text, nullable=False)
@@ -26,7 +26,19 @@ class Notification(Base):
     overdue_time = Column(String(50), nullable=True)
     
     link = Column(String(200), nullable=True)
+    
+    # 摘要：同类通知合并后的条数与涉及的简历（见 NotificationService）
+    digest_key = Column(String(50), nullable=True)
+    item_count = Column(Integer, nullable=False, default=1, server_default="1")
+    resume_ids = Column(JSON, nullable=True)
+    
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     
+    __table_args__ = (
+        # 收件箱：WHERE user_id = ? [AND is_read = false] ORDER BY created_at DESC
+        # 已读通知超过保留期后归档（见 NotificationArchiveService），每个用户的行数有上限
+        Index("ix_notifications_user_read_created_at", "user_id", "is_read", "created_at"),
+    )
+    
     def __repr__(self):
         return f"<Notification {self.title} for {self.user_id}>"
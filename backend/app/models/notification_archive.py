@@ -0,0 +1,37 @@
+"""
+通知归档模型（超过保留期的已读通知从 notifications 移入此表）
+"""
+from sqlalchemy import Column, String, Boolean, DateTime, Enum, Text, Index, Integer, JSON
+from sqlalchemy.sql import func
+
+from app.core.database import Base
+from app.models.enums import NotificationType
+
+
+class NotificationArchive(Base):
+    __tablename__ = "notifications_archive"
+    
+    # 与 notifications 相同的列（不加外键，归档数据不影响用户/简历的删除）
+    id = Column(String(36), primary_key=True)
+    user_id = Column(String(36), nullable=False)
+    resume_id = Column(String(36), nullable=True)
+    title = Column(String(200), nullable=False)
+    message = Column(Text, nullable=False)
+    type = Column(Enum(NotificationType), default=NotificationType.INFO)
+    is_read = Column(Boolean, default=True)
+    current_handler = Column(String(100), nullable=True)
+    current_stage = Column(String(50), nullable=True)
+    overdue_time = Column(String(50), nullable=True)
+    link = Column(String(200), nullable=True)
+    digest_key = Column(String(50), nullable=True)
+    item_count = Column(Integer, nullable=False, default=1, server_default="1")
+    resume_ids = Column(JSON, nullable=True)
+    created_at = Column(DateTime(timezone=True))
+    archived_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    __table_args__ = (
+        Index("ix_notifications_archive_user_created_at", "user_id", "created_at"),
+    )
+    
+    def __repr__(self):
+        return f"<NotificationArchive {self.title} for {self.user_id}>"
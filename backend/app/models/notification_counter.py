@@ -0,0 +1,19 @@
+"""
+通知计数模型（每个用户的通知总数/未读数）
+"""
+from sqlalchemy import Column, String, Integer, ForeignKey, DateTime
+from sqlalchemy.sql import func
+
+from app.core.database import Base
+
+
+class NotificationCounter(Base):
+    __tablename__ = "notification_counters"
+    
+    user_id = Column(String(36), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    total = Column(Integer, nullable=False, default=0)
+    unread = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    
+    def __repr__(self):
+        return f"<NotificationCounter {self.user_id}: {self.unread}/{self.total}>"
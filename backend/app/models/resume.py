@@ -1,7 +1,7 @@
 """
 简历模型
 """
-from sqlalchemy import Column, String, Boolean, ForeignKey, DateTime, Enum, Text
+from sqlalchemy import Column, String, Boolean, ForeignKey, DateTime, Enum, Text, Index, Integer, DDL, event, text
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 import uuid
@@ -9,6 +9,20 @@ import uuid
 from app.core.database import Base
 from app.models.enums import ResumeStatus, Source
 
+# 部分索引条件：处于SLA计时状态且尚未标记超期
+# 迁移 0001 中有一份副本（迁移不引用应用代码）；修改时需新增迁移重建索引并在其中定义同名常量，
+# 且与 SLAService.SLA_STATUSES 保持一致（tests/test_resume_indexes.py 检查）
+SLA_PENDING_CONDITION = (
+    "status IN ('WAIT_IDENTIFY', 'WAIT_CONNECTION', 'WAIT_FEEDBACK') AND is_overdue = false"
+)
+
+
+def _trigram_available(ddl, target, bind, **kw) -> bool:
+    """数据库是否提供 pg_trgm 扩展（姓名模糊搜索索引，缺少扩展时跳过）"""
+    return bind.dialect.name == "postgresql" and bind.execute(
+        text("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")
+    ).first() is not None
+
 
 class Resume(Base):
     __tablename__ = "resumes"
@@ -20,6 +34,8 @@ class Resume(Base):
     source = Column(Enum(Source), nullable=False)
     status = Column(Enum(ResumeStatus), default=ResumeStatus.POOL_HR, nullable=False)
     resume_url = Column(String(500), nullable=False)  # 文件路径
+    file_size = Column(Integer, nullable=True)        # 文件字节数
+    file_hash = Column(String(64), nullable=True)     # 文件内容 SHA-256
     
     # 部门关联
     l2_department_id = Column(String(36), ForeignKey("departments.id"), nullable=True)
@@ -35,6 +51,9 @@ class Resume(Base):
     is_overdue = Column(Boolean, default=False)
     overdue_reason = Column(Text, nullable=True)
     
+    # 乐观锁版本号：ORM 更新时带 WHERE version = :读取时的版本，并发修改时更新不到行
+    version = Column(Integer, nullable=False, server_default="1")
+    
     # 时间戳
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
@@ -47,5 +66,51 @@ class Resume(Base):
     expert = relationship("User", foreign_keys=[expert_id])
     workflow_logs = relationship("WorkflowLog", back_populates="resume", order_by="WorkflowLog.created_at.desc()")
     
+    __table_args__ = (
+        # HR全量列表 / 游标分页：ORDER BY created_at DESC, id DESC
+        Index("ix_resumes_created_at_id", "created_at", "id"),
+        # 按状态筛选的列表、HR待分发、统计
+        Index("ix_resumes_status_created_at", "status", "created_at"),
+        # 二层/三层按部门查看列表（无状态筛选）
+        Index("ix_resumes_l2_dept_created_at", "l2_department_id", "created_at"),
+        Index("ix_resumes_l3_dept_created_at", "l3_department_id", "created_at"),
+        # 各角色待办：部门/专家 + 状态
+        Index("ix_resumes_l2_dept_status_created_at", "l2_department_id", "status", "created_at"),
+        Index("ix_resumes_l3_dept_status_created_at", "l3_department_id", "status", "created_at"),
+        Index("ix_resumes_expert_status_created_at", "expert_id", "status", "created_at"),
+        # 二层经理的超期简历（超期行占比很小，只索引超期行）
+        Index(
+            "ix_resumes_l2_dept_overdue",
+            "l2_department_id", "created_at",
+            postgresql_where=text("is_overdue = true"),
+            sqlite_where=text("is_overdue = 1"),
+        ),
+        # 上传时按文件内容查找重复简历
+        Index("ix_resumes_file_hash", "file_hash"),
+        # 搜索：姓名 trigram 模糊匹配
+        Index(
+            "ix_resumes_candidate_name_trgm",
+            "candidate_name",
+            postgresql_using="gin",
+            postgresql_ops={"candidate_name": "gin_trgm_ops"},
+        ).ddl_if(callable_=_trigram_available),
+        # SLA超期扫描：只索引仍在计时的行
+        Index(
+            "ix_resumes_sla_pending",
+            "sla_deadline",
+            postgresql_where=text(SLA_PENDING_CONDITION),
+            sqlite_where=text(SLA_PENDING_CONDITION.replace("false", "0")),
+        ),
+    )
+    
+    __mapper_args__ = {"version_id_col": version}
+    
     def __repr__(self):
         return f"<Resume {self.candidate_name} ({self.status.value})>"
+
+
+event.listen(
+    Resume.__table__,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(callable_=_trigram_available),
+)
@@ -0,0 +1,20 @@
+"""
+简历文件内容模型（内容寻址存储的引用计数）
+"""
+from sqlalchemy import Column, String, DateTime, Integer
+from sqlalchemy.sql import func
+
+from app.core.database import Base
+
+
+class ResumeBlob(Base):
+    __tablename__ = "resume_blobs"
+    
+    hash = Column(String(64), primary_key=True)        # 文件内容 SHA-256
+    path = Column(String(500), nullable=False)         # 相对 UPLOAD_DIR 的存储路径
+    size = Column(Integer, nullable=False)
+    ref_count = Column(Integer, nullable=False, default=0)  # 引用该文件的简历数
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    def __repr__(self):
+        return f"<ResumeBlob {self.hash[:12]} refs={self.ref_count}>"
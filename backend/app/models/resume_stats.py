@@ -0,0 +1,25 @@
+"""
+简历统计汇总模型（按 日期 × 状态 × 来源 × 部门 汇总）
+"""
+from sqlalchemy import Column, String, Integer, Date, Enum
+
+from app.core.database import Base
+from app.models.enums import ResumeStatus, Source
+
+
+class ResumeStatsDaily(Base):
+    __tablename__ = "resume_stats_daily"
+    
+    # 维度（部门为空时存空字符串，保证联合主键唯一）
+    day = Column(Date, primary_key=True)  # 上传日期（UTC）
+    status = Column(Enum(ResumeStatus), primary_key=True)
+    source = Column(Enum(Source), primary_key=True)
+    l2_department_id = Column(String(36), primary_key=True, default="")
+    l3_department_id = Column(String(36), primary_key=True, default="")
+    
+    # 指标
+    count = Column(Integer, nullable=False, default=0)
+    overdue_count = Column(Integer, nullable=False, default=0)
+    
+    def __repr__(self):
+        return f"<ResumeStatsDaily {self.day} {self.status.value} {self.source.value}: {self.count}>"
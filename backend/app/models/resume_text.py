@@ -0,0 +1,37 @@
+"""
+简历文本模型（服务端提取的文本与解析信息，与 resumes 分表避免拖慢列表查询）
+"""
+from sqlalchemy import Column, String, ForeignKey, DateTime, Enum, Text, Integer, Index
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import deferred
+from sqlalchemy.sql import func
+
+from app.core.database import Base
+from app.models.enums import ExtractionStatus
+
+
+class ResumeText(Base):
+    __tablename__ = "resume_texts"
+    
+    resume_id = Column(String(36), ForeignKey("resumes.id"), primary_key=True)
+    status = Column(Enum(ExtractionStatus), default=ExtractionStatus.PENDING, nullable=False, index=True)
+    content = Column(Text, nullable=True)              # 提取出的纯文本
+    parser = Column(String(50), nullable=True)         # 解析器，如 pypdf / python-docx
+    page_count = Column(Integer, nullable=True)
+    char_count = Column(Integer, nullable=True)
+    duration_ms = Column(Integer, nullable=True)       # 提取耗时
+    error = Column(Text, nullable=True)
+    # 全文搜索文档（姓名/联系方式/正文，应用内切词后写入，见 ResumeSearchService）
+    search_vector = deferred(Column(TSVECTOR().with_variant(Text(), "sqlite"), nullable=True))
+    # 与简历在同一事务中创建，即简历的上传时间（搜索按此倒序取候选）
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    
+    __table_args__ = (
+        Index("ix_resume_texts_search_vector", "search_vector", postgresql_using="gin").ddl_if(
+            dialect="postgresql"
+        ),
+    )
+    
+    def __repr__(self):
+        return f"<ResumeText {self.resume_id} {self.status.value}>"
@@ -0,0 +1,28 @@
+"""
+SLA提醒记录模型（即将超期提醒的发送台账）
+"""
+from sqlalchemy import Column, String, ForeignKey, DateTime, Enum, Integer, UniqueConstraint
+from sqlalchemy.sql import func
+import uuid
+
+from app.core.database import Base
+from app.models.enums import ResumeStatus
+
+
+class SLAReminder(Base):
+    __tablename__ = "sla_reminders"
+    
+    id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    resume_id = Column(String(36), ForeignKey("resumes.id"), nullable=False)
+    stage = Column(Enum(ResumeStatus), nullable=False)               # 提醒时所处的SLA阶段
+    sla_deadline = Column(DateTime(timezone=True), nullable=False, index=True)  # 该阶段的截止时间
+    hours_before = Column(Integer, nullable=False)                    # 提前多少小时的提醒
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    __table_args__ = (
+        # 同一阶段（同一截止时间）的同一档提醒只发一次；提醒扫描的 NOT EXISTS 走此索引
+        UniqueConstraint("resume_id", "stage", "sla_deadline", "hours_before", name="uq_sla_reminders_stage"),
+    )
+    
+    def __repr__(self):
+        return f"<SLAReminder {self.resume_id} {self.stage.value} -{self.hours_before}h>"
@@ -20,7 +20,7 @@ class WorkflowLog(Base):
     previous_status = Column(Enum(ResumeStatus), nullable=True)
     new_status = Column(Enum(ResumeStatus), nullable=True)
     comment = Column(Text, nullable=True)
-    metadata = Column(JSON, nullable=True)  # 额外信息
+    metadata_ = Column("metadata", JSON, nullable=True)  # 额外信息（metadata 为 Declarative 保留属性名）
     duration_seconds = Column(Integer, nullable=True)  # 在上一状态停留时间
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     
@@ -3,5 +3,17 @@
 """
 from app.services.workflow import WorkflowService
 from app.services.sla import SLAService
+from app.services.stats import ResumeStatsService
+from app.services.resume_import import ResumeImportService
+from app.services.blobs import ResumeBlobService
+from app.services.notifications import NotificationCounterService, NotificationArchiveService
 
-__all__ = ["WorkflowService", "SLAService"]
+__all__ = [
+    "WorkflowService",
+    "SLAService",
+    "ResumeStatsService",
+    "ResumeImportService",
+    "ResumeBlobService",
+    "NotificationCounterService",
+    "NotificationArchiveService",
+]
@@ -0,0 +1,148 @@
+"""
+简历文件引用计数服务 - 维护 resume_blobs
+"""
+import hashlib
+import os
+from collections import Counter
+from typing import Iterable, List, Tuple
+
+from sqlalchemy import func, insert, select
+from sqlalchemy.orm import Session
+
+from app.core.database import upsert
+from app.core.storage import CHUNK_SIZE, StoredFile, resolve_upload_path
+from app.models import Resume, ResumeBlob
+
+
+class BlobMissing(Exception):
+    """引用的文件已被并发的失败上传清理"""
+
+
+class ResumeBlobService:
+    """简历文件引用计数服务
+
+    相同内容的简历共用一个存储文件，resume_blobs.ref_count 记录引用它的简历数，
+    与简历记录在同一事务内增加。引用与清理都先锁住同一行：
+    - 新增引用后确认文件仍在，否则抛出 BlobMissing（文件已被清理，需重新上传）；
+    - 上传失败撤销文件时，确认计数为 0 才删除。
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def add_references(self, files: Iterable[StoredFile]) -> None:
+        """新简历引用这些文件（同一文件出现多次则计数多次）"""
+        counts = Counter()
+        blobs = {}
+        for stored in files:
+            counts[stored.sha256] += 1
+            blobs[stored.sha256] = stored
+        if not counts:
+            return
+
+        rows = [
+            {
+                "hash": sha256,
+                "path": blobs[sha256].name,
+                "size": blobs[sha256].size,
+                "ref_count": count,
+            }
+            # 按主键排序，避免并发事务以不同顺序加锁导致死锁
+            for sha256, count in sorted(counts.items())
+        ]
+        table = ResumeBlob.__table__
+        stmt = upsert(self.db, table)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.hash],
+            set_={"ref_count": table.c.ref_count + stmt.excluded.ref_count},
+        )
+        self.db.execute(stmt, rows)
+        # 已持有行锁：文件在此之前被失败的上传清理时，本次引用不能提交
+        if any(not os.path.isfile(blobs[sha256].path) for sha256 in counts):
+            raise BlobMissing()
+
+    def discard(self, files: Iterable[StoredFile]) -> None:
+        """
+        撤销写入失败的上传：本次新建的文件在无简历引用时删除（调用方事务须已回滚）
+        
+        内容相同的并发上传可能已引用该文件，因此先锁住（必要时插入计数为 0 的）记录再判断计数。
+        """
+        created = {stored.sha256: stored for stored in files if stored.created}
+        if not created:
+            return
+        table = ResumeBlob.__table__
+        try:
+            for sha256 in sorted(created):
+                stored = created[sha256]
+                stmt = upsert(self.db, table).values(
+                    hash=sha256, path=stored.name, size=stored.size, ref_count=0
+                )
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=[table.c.hash],
+                    set_={"ref_count": table.c.ref_count},
+                ).returning(table.c.ref_count)
+                if self.db.execute(stmt).scalar_one() > 0:
+                    continue
+                self.db.query(ResumeBlob).filter(ResumeBlob.hash == sha256).delete(synchronize_session=False)
+                try:
+                    os.remove(stored.path)
+                except FileNotFoundError:
+                    pass
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+
+    def backfill_hashes(self, batch_size: int = 500) -> Tuple[int, int]:
+        """为内容寻址存储上线前的简历计算文件哈希，返回 (已回填数, 文件缺失数)"""
+        filled = missing = 0
+        last_id = ""
+        while True:
+            rows = self.db.execute(
+                select(Resume.id, Resume.resume_url)
+                .where(Resume.file_hash.is_(None), Resume.id > last_id)
+                .order_by(Resume.id)
+                .limit(batch_size)
+            ).all()
+            if not rows:
+                return filled, missing
+            for row in rows:
+                path = resolve_upload_path(row.resume_url)
+                if not path:
+                    missing += 1
+                    continue
+                digest = hashlib.sha256()
+                with open(path, "rb") as f:
+                    while chunk := f.read(CHUNK_SIZE):
+                        digest.update(chunk)
+                self.db.query(Resume).filter(Resume.id == row.id).update(
+                    {Resume.file_hash: digest.hexdigest(), Resume.file_size: os.path.getsize(path)},
+                    synchronize_session=False
+                )
+                filled += 1
+            self.db.commit()
+            last_id = rows[-1].id
+
+    def rebuild(self) -> int:
+        """根据 resumes 表全量重建引用计数（用于回填或校正），返回文件数"""
+        self.db.query(ResumeBlob).delete(synchronize_session=False)
+        source_query = select(
+            Resume.file_hash,
+            func.min(func.replace(Resume.resume_url, "/uploads/", "")),
+            func.coalesce(func.max(Resume.file_size), 0),
+            func.count(),
+        ).where(Resume.file_hash.isnot(None)).group_by(Resume.file_hash)
+        result = self.db.execute(
+            insert(ResumeBlob).from_select(["hash", "path", "size", "ref_count"], source_query)
+        )
+        return result.rowcount
+
+    def find_duplicates(self, sha256: str, limit: int = 5) -> List[Resume]:
+        """内容相同的已有简历（最早上传的在前）"""
+        return (
+            self.db.query(Resume)
+            .filter(Resume.file_hash == sha256)
+            .order_by(Resume.created_at, Resume.id)
+            .limit(limit)
+            .all()
+        )
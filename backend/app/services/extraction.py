@@ -0,0 +1,244 @@
+"""
+简历文本提取服务 - 上传后在进程池中解析 PDF/DOCX，结果写入 resume_texts
+
+上传事务内写入 PENDING 记录，提交后投递任务；调度线程认领（PENDING → PROCESSING）后
+把解析交给进程池，等待结果写回。进程退出时未完成的记录由 leader 定时分批重新投递，
+多个 worker 同时投递同一记录时只有认领成功的一方执行。
+内容相同的文件（相同 file_hash）已提取过时直接复用结果，不再解析。
+"""
+import multiprocessing
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime, timedelta, timezone
+from typing import Iterable, Optional
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.storage import resolve_upload_path
+from app.core.text_extraction import extract_text, init_worker
+from app.models import Resume, ResumeText
+from app.models.enums import ExtractionStatus
+from app.services.search import ResumeSearchService
+
+# 进程池结果等待的额外宽限（工作进程内部已用 SIGALRM 限时）
+RESULT_GRACE_SECONDS = 5
+# PROCESSING 超过 N 倍超时时间视为进程已退出；PENDING 超过同样时长视为投递丢失，均重新投递
+STALE_PROCESSING_FACTOR = 10
+
+
+class TextExtractionQueue:
+    """简历文本提取队列"""
+
+    def __init__(self):
+        self.workers = settings.TEXT_EXTRACTION_WORKERS
+        self.timeout = settings.TEXT_EXTRACTION_TIMEOUT_SECONDS
+        self._lock = threading.Lock()
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._dispatcher: Optional[ThreadPoolExecutor] = None
+        self._queued = 0
+        self._running = 0
+        self.submitted = 0
+        self.deduplicated = 0
+        self.results = {status.value: 0 for status in ExtractionStatus}
+        self.total_duration_ms = 0
+        self._completed_at = deque()
+
+    def _ensure_started(self) -> None:
+        with self._lock:
+            if self._dispatcher is None:
+                self._dispatcher = ThreadPoolExecutor(
+                    max_workers=self.workers, thread_name_prefix="text-extraction"
+                )
+            if self._pool is None:
+                self._pool = self._create_pool()
+
+    def _create_pool(self) -> ProcessPoolExecutor:
+        # spawn：不继承父进程的线程、连接池等状态
+        return ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=init_worker,
+            initargs=(settings.TEXT_EXTRACTION_MEMORY_MB,),
+            max_tasks_per_child=settings.TEXT_EXTRACTION_TASKS_PER_WORKER,
+        )
+
+    def submit(self, resume_ids: Iterable[str]) -> None:
+        """投递提取任务（在上传事务提交后调用）"""
+        if not settings.TEXT_EXTRACTION_ENABLED:
+            return
+        resume_ids = list(resume_ids)
+        if not resume_ids:
+            return
+        self._ensure_started()
+        with self._lock:
+            dispatcher = self._dispatcher
+            self._queued += len(resume_ids)
+            self.submitted += len(resume_ids)
+        for resume_id in resume_ids:
+            dispatcher.submit(self._process, resume_id)
+
+    def recover(self) -> int:
+        """重新投递遗留的提取任务（由 leader 定时调用），返回投递数量
+
+        超时未完成的 PROCESSING 记录重置为 PENDING；上传已久仍为 PENDING 的记录按上传顺序补投，
+        每次最多补到本进程排队数达到 TEXT_EXTRACTION_RECOVER_BATCH_SIZE，其余留给下一轮。
+        """
+        if not settings.TEXT_EXTRACTION_ENABLED:
+            return 0
+        with self._lock:
+            capacity = settings.TEXT_EXTRACTION_RECOVER_BATCH_SIZE - self._queued
+        db = SessionLocal()
+        try:
+            stale_before = datetime.now(timezone.utc) - timedelta(
+                seconds=self.timeout * STALE_PROCESSING_FACTOR
+            )
+            reset = db.query(ResumeText).filter(
+                ResumeText.status == ExtractionStatus.PROCESSING,
+                ResumeText.updated_at < stale_before
+            ).update({ResumeText.status: ExtractionStatus.PENDING}, synchronize_session=False)
+            db.commit()
+            if reset:
+                print(f"[TextExtraction] 重置 {reset} 条超时未完成的提取任务")
+            resume_ids = [] if capacity <= 0 else [
+                resume_id for (resume_id,) in db.query(ResumeText.resume_id)
+                .filter(
+                    ResumeText.status == ExtractionStatus.PENDING,
+                    ResumeText.created_at < stale_before
+                )
+                .order_by(ResumeText.created_at)
+                .limit(capacity)
+            ]
+        finally:
+            db.close()
+        self.submit(resume_ids)
+        return len(resume_ids)
+
+    def _process(self, resume_id: str) -> None:
+        with self._lock:
+            self._queued -= 1
+            self._running += 1
+        db = SessionLocal()
+        try:
+            # 认领任务：只有把 PENDING 改为 PROCESSING 的一方执行
+            claimed = db.query(ResumeText).filter(
+                ResumeText.resume_id == resume_id,
+                ResumeText.status == ExtractionStatus.PENDING
+            ).update({ResumeText.status: ExtractionStatus.PROCESSING}, synchronize_session=False)
+            db.commit()
+            if not claimed:
+                return
+
+            resume = db.query(Resume.resume_url, Resume.file_hash).filter(Resume.id == resume_id).first()
+            result = self._reuse_existing(db, resume_id, resume.file_hash) if resume.file_hash else None
+            if result is None:
+                result = self._extract(resume.resume_url)
+
+            db.query(ResumeText).filter(ResumeText.resume_id == resume_id).update({
+                ResumeText.status: ExtractionStatus(result["status"]),
+                ResumeText.content: result.get("content"),
+                ResumeText.parser: result.get("parser"),
+                ResumeText.page_count: result.get("page_count"),
+                ResumeText.char_count: result.get("char_count"),
+                ResumeText.duration_ms: result.get("duration_ms"),
+                ResumeText.error: result.get("error"),
+            }, synchronize_session=False)
+            if result["status"] == ExtractionStatus.DONE.value:
+                ResumeSearchService(db).refresh([resume_id])
+            db.commit()
+            self._record(result)
+        except Exception as e:
+            db.rollback()
+            print(f"[TextExtraction] 处理简历 {resume_id} 失败: {e}")
+        finally:
+            db.close()
+            with self._lock:
+                self._running -= 1
+
+    def _reuse_existing(self, db, resume_id: str, file_hash: str) -> Optional[dict]:
+        """相同内容的文件已提取过时复用结果"""
+        existing = (
+            db.query(ResumeText)
+            .join(Resume, Resume.id == ResumeText.resume_id)
+            .filter(
+                Resume.file_hash == file_hash,
+                Resume.id != resume_id,
+                ResumeText.status == ExtractionStatus.DONE
+            )
+            .first()
+        )
+        if existing is None:
+            return None
+        with self._lock:
+            self.deduplicated += 1
+        return {
+            "status": ExtractionStatus.DONE.value,
+            "content": existing.content,
+            "parser": existing.parser,
+            "page_count": existing.page_count,
+            "char_count": existing.char_count,
+            "duration_ms": 0,
+        }
+
+    def _extract(self, resume_url: str) -> dict:
+        """在进程池中解析文件"""
+        path = resolve_upload_path(resume_url)
+        if path is None:
+            return {"status": ExtractionStatus.FAILED.value, "error": "简历文件不存在"}
+        file_ext = os.path.splitext(path)[1].lower()
+        pool = self._pool
+        try:
+            future = pool.submit(
+                extract_text, path, file_ext, self.timeout, settings.TEXT_EXTRACTION_MAX_CHARS
+            )
+            return future.result(timeout=self.timeout + RESULT_GRACE_SECONDS)
+        except FutureTimeoutError:
+            return {"status": ExtractionStatus.TIMEOUT.value, "error": f"解析超过 {self.timeout} 秒"}
+        except BrokenProcessPool:
+            # 工作进程异常退出（如超出内存上限被系统终止），重建进程池
+            with self._lock:
+                if self._pool is pool:
+                    self._pool = self._create_pool()
+            return {"status": ExtractionStatus.FAILED.value, "error": "解析进程异常退出"}
+
+    def _record(self, result: dict) -> None:
+        now = time.monotonic()
+        with self._lock:
+            self.results[result["status"]] += 1
+            self.total_duration_ms += result.get("duration_ms") or 0
+            self._completed_at.append(now)
+            while self._completed_at and self._completed_at[0] < now - 60:
+                self._completed_at.popleft()
+
+    def stats(self) -> dict:
+        """队列指标（用于 /metrics）"""
+        with self._lock:
+            extracted = self.results[ExtractionStatus.DONE.value] - self.deduplicated
+            now = time.monotonic()
+            return {
+                "enabled": settings.TEXT_EXTRACTION_ENABLED,
+                "workers": self.workers,
+                "queued": self._queued,
+                "running": self._running,
+                "submitted": self.submitted,
+                "deduplicated": self.deduplicated,
+                "results": dict(self.results),
+                "completed_last_minute": sum(1 for t in self._completed_at if t >= now - 60),
+                "avg_duration_ms": round(self.total_duration_ms / extracted, 1) if extracted > 0 else 0,
+            }
+
+    def shutdown(self) -> None:
+        with self._lock:
+            dispatcher, pool = self._dispatcher, self._pool
+            self._dispatcher = self._pool = None
+        if dispatcher is not None:
+            dispatcher.shutdown(wait=False, cancel_futures=True)
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+
+text_extraction = TextExtractionQueue()
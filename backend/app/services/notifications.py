@@ -0,0 +1,278 @@
+"""
+通知创建、计数、推送与归档
+
+同类通知在时间窗口内合并为摘要；创建通知、标记已读、删除通知时在同一事务内累加计数，
+/api/notifications/count 只按主键读取一行，与用户的通知总量无关。
+定时对账任务校正计数偏差（如直接修改数据库造成的不一致）。
+超过保留期的已读通知分批移入 notifications_archive，收件箱查询的行数不随历史增长。
+"""
+import uuid
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Tuple
+
+from sqlalchemy import func, insert, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import upsert
+from app.core.pubsub import publish
+from app.models import Notification, NotificationArchive, NotificationCounter
+
+# 推送给客户端的通知字段
+PUSH_FIELDS = (
+    "id", "resume_id", "title", "message", "current_handler", "current_stage", "overdue_time", "link",
+    "item_count", "resume_ids",
+)
+
+
+# 批量插入要求每行的列一致
+ROW_DEFAULTS = {
+    "resume_id": None, "is_read": False, "current_handler": None, "current_stage": None,
+    "overdue_time": None, "link": None, "digest_key": None, "item_count": 1, "resume_ids": None,
+}
+
+
+class NotificationService:
+    """通知创建服务：合并同类通知、计入计数，事务提交后推送
+
+    同一接收人、同一 digest_key 的通知在 NOTIFICATION_DIGEST_WINDOW_MINUTES 内合并为一条未读摘要
+    （item_count 为合并条数，resume_ids 为涉及的简历）；摘要已读或超出窗口后新建一条。
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def create(self, notifications: List[dict]) -> None:
+        """创建通知，notifications 为通知的列值（digest_key 为空的通知不合并）"""
+        window = settings.NOTIFICATION_DIGEST_WINDOW_MINUTES
+        new_rows, groups = [], {}
+        for values in notifications:
+            values = {**ROW_DEFAULTS, **values, "id": values.get("id") or str(uuid.uuid4())}
+            if values.get("digest_key") and window > 0:
+                groups.setdefault((values["user_id"], values["digest_key"]), []).append(values)
+            else:
+                new_rows.append(values)
+
+        merged = []
+        open_digests = self._open_digests(list(groups), window) if groups else {}
+        for key, items in groups.items():
+            digest = open_digests.get(key)
+            if digest is None:
+                digest, items = {**items[0], "item_count": 1, "resume_ids": self._resume_ids([], items[:1])}, items[1:]
+                new_rows.append(self._merge(digest, items) if items else digest)
+            else:
+                merged.append(self._merge(digest, items))
+
+        if new_rows:
+            self.db.execute(insert(Notification), new_rows)
+            NotificationCounterService(self.db).record_created(row["user_id"] for row in new_rows)
+        for digest in merged:
+            self.db.query(Notification).filter(Notification.id == digest["id"]).update({
+                field: digest[field]
+                for field in ("title", "message", "item_count", "resume_ids", "resume_id", "link", "type")
+            }, synchronize_session=False)
+        self._publish(new_rows + merged)
+
+    def _open_digests(self, keys: List[Tuple[str, str]], window: int) -> Dict[Tuple[str, str], dict]:
+        """窗口内仍未读的摘要（加锁，避免并发合并丢失计数）"""
+        since = datetime.now(timezone.utc) - timedelta(minutes=window)
+        rows = (
+            self.db.query(Notification)
+            .filter(
+                Notification.user_id.in_({user_id for user_id, _ in keys}),
+                Notification.is_read == False,
+                Notification.created_at >= since,
+                Notification.digest_key.in_({digest_key for _, digest_key in keys}),
+            )
+            .order_by(Notification.created_at.desc())
+            .with_for_update()
+            .all()
+        )
+        digests = {}
+        for row in rows:
+            key = (row.user_id, row.digest_key)
+            if key in keys and key not in digests:
+                digests[key] = {
+                    column.key: getattr(row, column.key) for column in Notification.__table__.columns
+                }
+        return digests
+
+    @staticmethod
+    def _resume_ids(existing: List[str], items: List[dict]) -> List[str]:
+        resume_ids = list(existing or [])
+        for values in items:
+            if values.get("resume_id") and values["resume_id"] not in resume_ids:
+                resume_ids.append(values["resume_id"])
+        return resume_ids[-settings.NOTIFICATION_DIGEST_MAX_RESUMES:]
+
+    def _merge(self, digest: dict, items: List[dict]) -> dict:
+        """把同类通知并入摘要：标题带条数，正文为最近一条"""
+        latest = items[-1]
+        count = (digest.get("item_count") or 1) + len(items)
+        return {
+            **digest,
+            "item_count": count,
+            "resume_ids": self._resume_ids(digest.get("resume_ids"), items),
+            "title": f"{latest['title']}（{count}条）",
+            "message": latest["message"],
+            "resume_id": latest.get("resume_id"),
+            "link": latest.get("link"),
+            "type": latest["type"],
+        }
+
+    def _publish(self, notifications: List[dict]) -> None:
+        """推送新建/更新的通知（事务提交后送达在线用户，客户端按 id 覆盖）"""
+        now = datetime.now(timezone.utc)
+        publish(self.db, [
+            {
+                "user_id": values["user_id"],
+                "event": "notification",
+                "data": {
+                    **{field: values.get(field) for field in PUSH_FIELDS},
+                    "item_count": values.get("item_count") or 1,
+                    "type": values["type"].value,
+                    "is_read": False,
+                    "created_at": (values.get("created_at") or now).isoformat(),
+                },
+            }
+            for values in notifications
+        ])
+
+
+class NotificationCounterService:
+    """通知计数服务"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get(self, user_id: str) -> Tuple[int, int]:
+        """用户的 (通知总数, 未读数)"""
+        counter = self.db.get(NotificationCounter, user_id)
+        if counter is None:
+            return 0, 0
+        return counter.total, counter.unread
+
+    def record_created(self, user_ids: Iterable[str]) -> None:
+        """新建（未读）通知计入计数，每条通知对应一个 user_id"""
+        self.apply({user_id: (count, count) for user_id, count in Counter(user_ids).items()})
+
+    def apply(self, deltas: Dict[str, Tuple[int, int]]) -> None:
+        """批量累加各用户的 (总数, 未读数) 变化"""
+        rows = [
+            {"user_id": user_id, "total": total, "unread": unread}
+            # 按主键排序，避免并发事务以不同顺序锁行导致死锁
+            for user_id, (total, unread) in sorted(deltas.items())
+            if total or unread
+        ]
+        if not rows:
+            return
+
+        table = NotificationCounter.__table__
+        stmt = upsert(self.db, table)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["user_id"],
+            set_={
+                "total": table.c.total + stmt.excluded.total,
+                "unread": table.c.unread + stmt.excluded.unread,
+                "updated_at": func.now(),
+            },
+        )
+        self.db.execute(stmt, rows)
+
+    def _actual_counts(self):
+        return self.db.query(
+            Notification.user_id,
+            func.count(),
+            func.count().filter(Notification.is_read == False),
+        )
+
+    def reconcile(self) -> int:
+        """对账：根据 notifications 校正计数，返回校正的用户数
+
+        先整体比较找出有偏差的用户，再逐个锁定计数行重新统计并提交。
+        锁定期间并发创建通知的事务会在累加计数时等待，提交后再累加，因此不会丢失。
+        """
+        actual = {
+            user_id: (total, unread)
+            for user_id, total, unread in self._actual_counts().group_by(Notification.user_id)
+        }
+        stored = {
+            user_id: (total, unread)
+            for user_id, total, unread in self.db.query(
+                NotificationCounter.user_id, NotificationCounter.total, NotificationCounter.unread
+            )
+        }
+        self.db.commit()
+        drifted = sorted(
+            user_id for user_id in actual.keys() | stored.keys()
+            if actual.get(user_id, (0, 0)) != stored.get(user_id, (0, 0))
+        )
+
+        table = NotificationCounter.__table__
+        for user_id in drifted:
+            self.db.execute(
+                upsert(self.db, table).on_conflict_do_nothing(index_elements=["user_id"]),
+                {"user_id": user_id, "total": 0, "unread": 0},
+            )
+            counter = (
+                self.db.query(NotificationCounter)
+                .filter(NotificationCounter.user_id == user_id)
+                .with_for_update()
+                .one()
+            )
+            _, counter.total, counter.unread = (
+                self._actual_counts().filter(Notification.user_id == user_id).group_by(Notification.user_id).first()
+                or (user_id, 0, 0)
+            )
+            self.db.commit()
+        return len(drifted)
+
+
+class NotificationArchiveService:
+    """通知归档服务"""
+
+    # 归档表与通知表共有的列
+    COLUMNS = [
+        "id", "user_id", "resume_id", "title", "message", "type", "is_read",
+        "current_handler", "current_stage", "overdue_time", "link", "created_at",
+        "digest_key", "item_count", "resume_ids",
+    ]
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def archive(self, older_than_days: int, batch_size: int = 1000) -> int:
+        """把创建时间早于 N 天的已读通知移入归档表，返回归档数量
+
+        每批在一个事务内完成：锁定一批通知（PostgreSQL 跳过被其他事务锁住的行）、
+        复制到归档表、删除原记录并扣减通知总数，提交后处理下一批。
+        """
+        cutoff = datetime.now(timezone.utc) - timedelta(days=older_than_days)
+        columns = [getattr(Notification, name) for name in self.COLUMNS]
+        total = 0
+        while True:
+            rows = (
+                self.db.query(Notification.id, Notification.user_id)
+                .filter(Notification.is_read == True, Notification.created_at < cutoff)
+                .order_by(Notification.created_at)
+                .limit(batch_size)
+                .with_for_update(skip_locked=True)
+                .all()
+            )
+            if not rows:
+                return total
+            ids = [row.id for row in rows]
+            self.db.execute(
+                insert(NotificationArchive).from_select(
+                    self.COLUMNS, select(*columns).where(Notification.id.in_(ids))
+                )
+            )
+            self.db.query(Notification).filter(Notification.id.in_(ids)).delete(synchronize_session=False)
+            NotificationCounterService(self.db).apply({
+                user_id: (-count, 0) for user_id, count in Counter(row.user_id for row in rows).items()
+            })
+            self.db.commit()
+            total += len(rows)
+            if len(rows) < batch_size:
+                return total
@@ -0,0 +1,80 @@
+"""
+简历批量导入服务 - 按批次批量写入简历与上传日志
+"""
+import uuid
+from datetime import datetime, timezone
+from typing import List, Tuple
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from app.core.storage import StoredFile
+from app.models import Resume, ResumeText, User, WorkflowLog
+from app.models.enums import ActionType, ResumeStatus, Source
+from app.services.blobs import ResumeBlobService
+from app.services.search import ResumeSearchService
+from app.services.stats import ResumeStatsService
+
+
+class ResumeImportService:
+    """简历批量导入服务
+
+    每批简历在一个事务内用批量 INSERT 写入 resumes / workflow_logs / resume_texts（待提取），
+    再做一次文件引用计数、搜索文档生成和统计累加，不逐条 flush，也不回读 ORM 对象。
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def insert_batch(
+        self,
+        items: List[Tuple[str, StoredFile]],
+        source: Source,
+        uploader: User
+    ) -> List[str]:
+        """写入一批已保存的文件 [(候选人姓名, 文件)]，返回对应的简历ID"""
+        if not items:
+            return []
+
+        created_at = datetime.now(timezone.utc)
+        resume_ids = [str(uuid.uuid4()) for _ in items]
+        resume_rows = [
+            {
+                "id": resume_id,
+                "candidate_name": candidate_name,
+                "source": source,
+                "status": ResumeStatus.POOL_HR,
+                "resume_url": stored.url,
+                "file_size": stored.size,
+                "file_hash": stored.sha256,
+                "uploader_id": uploader.id,
+                "is_overdue": False,
+                "created_at": created_at,
+            }
+            for resume_id, (candidate_name, stored) in zip(resume_ids, items)
+        ]
+        log_rows = [
+            {
+                "id": str(uuid.uuid4()),
+                "resume_id": resume_id,
+                "operator_id": uploader.id,
+                "action": ActionType.UPLOAD,
+                "new_status": ResumeStatus.POOL_HR,
+                "created_at": created_at,
+            }
+            for resume_id in resume_ids
+        ]
+
+        try:
+            self.db.execute(insert(Resume), resume_rows)
+            self.db.execute(insert(WorkflowLog), log_rows)
+            self.db.execute(insert(ResumeText), [{"resume_id": resume_id} for resume_id in resume_ids])
+            ResumeBlobService(self.db).add_references(stored for _, stored in items)
+            ResumeSearchService(self.db).refresh(resume_ids)
+            stats_key = (created_at.date(), ResumeStatus.POOL_HR, source, "", "")
+            ResumeStatsService(self.db).apply({stats_key: (len(items), 0)})
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+        return resume_ids
@@ -1,18 +1,63 @@
 """
 定时任务 - SLA检查
+
+按截止时间驱动：每次检查结束后，根据数据库中最早的待处理截止时间（超期或提醒）
+安排下一次唤醒；WorkflowService 设置新的截止时间时也会通知调度器提前唤醒。
+截止时间本身保存在 resumes 表中（ix_resumes_sla_pending 部分索引即持久化的定时器堆），
+进程重启后由 start_scheduler 重新计算下一次唤醒，无需额外恢复。
+
+多 worker 部署时每个进程都启动调度器，但只有选主成功的进程（leader）安排SLA任务；
+leader 退出或连接断开后，其他进程在下一次心跳时接管。
+通知计数对账、旧通知归档、遗留文本提取任务的补投按固定间隔执行，同样只在 leader 进程中运行。
 """
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
 from apscheduler.schedulers.background import BackgroundScheduler
 from sqlalchemy.orm import Session
 
+from app.core.config import settings
 from app.core.database import SessionLocal
+from app.core.leader import create_leader_election
+from app.services.extraction import text_extraction
+from app.services.notifications import NotificationArchiveService, NotificationCounterService
 from app.services.sla import SLAService
 
-scheduler = BackgroundScheduler()
+scheduler = BackgroundScheduler(timezone=timezone.utc)
+leader_election = create_leader_election()
+
+SLA_JOB_ID = "sla_check"
+LEADER_JOB_ID = "leader_heartbeat"
+COUNTER_JOB_ID = "notification_counter_reconcile"
+ARCHIVE_JOB_ID = "notification_archive"
+EXTRACTION_RECOVER_JOB_ID = "text_extraction_recover"
+
+
+def _to_aware_utc(value: datetime) -> datetime:
+    """转换为带时区的UTC时间（APScheduler使用）"""
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def leader_heartbeat_job():
+    """选主心跳：成为 leader 时立即安排SLA检查并补投遗留提取任务，失去领导权时撤销SLA检查"""
+    was_leader = leader_election.is_leader
+    is_leader = leader_election.heartbeat()
+    if is_leader and not was_leader:
+        schedule_next_sla_check(datetime.now(timezone.utc))
+        if scheduler.get_job(EXTRACTION_RECOVER_JOB_ID):
+            scheduler.modify_job(EXTRACTION_RECOVER_JOB_ID, next_run_time=datetime.now(timezone.utc))
+    elif was_leader and not is_leader and scheduler.get_job(SLA_JOB_ID):
+        scheduler.remove_job(SLA_JOB_ID)
 
 
 def check_sla_job():
-    """SLA检查定时任务"""
+    """SLA检查定时任务（仅 leader 执行）"""
+    if not leader_election.is_leader:
+        return
     db = SessionLocal()
+    next_run = None
     try:
         sla_service = SLAService(db)
         
@@ -21,31 +66,143 @@ def check_sla_job():
         if overdue:
             print(f"[SLA] 发现 {len(overdue)} 份超期简历")
         
-        # 检查即将超期（提前4小时提醒）
-        upcoming = sla_service.check_upcoming_deadlines(hours_before=4)
+        # 检查即将超期（按 SLA_REMINDER_HOURS 档位提醒，已提醒过的不再重复）
+        upcoming = sla_service.check_upcoming_deadlines()
         if upcoming:
             print(f"[SLA] 发送 {len(upcoming)} 份即将超期提醒")
         
         db.commit()
+        next_run = sla_service.next_due_time()
     except Exception as e:
         print(f"[SLA] 检查失败: {e}")
         db.rollback()
     finally:
         db.close()
+    
+    if leader_election.is_leader:
+        schedule_next_sla_check(next_run)
+
+
+def reconcile_notification_counters_job():
+    """通知计数对账定时任务（仅 leader 执行）"""
+    if not leader_election.is_leader:
+        return
+    db = SessionLocal()
+    try:
+        fixed = NotificationCounterService(db).reconcile()
+        if fixed:
+            print(f"[Notification] 校正 {fixed} 个用户的通知计数")
+    except Exception as e:
+        print(f"[Notification] 计数对账失败: {e}")
+        db.rollback()
+    finally:
+        db.close()
+
+
+def archive_notifications_job():
+    """旧通知归档定时任务（仅 leader 执行）"""
+    if not leader_election.is_leader:
+        return
+    db = SessionLocal()
+    try:
+        archived = NotificationArchiveService(db).archive(
+            settings.NOTIFICATION_RETENTION_DAYS, settings.NOTIFICATION_ARCHIVE_BATCH_SIZE
+        )
+        if archived:
+            print(f"[Notification] 归档 {archived} 条已读通知")
+    except Exception as e:
+        print(f"[Notification] 归档失败: {e}")
+        db.rollback()
+    finally:
+        db.close()
+
+
+def recover_text_extraction_job():
+    """遗留文本提取任务补投定时任务（仅 leader 执行）"""
+    if not leader_election.is_leader:
+        return
+    try:
+        submitted = text_extraction.recover()
+        if submitted:
+            print(f"[TextExtraction] 重新投递 {submitted} 个提取任务")
+    except Exception as e:
+        print(f"[TextExtraction] 补投失败: {e}")
+
+
+def schedule_next_sla_check(due_time: Optional[datetime] = None):
+    """安排下一次SLA检查
+
+    在下一个截止时间唤醒；最长不超过 SLA_SCHEDULER_MAX_SLEEP_MINUTES，
+    以兜底其他进程新设置的截止时间。
+    """
+    now = datetime.now(timezone.utc)
+    run_date = now + timedelta(minutes=settings.SLA_SCHEDULER_MAX_SLEEP_MINUTES)
+    if due_time is not None:
+        run_date = max(now, min(run_date, _to_aware_utc(due_time)))
+    
+    scheduler.add_job(
+        check_sla_job,
+        'date',
+        run_date=run_date,
+        id=SLA_JOB_ID,
+        replace_existing=True,
+        misfire_grace_time=None
+    )
+
+
+def notify_deadline(deadline: datetime):
+    """登记新的SLA截止时间：若早于当前计划的唤醒时间则提前唤醒（仅 leader 进程）"""
+    if not scheduler.running or not leader_election.is_leader:
+        return
+    
+    due_times = [_to_aware_utc(deadline)]
+    due_times += [due_times[0] - timedelta(hours=hours) for hours in settings.SLA_REMINDER_HOURS]
+    now = datetime.now(timezone.utc)
+    upcoming = [t for t in due_times if t > now]
+    due_time = min(upcoming) if upcoming else now
+    
+    job = scheduler.get_job(SLA_JOB_ID)
+    if job is None or job.next_run_time is None or due_time < job.next_run_time:
+        schedule_next_sla_check(due_time)
 
 
 def start_scheduler():
     """启动定时任务调度器"""
-    # 每30分钟检查一次SLA
+    scheduler.start()
+    # 立即参与选主；成为 leader 后会马上检查一次（处理停机期间到期的简历）并安排下一次唤醒
     scheduler.add_job(
-        check_sla_job,
+        leader_heartbeat_job,
         'interval',
-        minutes=30,
-        id='sla_check',
-        replace_existing=True
+        seconds=settings.SCHEDULER_HEARTBEAT_SECONDS,
+        id=LEADER_JOB_ID,
+        replace_existing=True,
+        next_run_time=datetime.now(timezone.utc)
     )
-    scheduler.start()
-    print("[Scheduler] SLA检查任务已启动，每30分钟执行一次")
+    if settings.NOTIFICATION_COUNTER_RECONCILE_MINUTES > 0:
+        scheduler.add_job(
+            reconcile_notification_counters_job,
+            'interval',
+            minutes=settings.NOTIFICATION_COUNTER_RECONCILE_MINUTES,
+            id=COUNTER_JOB_ID,
+            replace_existing=True
+        )
+    if settings.NOTIFICATION_RETENTION_DAYS > 0:
+        scheduler.add_job(
+            archive_notifications_job,
+            'interval',
+            minutes=settings.NOTIFICATION_ARCHIVE_INTERVAL_MINUTES,
+            id=ARCHIVE_JOB_ID,
+            replace_existing=True
+        )
+    if settings.TEXT_EXTRACTION_ENABLED and settings.TEXT_EXTRACTION_RECOVER_MINUTES > 0:
+        scheduler.add_job(
+            recover_text_extraction_job,
+            'interval',
+            minutes=settings.TEXT_EXTRACTION_RECOVER_MINUTES,
+            id=EXTRACTION_RECOVER_JOB_ID,
+            replace_existing=True
+        )
+    print(f"[Scheduler] 调度器已启动（{leader_election.worker_id}），SLA检查由 leader 按截止时间执行")
 
 
 def shutdown_scheduler():
@@ -53,3 +210,14 @@ def shutdown_scheduler():
     if scheduler.running:
         scheduler.shutdown()
         print("[Scheduler] 已关闭")
+    leader_election.release()
+
+
+def scheduler_status() -> dict:
+    """调度器与选主状态（用于 /metrics）"""
+    job = scheduler.get_job(SLA_JOB_ID) if scheduler.running else None
+    return {
+        **leader_election.status(),
+        "running": scheduler.running,
+        "next_sla_check": job.next_run_time if job else None,
+    }
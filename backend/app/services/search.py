@@ -0,0 +1,538 @@
+"""
+简历全文搜索服务 - 可插拔的搜索后端
+
+中文没有空格分词，建立索引与查询时统一在应用内切词：
+连续汉字切为二元组（姓名、联系方式额外保留单字），英文/数字按词切分，
+邮箱、电话同时保留整体与各段。词条按字段加权：A=姓名，B=联系方式，C=简历正文。
+
+- PostgreSQL：词条写入 resume_texts.search_vector（tsvector + GIN），姓名另用 trigram 模糊匹配；
+- 其他数据库（SQLite/测试环境）：进程内倒排索引（见 search_index），事务提交后增量更新，
+  定期合并写入磁盘。索引只包含本进程提交的变更，其他进程的变更在重启时按更新时间补齐，
+  因此仅适用于单进程部署。
+"""
+import fcntl
+import os
+import re
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import String, bindparam, cast, event, func, literal, or_, select, text, union_all, update
+from sqlalchemy.dialects.postgresql import TSQUERY, TSVECTOR
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models import Resume, ResumeText
+from app.services.search_index import InvertedIndex, term_scores
+
+_CJK = r"㐀-䶿一-鿿豈-﫿"
+_TOKEN_RE = re.compile(rf"[{_CJK}]+|[0-9a-z][0-9a-z@._+\-]*")
+_PART_RE = re.compile(r"[0-9a-z]+")
+_CJK_RE = re.compile(rf"[{_CJK}]")
+
+# tsvector 单个词条最多记录 256 个位置，位置最大 16383
+MAX_POSITIONS = 256
+MAX_POSITION = 16383
+
+# 倒排索引各字段每次出现的得分（对应 tsvector 权重 A/B/C），返回时除以 SCORE_SCALE
+FIELD_SCORES = {"A": 10, "B": 4, "C": 1}
+SCORE_SCALE = 10.0
+
+
+def tokenize(value: Optional[str], unigrams: bool = False) -> List[str]:
+    """切词：汉字二元组（unigrams=True 时附带单字），英文/数字按词，邮箱等保留整体与各段"""
+    tokens = []
+    for match in _TOKEN_RE.finditer((value or "").lower()):
+        word = match.group()
+        if _CJK_RE.match(word):
+            if unigrams or len(word) == 1:
+                tokens.extend(word)
+            tokens.extend(word[i:i + 2] for i in range(len(word) - 1))
+            continue
+        word = word.strip("@._+-")
+        if not word:
+            continue
+        tokens.append(word)
+        parts = _PART_RE.findall(word)
+        if len(parts) > 1:
+            tokens.extend(parts)
+            # 带分隔符的电话号码同时保留纯数字形式
+            digits = "".join(parts)
+            if digits.isdigit() and len(digits) >= 7:
+                tokens.append(digits)
+    return tokens
+
+
+def _quote(token: str) -> str:
+    return "'" + token.replace("\\", "\\\\").replace("'", "''") + "'"
+
+
+def document_fields(
+    candidate_name: Optional[str],
+    email: Optional[str] = None,
+    phone: Optional[str] = None,
+    content: Optional[str] = None
+) -> List[Tuple[Optional[str], str, bool]]:
+    """简历的搜索字段：(文本, 权重, 是否保留汉字单字)"""
+    return [
+        (candidate_name, "A", True),
+        (" ".join(filter(None, [email, phone])), "B", True),
+        ((content or "")[:settings.SEARCH_INDEX_MAX_CHARS], "C", False),
+    ]
+
+
+def build_tsvector(fields: Iterable[Tuple[Optional[str], str, bool]]) -> str:
+    """由 (文本, 权重, 是否保留汉字单字) 生成 tsvector 字面量"""
+    positions: Dict[str, List[str]] = {}
+    position = 0
+    for value, weight, unigrams in fields:
+        for token in tokenize(value, unigrams):
+            position = min(position + 1, MAX_POSITION)
+            entries = positions.setdefault(token, [])
+            if len(entries) < MAX_POSITIONS:
+                entries.append(f"{position}{weight}")
+    return " ".join(f"{_quote(token)}:{','.join(entries)}" for token, entries in positions.items())
+
+
+def query_terms(query: str) -> Tuple[List[str], bool]:
+    """搜索词切词（去重），以及最后一个词条是否按前缀匹配（英文/数字）"""
+    tokens = list(dict.fromkeys(tokenize(query)))
+    return tokens, bool(tokens) and not _CJK_RE.match(tokens[-1])
+
+
+def build_tsquery(query: str) -> Optional[str]:
+    """由搜索词生成 tsquery 字面量（各词条 AND，最后一个英文词按前缀匹配）"""
+    tokens, prefix_last = query_terms(query)
+    if not tokens:
+        return None
+    terms = [_quote(token) for token in tokens]
+    if prefix_last:
+        terms[-1] += ":*"
+    return " & ".join(terms)
+
+
+def build_index_tsquery(query: str) -> Optional[str]:
+    """走 GIN 索引的粗筛条件：每个词只取第一个词条（连续汉字取第一个二元组）
+
+    同一个词切出的二元组高度相关，规划器按相互独立估算会把匹配数低估几个数量级，
+    常见词也去扫 GIN 位图；只用各词的第一个词条估算更接近实际，完整条件另行复核。
+    """
+    tokens, prefix_last = query_terms(query)
+    if not tokens:
+        return None
+    terms = []
+    for match in _TOKEN_RE.finditer(query.lower()):
+        first = tokenize(match.group())[:1]
+        if first and _quote(first[0]) not in terms:
+            terms.append(_quote(first[0]))
+    # 最后一个英文词只切出一个词条时即为完整条件中的前缀词条
+    if prefix_last and terms[-1] == _quote(tokens[-1]):
+        terms[-1] += ":*"
+    return " & ".join(terms)
+
+
+def _document_rows(db: Session, resume_ids: List[str]):
+    return (
+        db.query(Resume.id, Resume.candidate_name, Resume.email, Resume.phone, ResumeText.content)
+        .join(ResumeText, ResumeText.resume_id == Resume.id)
+        .filter(Resume.id.in_(resume_ids))
+        .all()
+    )
+
+
+class SearchBackend:
+    """搜索后端基类：子类实现 refresh / search"""
+
+    backend = "none"
+
+    def start(self) -> None:
+        """应用启动时调用（预热索引）"""
+
+    def shutdown(self) -> None:
+        """应用关闭时调用"""
+
+    def refresh(self, db: Session, resume_ids: List[str]) -> None:
+        """重新生成简历的搜索文档（随调用方事务提交）"""
+        raise NotImplementedError
+
+    def search(self, db: Session, query: str, visibility, limit: int) -> List[Tuple[str, float]]:
+        raise NotImplementedError
+
+    def rebuild(self, db: Session, batch_size: int = 1000) -> int:
+        """按批次重建所有简历的搜索文档，返回简历数"""
+        total = 0
+        last_id = ""
+        while True:
+            resume_ids = [
+                resume_id for (resume_id,) in db.query(ResumeText.resume_id)
+                .filter(ResumeText.resume_id > last_id)
+                .order_by(ResumeText.resume_id)
+                .limit(batch_size)
+            ]
+            if not resume_ids:
+                return total
+            self.refresh(db, resume_ids)
+            db.commit()
+            total += len(resume_ids)
+            last_id = resume_ids[-1]
+
+    def stats(self) -> dict:
+        """搜索后端指标（用于 /metrics）"""
+        return {"backend": self.backend}
+
+
+class PostgresSearchBackend(SearchBackend):
+    """PostgreSQL tsvector + 姓名 trigram"""
+
+    backend = "postgres_tsvector"
+
+    def __init__(self):
+        # 姓名 trigram 索引是否可用（进程内缓存）
+        self._trigram_enabled: Optional[bool] = None
+
+    def refresh(self, db: Session, resume_ids: List[str]) -> None:
+        db.flush()
+        rows = _document_rows(db, resume_ids)
+        if not rows:
+            return
+        db.execute(
+            update(ResumeText.__table__)
+            .where(ResumeText.__table__.c.resume_id == bindparam("rid"))
+            .values(search_vector=cast(bindparam("vector", type_=String), TSVECTOR)),
+            [
+                {"rid": row.id, "vector": ResumeSearchService.document(
+                    row.candidate_name, row.email, row.phone, row.content
+                )}
+                for row in rows
+            ],
+        )
+
+    def _trigram_available(self, db: Session) -> bool:
+        """是否已安装 pg_trgm 并建立了姓名 trigram 索引（结果在进程内缓存）"""
+        if self._trigram_enabled is None:
+            self._trigram_enabled = db.execute(text(
+                "SELECT 1 FROM pg_indexes WHERE indexname = 'ix_resumes_candidate_name_trgm'"
+            )).first() is not None
+        return self._trigram_enabled
+
+    def search(self, db: Session, query: str, visibility, limit: int) -> List[Tuple[str, float]]:
+        tsquery = build_tsquery(query)
+        candidates = settings.SEARCH_MAX_CANDIDATES
+        branches = []
+
+        if tsquery:
+            q = cast(literal(tsquery, String), TSQUERY)
+            coarse = cast(literal(build_index_tsquery(query), String), TSQUERY)
+            vector = ResumeText.search_vector
+            match = (
+                select(
+                    ResumeText.resume_id.label("id"),
+                    vector.label("vector"),
+                    ResumeText.created_at.label("created_at"),
+                )
+                .join(Resume, Resume.id == ResumeText.resume_id)
+                # 完整条件用 ts_match_vq（@@ 的函数形式）复核，不参与索引选择与行数估算
+                .where(vector.op("@@")(coarse), func.ts_match_vq(vector, q))
+            )
+            if visibility is not None:
+                match = match.where(visibility)
+            # 只对最近的 N 个匹配计算得分：常见词按 created_at 倒序扫描，取满即停，
+            # 罕见词走 GIN 索引；ts_rank_cd 不再随匹配总数增长
+            recent = match.order_by(ResumeText.created_at.desc()).limit(candidates).subquery()
+            branches.append(select(
+                recent.c.id,
+                func.ts_rank_cd(recent.c.vector, q).label("score"),
+                recent.c.created_at,
+            ))
+
+        # 姓名模糊匹配（错别字、拼写差异）
+        name = query.strip()
+        if name and self._trigram_available(db):
+            similar = (
+                select(
+                    Resume.id.label("id"),
+                    Resume.candidate_name.label("name"),
+                    Resume.created_at.label("created_at"),
+                )
+                .where(Resume.candidate_name.op("%")(name))
+            )
+            if visibility is not None:
+                similar = similar.where(visibility)
+            recent = similar.order_by(Resume.created_at.desc()).limit(candidates).subquery()
+            branches.append(select(
+                recent.c.id,
+                func.similarity(recent.c.name, name).label("score"),
+                recent.c.created_at,
+            ))
+
+        if not branches:
+            return []
+        matches = union_all(*branches).subquery()
+        score = func.sum(matches.c.score).label("score")
+        rows = db.execute(
+            select(matches.c.id, score)
+            .group_by(matches.c.id)
+            .order_by(score.desc(), func.max(matches.c.created_at).desc(), matches.c.id.desc())
+            .limit(limit)
+        ).all()
+        return [(row.id, float(row.score)) for row in rows]
+
+
+class InvertedIndexSearchBackend(SearchBackend):
+    """进程内倒排索引（SQLite/测试环境）
+
+    refresh 在事务内计算词条，暂存在 Session.info 中，提交后才写入索引（回滚则丢弃）；
+    增量累计到阈值后由后台线程合并写盘，不占用提交请求的时间。
+    可见范围仍由数据库判断：按得分顺序分批取候选，过滤出当前用户可见的简历。
+    索引只在单个进程内维护，启动时对索引文件加排他锁，同一文件被其他进程占用时拒绝启动。
+    """
+
+    backend = "inverted_index"
+    PENDING_KEY = "search_index_pending"
+    # 启动补齐时向前多取的时间（时钟误差、SQLite 时间戳精度）
+    CATCH_UP_MARGIN = timedelta(minutes=5)
+    VISIBILITY_BATCH_SIZE = 500
+
+    def __init__(self, path: str, save_every: int):
+        self.path = path
+        self.save_every = save_every
+        self.index = InvertedIndex()
+        # 每个实例单独暂存，多个实例（如重建脚本、测试）不会取走彼此的变更
+        self.pending_key = f"{self.PENDING_KEY}:{id(self)}"
+        self._lock = threading.Lock()
+        self._started = False
+        self._saving = False
+        self._save_thread: Optional[threading.Thread] = None
+        self._lock_fd: Optional[int] = None
+        self.saves = 0
+        self.last_save_seconds: Optional[float] = None
+        event.listen(Session, "after_commit", self._after_commit)
+        event.listen(Session, "after_rollback", self._after_rollback)
+
+    # ---------- 生命周期 ----------
+
+    def start(self) -> None:
+        """加载磁盘索引并补齐上次保存后的变更；没有可用索引时全量构建"""
+        with self._lock:
+            if self._started:
+                return
+            self._claim()
+            started_at = time.time()
+            index = InvertedIndex.load(self.path)
+            db = SessionLocal()
+            try:
+                if index is None:
+                    index = InvertedIndex()
+                    self._index_all(db, index)
+                else:
+                    self._catch_up(db, index)
+            finally:
+                db.close()
+            index.built_at = started_at
+            self.index = index
+            self._started = True
+        self._save()
+
+    def shutdown(self) -> None:
+        if self._save_thread is not None:
+            self._save_thread.join()
+        if self._started and self.index.delta_documents:
+            self._save()
+        self.index.close()
+        if self._lock_fd is not None:
+            os.close(self._lock_fd)
+            self._lock_fd = None
+
+    def _claim(self) -> None:
+        """独占索引文件：多个进程写同一文件会互相覆盖，各自的内存索引也看不到其他进程的变更"""
+        if self._lock_fd is not None:
+            return
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        fd = os.open(f"{self.path}.lock", os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            raise RuntimeError(
+                f"倒排索引 {self.path} 已被其他进程使用：进程内倒排索引只支持单 worker，"
+                "多 worker 部署请使用 PostgreSQL 搜索后端"
+            )
+        self._lock_fd = fd
+
+    def rebuild(self, db: Session, batch_size: int = 1000) -> int:
+        with self._lock:
+            self._claim()
+            started_at = time.time()
+            index = InvertedIndex()
+            total = self._index_all(db, index, batch_size)
+            index.built_at = started_at
+            self.index = index
+            self._started = True
+        self._save()
+        return total
+
+    def _index_all(self, db: Session, index: InvertedIndex, batch_size: int = 1000) -> int:
+        total = 0
+        last_id = ""
+        while True:
+            resume_ids = [
+                resume_id for (resume_id,) in db.query(ResumeText.resume_id)
+                .filter(ResumeText.resume_id > last_id)
+                .order_by(ResumeText.resume_id)
+                .limit(batch_size)
+            ]
+            if not resume_ids:
+                return total
+            for resume_id, scores in self._documents(db, resume_ids).items():
+                index.add(resume_id, scores)
+            total += len(resume_ids)
+            last_id = resume_ids[-1]
+
+    def _catch_up(self, db: Session, index: InvertedIndex, batch_size: int = 1000) -> None:
+        since = datetime.utcfromtimestamp(index.built_at) - self.CATCH_UP_MARGIN
+        changed = [
+            resume_id for (resume_id,) in db.query(Resume.id)
+            .outerjoin(ResumeText, ResumeText.resume_id == Resume.id)
+            .filter(or_(
+                Resume.created_at >= since,
+                Resume.updated_at >= since,
+                ResumeText.updated_at >= since,
+            ))
+        ]
+        for start in range(0, len(changed), batch_size):
+            for resume_id, scores in self._documents(db, changed[start:start + batch_size]).items():
+                index.add(resume_id, scores)
+
+    def _save(self, background: bool = False) -> None:
+        with self._lock:
+            if self._saving:
+                return
+            self._saving = True
+        if background:
+            self._save_thread = threading.Thread(target=self._write, name="search-index-save", daemon=True)
+            self._save_thread.start()
+        else:
+            self._write()
+
+    def _write(self) -> None:
+        try:
+            start = time.monotonic()
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self.index.save(self.path, self.index.built_at)
+            self.saves += 1
+            self.last_save_seconds = round(time.monotonic() - start, 3)
+        except Exception as e:
+            print(f"[SearchIndex] 保存索引失败: {e}")
+        finally:
+            self._saving = False
+
+    # ---------- 增量更新 ----------
+
+    @staticmethod
+    def _documents(db: Session, resume_ids: List[str]) -> Dict[str, Dict[str, int]]:
+        return {
+            row.id: term_scores(
+                (tokenize(value, unigrams), FIELD_SCORES[weight])
+                for value, weight, unigrams in document_fields(
+                    row.candidate_name, row.email, row.phone, row.content
+                )
+            )
+            for row in _document_rows(db, resume_ids)
+        }
+
+    def refresh(self, db: Session, resume_ids: List[str]) -> None:
+        db.flush()
+        db.info.setdefault(self.pending_key, {}).update(self._documents(db, resume_ids))
+
+    def _after_commit(self, session: Session) -> None:
+        pending = session.info.pop(self.pending_key, None)
+        # 未启动时不写入：启动时会按更新时间补齐
+        if not pending or not self._started:
+            return
+        for resume_id, scores in pending.items():
+            self.index.add(resume_id, scores)
+        if self.index.delta_documents >= self.save_every:
+            self._save(background=True)
+
+    def _after_rollback(self, session: Session) -> None:
+        session.info.pop(self.pending_key, None)
+
+    # ---------- 查询 ----------
+
+    def search(self, db: Session, query: str, visibility, limit: int) -> List[Tuple[str, float]]:
+        self.start()
+        tokens, prefix_last = query_terms(query)
+        ranked = self.index.search(tokens, prefix_last)
+        hits = []
+        for start in range(0, len(ranked), self.VISIBILITY_BATCH_SIZE):
+            batch = ranked[start:start + self.VISIBILITY_BATCH_SIZE]
+            stmt = select(Resume.id).where(Resume.id.in_([resume_id for resume_id, _ in batch]))
+            if visibility is not None:
+                stmt = stmt.where(visibility)
+            visible = set(db.execute(stmt).scalars())
+            hits.extend((resume_id, score / SCORE_SCALE) for resume_id, score in batch if resume_id in visible)
+            if len(hits) >= limit:
+                break
+        return hits[:limit]
+
+    def stats(self) -> dict:
+        return {
+            "backend": self.backend,
+            "path": self.path,
+            "started": self._started,
+            "saves": self.saves,
+            "last_save_seconds": self.last_save_seconds,
+            **self.index.stats(),
+        }
+
+
+def create_search_backend() -> SearchBackend:
+    """根据配置或数据库类型创建搜索后端"""
+    backend = settings.SEARCH_BACKEND or (
+        "postgres" if settings.DATABASE_URL.startswith("postgresql") else "inverted_index"
+    )
+    if backend == "postgres":
+        return PostgresSearchBackend()
+    if backend == "inverted_index":
+        path = settings.SEARCH_INDEX_PATH or os.path.join(
+            tempfile.gettempdir(), "resume_tracker_search.idx"
+        )
+        return InvertedIndexSearchBackend(path, settings.SEARCH_INDEX_SAVE_EVERY)
+    raise ValueError(f"未知的搜索后端: {backend}")
+
+
+search_backend = create_search_backend()
+
+
+class ResumeSearchService:
+    """简历全文搜索服务"""
+
+    def __init__(self, db: Session):
+        self.db = db
+        self.backend = search_backend
+
+    @staticmethod
+    def document(
+        candidate_name: Optional[str],
+        email: Optional[str] = None,
+        phone: Optional[str] = None,
+        content: Optional[str] = None
+    ) -> str:
+        """简历的搜索文档（tsvector 字面量）"""
+        return build_tsvector(document_fields(candidate_name, email, phone, content))
+
+    def refresh(self, resume_ids: Iterable[str]) -> None:
+        """重新生成简历的搜索文档（姓名、联系方式或正文变化后调用，随调用方事务提交）"""
+        resume_ids = list(resume_ids)
+        if resume_ids:
+            self.backend.refresh(self.db, resume_ids)
+
+    def search(self, query: str, visibility=None, limit: int = 20) -> List[Tuple[str, float]]:
+        """搜索简历，返回按相关度排序的 [(简历ID, 得分)]
+
+        visibility 为角色可见范围条件（None 表示全部可见）。
+        """
+        return self.backend.search(self.db, query, visibility, limit)
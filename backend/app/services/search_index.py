@@ -0,0 +1,300 @@
+"""
+进程内倒排索引 - 无全文检索能力的数据库（SQLite/测试环境）使用
+
+索引由两部分组成：
+- 基础段：磁盘文件，倒排表按词条连续存放（uint32 文档号 + uint8 得分），
+  加载时通过 mmap 映射，查询直接在映射内存上切片，不复制到 Python 对象；
+- 增量段：内存中的 array，记录加载后新增/更新的文档。
+文档更新只追加新文档号并把旧文档号标记删除；保存时合并两段、去掉已删除文档并重新编号，
+写入临时文件后原子替换。
+
+文件格式（本机字节序）：
+    header: magic(8) | byteorder(1) | pad(3) | doc_count u32 | term_count u32 | posting_count u32 | built_at f64
+    doc ids: doc_count × 36 字节（简历ID，ASCII）
+    terms:   term_count × (u16 长度 | UTF-8 词条 | u32 起始位置 | u32 数量)，按词条排序
+    postings: 对齐到 4 字节后 posting_count × u32 文档号，再 posting_count × u8 得分
+"""
+import bisect
+import mmap
+import os
+import struct
+import sys
+import threading
+from array import array
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+MAGIC = b"RTIDX001"
+HEADER = struct.Struct("=8sc3xIIId")
+TERM_ENTRY = struct.Struct("=II")
+DOC_ID_SIZE = 36
+# 前缀匹配最多展开的词条数
+MAX_PREFIX_EXPANSIONS = 64
+
+
+class InvertedIndex:
+    """倒排索引（线程安全）"""
+
+    def __init__(self):
+        self.built_at = 0.0
+        self._lock = threading.RLock()
+        self._doc_ids: List[str] = []             # 文档号 -> 简历ID
+        self._doc_nos: Dict[str, int] = {}        # 简历ID -> 当前文档号
+        self._deleted: Set[int] = set()
+        self._base_terms: Dict[str, Tuple[int, int]] = {}
+        self._base_docs: Optional[memoryview] = None
+        self._base_scores: Optional[memoryview] = None
+        self._mmap: Optional[mmap.mmap] = None
+        self._delta: Dict[str, Tuple[array, array]] = {}
+        self._delta_docs = 0
+        self._vocabulary: Optional[List[str]] = None
+
+    # ---------- 写入 ----------
+
+    def add(self, resume_id: str, term_scores: Dict[str, int]) -> None:
+        """新增或替换一份文档"""
+        with self._lock:
+            self._remove(resume_id)
+            doc_no = len(self._doc_ids)
+            self._doc_ids.append(resume_id)
+            self._doc_nos[resume_id] = doc_no
+            self._delta_docs += 1
+            for term, score in term_scores.items():
+                postings = self._delta.get(term)
+                if postings is None:
+                    postings = self._delta[term] = (array("I"), array("B"))
+                    if term not in self._base_terms:
+                        self._vocabulary = None
+                postings[0].append(doc_no)
+                postings[1].append(min(score, 255))
+
+    def remove(self, resume_id: str) -> None:
+        with self._lock:
+            self._remove(resume_id)
+
+    def _remove(self, resume_id: str) -> None:
+        doc_no = self._doc_nos.pop(resume_id, None)
+        if doc_no is not None:
+            self._deleted.add(doc_no)
+
+    # ---------- 查询 ----------
+
+    def _postings(self, term: str) -> Dict[int, int]:
+        result = {}
+        base = self._base_terms.get(term)
+        if base is not None:
+            start, count = base
+            docs = self._base_docs[start:start + count]
+            scores = self._base_scores[start:start + count]
+            result.update(zip(docs, scores))
+        delta = self._delta.get(term)
+        if delta is not None:
+            result.update(zip(delta[0], delta[1]))
+        for doc_no in self._deleted.intersection(result):
+            del result[doc_no]
+        return result
+
+    def _expand_prefix(self, prefix: str) -> List[str]:
+        if self._vocabulary is None:
+            self._vocabulary = sorted(set(self._base_terms) | set(self._delta))
+        start = bisect.bisect_left(self._vocabulary, prefix)
+        terms = []
+        for term in self._vocabulary[start:start + MAX_PREFIX_EXPANSIONS]:
+            if not term.startswith(prefix):
+                break
+            terms.append(term)
+        return terms
+
+    def search(self, terms: List[str], prefix_last: bool = False) -> List[Tuple[str, int]]:
+        """所有词条都出现的文档，按得分、文档号（越新越大）降序"""
+        if not terms:
+            return []
+        with self._lock:
+            matches = []
+            for i, term in enumerate(terms):
+                if prefix_last and i == len(terms) - 1:
+                    postings = {}
+                    for expanded in self._expand_prefix(term):
+                        for doc_no, score in self._postings(expanded).items():
+                            postings[doc_no] = max(postings.get(doc_no, 0), score)
+                else:
+                    postings = self._postings(term)
+                if not postings:
+                    return []
+                matches.append(postings)
+
+            matches.sort(key=len)
+            scores = dict(matches[0])
+            for postings in matches[1:]:
+                scores = {
+                    doc_no: score + postings[doc_no]
+                    for doc_no, score in scores.items()
+                    if doc_no in postings
+                }
+                if not scores:
+                    return []
+            ranked = sorted(scores.items(), key=lambda item: (item[1], item[0]), reverse=True)
+            return [(self._doc_ids[doc_no], score) for doc_no, score in ranked]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "documents": len(self._doc_nos),
+                "base_terms": len(self._base_terms),
+                "delta_terms": len(self._delta),
+                "delta_documents": self._delta_docs,
+                "deleted_documents": len(self._deleted),
+            }
+
+    @property
+    def delta_documents(self) -> int:
+        return self._delta_docs
+
+    # ---------- 持久化 ----------
+
+    def save(self, path: str, built_at: float) -> None:
+        """合并基础段与增量段写入磁盘，并切换为映射新文件
+
+        合并与写盘基于加锁时复制的快照进行，期间查询和写入不受阻塞；
+        切换到新文件后重放快照之后新增/删除的文档。
+        """
+        with self._lock:
+            snapshot = self._snapshot()
+        snapshot._write(path, built_at)
+        with self._lock:
+            # 快照之后追加的文档号都不小于 first_new，从增量段收集它们的词条得分
+            first_new = len(snapshot._doc_ids)
+            added = {doc_no: (resume_id, {}) for resume_id, doc_no in self._doc_nos.items() if doc_no >= first_new}
+            for term, (docs, scores) in self._delta.items():
+                for i in range(bisect.bisect_left(docs, first_new), len(docs)):
+                    if docs[i] in added:
+                        added[docs[i]][1][term] = scores[i]
+            removed = set(snapshot._doc_nos).difference(self._doc_nos)
+            self._load(path)
+            for resume_id in removed:
+                self._remove(resume_id)
+            for resume_id, term_scores in added.values():
+                self.add(resume_id, term_scores)
+
+    def _snapshot(self) -> "InvertedIndex":
+        """当前内容的只读副本（基础段共享映射，增量段复制）"""
+        snapshot = InvertedIndex()
+        snapshot._doc_ids = list(self._doc_ids)
+        snapshot._doc_nos = dict(self._doc_nos)
+        snapshot._deleted = set(self._deleted)
+        snapshot._base_terms = self._base_terms
+        snapshot._base_docs = self._base_docs
+        snapshot._base_scores = self._base_scores
+        snapshot._delta = {term: (docs[:], scores[:]) for term, (docs, scores) in self._delta.items()}
+        return snapshot
+
+    def _write(self, path: str, built_at: float) -> None:
+        live = sorted(self._doc_nos.items(), key=lambda item: item[1])
+        renumber = {doc_no: new_no for new_no, (_, doc_no) in enumerate(live)}
+        terms = sorted(set(self._base_terms) | set(self._delta))
+
+        term_table = bytearray()
+        term_count = 0
+        all_docs, all_scores = array("I"), array("B")
+        for term in terms:
+            postings = self._postings(term)
+            if not postings:
+                continue
+            start = len(all_docs)
+            for doc_no in sorted(postings, key=renumber.__getitem__):
+                all_docs.append(renumber[doc_no])
+                all_scores.append(postings[doc_no])
+            encoded = term.encode("utf-8")
+            term_table += struct.pack("=H", len(encoded)) + encoded
+            term_table += TERM_ENTRY.pack(start, len(all_docs) - start)
+            term_count += 1
+
+        doc_table = b"".join(resume_id.encode("ascii").ljust(DOC_ID_SIZE) for resume_id, _ in live)
+        header = HEADER.pack(
+            MAGIC, sys.byteorder[0].encode(), len(live), term_count, len(all_docs), built_at
+        )
+        body = header + doc_table + bytes(term_table)
+        padding = b"\0" * (-len(body) % 4)
+
+        temp_path = f"{path}.tmp"
+        with open(temp_path, "wb") as f:
+            f.write(body + padding)
+            f.write(all_docs.tobytes())
+            f.write(all_scores.tobytes())
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> Optional["InvertedIndex"]:
+        """从磁盘加载索引；文件不存在或格式不符时返回 None"""
+        index = cls()
+        try:
+            index._load(path)
+        except (FileNotFoundError, ValueError, struct.error):
+            return None
+        return index
+
+    def _load(self, path: str) -> None:
+        with open(path, "rb") as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, byteorder, doc_count, term_count, posting_count, built_at = HEADER.unpack_from(mapped, 0)
+        if magic != MAGIC or byteorder != sys.byteorder[0].encode():
+            mapped.close()
+            raise ValueError("索引文件格式不匹配")
+
+        offset = HEADER.size
+        doc_ids = [
+            mapped[offset + i * DOC_ID_SIZE:offset + (i + 1) * DOC_ID_SIZE].decode("ascii").rstrip()
+            for i in range(doc_count)
+        ]
+        offset += doc_count * DOC_ID_SIZE
+
+        base_terms = {}
+        for _ in range(term_count):
+            (length,) = struct.unpack_from("=H", mapped, offset)
+            offset += 2
+            term = mapped[offset:offset + length].decode("utf-8")
+            offset += length
+            base_terms[term] = TERM_ENTRY.unpack_from(mapped, offset)
+            offset += TERM_ENTRY.size
+        offset += -offset % 4
+
+        view = memoryview(mapped)
+        if self._mmap is not None:
+            self._release_mmap()
+        self._mmap = mapped
+        self._base_docs = view[offset:offset + posting_count * 4].cast("I")
+        self._base_scores = view[offset + posting_count * 4:offset + posting_count * 5]
+        self._base_terms = base_terms
+        self._doc_ids = doc_ids
+        self._doc_nos = {resume_id: doc_no for doc_no, resume_id in enumerate(doc_ids)}
+        self._deleted = set()
+        self._delta = {}
+        self._delta_docs = 0
+        self._vocabulary = None
+        self.built_at = built_at
+
+    def _release_mmap(self) -> None:
+        self._base_docs.release()
+        self._base_scores.release()
+        self._base_docs = self._base_scores = None
+        try:
+            self._mmap.close()
+        except BufferError:
+            # 仍有查询持有切片时由垃圾回收关闭
+            pass
+        self._mmap = None
+
+    def close(self) -> None:
+        with self._lock:
+            if self._mmap is not None:
+                self._release_mmap()
+
+
+def term_scores(fields: Iterable[Tuple[List[str], int]]) -> Dict[str, int]:
+    """由 (词条列表, 每次出现的得分) 计算各词条得分"""
+    scores: Dict[str, int] = {}
+    for tokens, weight in fields:
+        for token in tokens:
+            scores[token] = scores.get(token, 0) + weight
+    return scores
@@ -1,13 +1,25 @@
 """
 SLA检查服务 - 超期检测和提醒
 """
-from datetime import datetime
-from typing import List
-from sqlalchemy.orm import Session
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+from sqlalchemy import and_, exists, func, insert, select, update
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Session, joinedload
 
-from app.models import Resume, User, Notification
+from app.models import Resume, User, SLAReminder
 from app.models.enums import ResumeStatus, Role, NotificationType
 from app.core.config import settings
+from app.services.notifications import NotificationService
+from app.services.stats import ResumeStatsService
+
+
+def _as_naive_utc(value: datetime) -> datetime:
+    """统一为不带时区的UTC时间，便于与 datetime.utcnow() 比较"""
+    if value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
 
 
 class SLAService:
@@ -23,41 +35,120 @@ class SLAService:
     def __init__(self, db: Session):
         self.db = db
     
-    def check_overdue_resumes(self) -> List[Resume]:
-        """检查所有超期简历"""
+    def check_overdue_resumes(self, batch_size: Optional[int] = None) -> List[Row]:
+        """检查所有超期简历（集合操作）
+
+        每批：一条 UPDATE ... RETURNING 标记超期，一条查询取责任人名称，
+        一条查询取相关二层经理，一条批量 INSERT 写通知；语句数只与批次数有关。
+        """
+        batch_size = batch_size or settings.SLA_SWEEP_BATCH_SIZE
         now = datetime.utcnow()
-        overdue_resumes = self.db.query(Resume).filter(
+        pending = and_(
             Resume.status.in_(self.SLA_STATUSES),
             Resume.sla_deadline < now,
             Resume.is_overdue == False
-        ).all()
+        )
         
-        for resume in overdue_resumes:
-            resume.is_overdue = True
-            self._send_overdue_notification(resume)
-        
-        if overdue_resumes:
+        overdue_rows = []
+        while True:
+            due_ids = select(Resume.id).where(pending).limit(batch_size).scalar_subquery()
+            rows = self.db.execute(
+                update(Resume)
+                .where(Resume.id.in_(due_ids), pending)
+                # 递增版本号，读取了旧状态的并发流转提交时会发生冲突
+                .values(is_overdue=True, version=Resume.version + 1)
+                .returning(
+                    Resume.id, Resume.candidate_name, Resume.status, Resume.source,
+                    Resume.l2_department_id, Resume.l3_department_id,
+                    Resume.current_handler_id, Resume.expert_id,
+                    Resume.sla_deadline, Resume.is_overdue, Resume.created_at
+                )
+                .execution_options(synchronize_session=False)
+            ).all()
+            if not rows:
+                break
+            
+            self._record_overdue_stats(rows)
+            self._send_overdue_notifications(rows)
             self.db.commit()
+            overdue_rows.extend(rows)
+            
+            if len(rows) < batch_size:
+                break
         
-        return overdue_resumes
+        return overdue_rows
     
-    def check_upcoming_deadlines(self, hours_before: int = 4) -> List[Resume]:
-        """检查即将超期的简历（提前提醒）"""
-        from datetime import timedelta
+    def check_upcoming_deadlines(self, hours_before: Optional[int] = None) -> List[Resume]:
+        """检查即将超期的简历（提前提醒）
+
+        提醒档位取 settings.SLA_REMINDER_HOURS（或指定的 hours_before）。
+        每份简历在每个SLA阶段、每个档位只提醒一次，已发送的记录在 sla_reminders 台账中；
+        同一次扫描命中多个档位时只发一条提醒。
+        """
         now = datetime.utcnow()
-        threshold = now + timedelta(hours=hours_before)
+        thresholds = sorted({hours_before} if hours_before else set(settings.SLA_REMINDER_HOURS))
         
-        upcoming_resumes = self.db.query(Resume).filter(
-            Resume.status.in_(self.SLA_STATUSES),
-            Resume.sla_deadline > now,
-            Resume.sla_deadline <= threshold,
-            Resume.is_overdue == False
-        ).all()
+        reminded = {}
+        ledger = []
+        for hours in thresholds:
+            already_sent = exists().where(
+                SLAReminder.resume_id == Resume.id,
+                SLAReminder.stage == Resume.status,
+                SLAReminder.sla_deadline == Resume.sla_deadline,
+                SLAReminder.hours_before == hours
+            )
+            due_resumes = self.db.query(Resume).options(
+                joinedload(Resume.current_handler),
+                joinedload(Resume.expert)
+            ).filter(
+                Resume.status.in_(self.SLA_STATUSES),
+                Resume.sla_deadline > now,
+                Resume.sla_deadline <= now + timedelta(hours=hours),
+                Resume.is_overdue == False,
+                ~already_sent
+            ).all()
+            
+            for resume in due_resumes:
+                if resume.id not in reminded:
+                    self._send_reminder_notification(resume)
+                    reminded[resume.id] = resume
+                ledger.append({
+                    "resume_id": resume.id,
+                    "stage": resume.status,
+                    "sla_deadline": resume.sla_deadline,
+                    "hours_before": hours,
+                })
         
-        for resume in upcoming_resumes:
-            self._send_reminder_notification(resume)
+        if ledger:
+            self.db.execute(insert(SLAReminder), ledger)
         
-        return upcoming_resumes
+        # 清理截止时间已过的台账记录
+        self.db.query(SLAReminder).filter(
+            SLAReminder.sla_deadline < now - timedelta(days=1)
+        ).delete(synchronize_session=False)
+        
+        return list(reminded.values())
+    
+    def next_due_time(self) -> Optional[datetime]:
+        """下一个需要处理的时间点（UTC）：最早的超期时刻或最早的提醒时刻
+
+        只在 ix_resumes_sla_pending 部分索引上取 MIN，每个档位一次索引探测。
+        """
+        now = datetime.utcnow()
+        pending = self.db.query(func.min(Resume.sla_deadline)).filter(
+            Resume.status.in_(self.SLA_STATUSES),
+            Resume.is_overdue == False
+        )
+        candidates = [pending.scalar()]
+        for hours in settings.SLA_REMINDER_HOURS:
+            # 已进入提醒窗口的简历本轮已处理，下一次提醒取窗口之外最早的截止时间
+            deadline = pending.filter(
+                Resume.sla_deadline > now + timedelta(hours=hours)
+            ).scalar()
+            if deadline:
+                candidates.append(_as_naive_utc(deadline) - timedelta(hours=hours))
+        candidates = [_as_naive_utc(c) for c in candidates if c]
+        return min(candidates) if candidates else None
     
     def _get_status_name(self, status: ResumeStatus) -> str:
         """获取状态显示名称"""
@@ -76,64 +167,94 @@ class SLAService:
             return resume.expert.username
         return "未指定"
     
-    def _calculate_overdue_time(self, resume: Resume) -> str:
+    def _calculate_overdue_time(self, resume) -> str:
         """计算超期时长"""
         if not resume.sla_deadline:
             return "未知"
+        deadline = _as_naive_utc(resume.sla_deadline)
         now = datetime.utcnow()
-        if resume.sla_deadline > now:
+        if deadline > now:
             return "未超期"
         
-        delta = now - resume.sla_deadline
+        delta = now - deadline
         hours = int(delta.total_seconds() / 3600)
         if hours < 24:
             return f"{hours}小时"
         days = hours // 24
         return f"{days}天{hours % 24}小时"
     
-    def _send_overdue_notification(self, resume: Resume) -> None:
-        """发送超期通知"""
-        handler_name = self._get_handler_name(resume)
-        stage_name = self._get_status_name(resume.status)
-        overdue_time = self._calculate_overdue_time(resume)
-        
-        # 通知当前责任人
-        if resume.current_handler_id:
-            notification = Notification(
-                user_id=resume.current_handler_id,
-                resume_id=resume.id,
-                title=f"⚠️ 简历已超期",
-                message=f"简历【{resume.candidate_name}】在【{stage_name}】阶段已超期{overdue_time}，请尽快处理！",
-                type=NotificationType.URGENT,
-                current_handler=handler_name,
-                current_stage=stage_name,
-                overdue_time=overdue_time,
-                link=f"/resumes/{resume.id}"
-            )
-            self.db.add(notification)
+    def _record_overdue_stats(self, rows: List[Row]) -> None:
+        """新超期的简历计入统计汇总的超期数量"""
+        deltas = defaultdict(lambda: [0, 0])
+        for row in rows:
+            key, _ = ResumeStatsService.snapshot(row)
+            deltas[key][1] += 1
+        ResumeStatsService(self.db).apply(deltas)
+    
+    def _send_overdue_notifications(self, rows: List[Row]) -> None:
+        """批量发送超期通知（通知当前责任人及所在二层部门的经理）"""
+        # 责任人名称：一次查询
+        user_ids = {row.current_handler_id for row in rows} | {row.expert_id for row in rows}
+        user_ids.discard(None)
+        usernames = dict(
+            self.db.query(User.id, User.username).filter(User.id.in_(user_ids)).all()
+        ) if user_ids else {}
         
-        # 通知二层经理（如果有）
-        if resume.l2_department_id:
-            l2_managers = self.db.query(User).filter(
-                User.department_id == resume.l2_department_id,
+        # 二层经理：一次查询，按部门分组
+        dept_ids = {row.l2_department_id for row in rows if row.l2_department_id}
+        managers_by_dept = defaultdict(list)
+        if dept_ids:
+            managers = self.db.query(User.id, User.department_id).filter(
+                User.department_id.in_(dept_ids),
                 User.role == Role.L2_MANAGER,
                 User.is_active == True
             ).all()
+            for manager_id, dept_id in managers:
+                managers_by_dept[dept_id].append(manager_id)
+        
+        notifications = []
+        for row in rows:
+            handler_name = (
+                usernames.get(row.current_handler_id)
+                or usernames.get(row.expert_id)
+                or "未指定"
+            )
+            stage_name = self._get_status_name(row.status)
+            overdue_time = self._calculate_overdue_time(row)
+            common = {
+                "resume_id": row.id,
+                "current_handler": handler_name,
+                "current_stage": stage_name,
+                "overdue_time": overdue_time,
+                "link": f"/resumes/{row.id}",
+                "is_read": False,
+            }
+            
+            # 通知当前责任人
+            if row.current_handler_id:
+                notifications.append({
+                    **common,
+                    "user_id": row.current_handler_id,
+                    "digest_key": "overdue",
+                    "title": "⚠️ 简历已超期",
+                    "message": f"简历【{row.candidate_name}】在【{stage_name}】阶段已超期{overdue_time}，请尽快处理！",
+                    "type": NotificationType.URGENT,
+                })
             
-            for manager in l2_managers:
-                if manager.id != resume.current_handler_id:
-                    notification = Notification(
-                        user_id=manager.id,
-                        resume_id=resume.id,
-                        title=f"⚠️ 简历超期提醒",
-                        message=f"简历【{resume.candidate_name}】已超期，当前责任人：{handler_name}，当前环节：{stage_name}，超期时间：{overdue_time}",
-                        type=NotificationType.WARNING,
-                        current_handler=handler_name,
-                        current_stage=stage_name,
-                        overdue_time=overdue_time,
-                        link=f"/resumes/{resume.id}"
-                    )
-                    self.db.add(notification)
+            # 通知二层经理（如果有）
+            for manager_id in managers_by_dept.get(row.l2_department_id, []):
+                if manager_id != row.current_handler_id:
+                    notifications.append({
+                        **common,
+                        "user_id": manager_id,
+                        "digest_key": "overdue_l2",
+                        "title": "⚠️ 简历超期提醒",
+                        "message": f"简历【{row.candidate_name}】已超期，当前责任人：{handler_name}，当前环节：{stage_name}，超期时间：{overdue_time}",
+                        "type": NotificationType.WARNING,
+                    })
+        
+        if notifications:
+            NotificationService(self.db).create(notifications)
     
     def _send_reminder_notification(self, resume: Resume) -> None:
         """发送即将超期提醒"""
@@ -142,14 +263,14 @@ class SLAService:
         
         # 计算剩余时间
         if resume.sla_deadline:
-            delta = resume.sla_deadline - datetime.utcnow()
+            delta = _as_naive_utc(resume.sla_deadline) - datetime.utcnow()
             hours_left = max(0, int(delta.total_seconds() / 3600))
             time_left = f"{hours_left}小时" if hours_left > 0 else "不足1小时"
         else:
             time_left = "未知"
         
         if resume.current_handler_id:
-            notification = Notification(
+            NotificationService(self.db).create([dict(
                 user_id=resume.current_handler_id,
                 resume_id=resume.id,
                 title=f"📢 简历即将超期",
@@ -157,26 +278,21 @@ class SLAService:
                 type=NotificationType.WARNING,
                 current_handler=handler_name,
                 current_stage=stage_name,
-                link=f"/resumes/{resume.id}"
-            )
-            self.db.add(notification)
+                link=f"/resumes/{resume.id}",
+                digest_key="sla_reminder"
+            )])
     
     def get_overdue_summary(self) -> dict:
-        """获取超期统计摘要"""
-        overdue_count = self.db.query(Resume).filter(
-            Resume.is_overdue == True
-        ).count()
+        """获取超期统计摘要（读取统计汇总表）"""
+        overdue = ResumeStatsService(self.db).overdue_by_status()
         
         by_status = {}
         for status in self.SLA_STATUSES:
-            count = self.db.query(Resume).filter(
-                Resume.status == status,
-                Resume.is_overdue == True
-            ).count()
+            count = overdue.get(status, 0)
             if count > 0:
                 by_status[status.value] = count
         
         return {
-            "total_overdue": overdue_count,
+            "total_overdue": sum(overdue.values()),
             "by_status": by_status
         }
@@ -0,0 +1,161 @@
+"""
+简历统计汇总服务 - 维护 resume_stats_daily
+"""
+from collections import defaultdict
+from datetime import date, datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import Date, cast, func, insert, select
+from sqlalchemy.orm import Session
+
+from app.core.database import upsert
+from app.models import Resume, ResumeStatsDaily
+from app.models.enums import ResumeStatus, Source
+
+# 统计桶：(上传日期, 状态, 来源, 二层部门ID, 三层部门ID)
+StatsKey = Tuple[date, ResumeStatus, Source, str, str]
+
+
+class ResumeStatsService:
+    """简历统计汇总服务
+
+    每份简历只计入一个统计桶；状态、部门或超期标记变化时，
+    在业务操作的同一事务内把计数从旧桶移到新桶。
+    /stats 与超期摘要只读汇总表，行数与桶数相关，与简历总量无关。
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    @staticmethod
+    def snapshot(resume: Resume) -> Tuple[StatsKey, bool]:
+        """获取简历当前所在的统计桶及超期标记"""
+        created_at = resume.created_at or datetime.utcnow()
+        if created_at.tzinfo is not None:
+            created_at = created_at.astimezone(timezone.utc)
+        key = (
+            created_at.date(),
+            resume.status,
+            resume.source,
+            resume.l2_department_id or "",
+            resume.l3_department_id or "",
+        )
+        return key, bool(resume.is_overdue)
+
+    def record_upload(self, resume: Resume) -> None:
+        """新上传简历计入统计"""
+        key, overdue = self.snapshot(resume)
+        self.apply({key: (1, int(overdue))})
+
+    def record_change(self, before: Tuple[StatsKey, bool], resume: Resume) -> None:
+        """简历状态/部门/超期标记变化后移动统计桶"""
+        self.record_changes([(before, resume)])
+
+    def record_changes(self, changes: List[Tuple[Tuple[StatsKey, bool], Resume]]) -> None:
+        """批量移动统计桶（合并为一次写入）"""
+        deltas = defaultdict(lambda: [0, 0])
+        for before, resume in changes:
+            after = self.snapshot(resume)
+            if after == before:
+                continue
+            (old_key, old_overdue), (new_key, new_overdue) = before, after
+            deltas[old_key][0] -= 1
+            deltas[old_key][1] -= int(old_overdue)
+            deltas[new_key][0] += 1
+            deltas[new_key][1] += int(new_overdue)
+        self.apply(deltas)
+
+    def apply(self, deltas: Dict[StatsKey, Tuple[int, int]]) -> None:
+        """批量累加各统计桶的 (数量, 超期数量) 变化"""
+        rows = [
+            {
+                "day": key[0],
+                "status": key[1],
+                "source": key[2],
+                "l2_department_id": key[3],
+                "l3_department_id": key[4],
+                "count": count,
+                "overdue_count": overdue,
+            }
+            # 按主键排序，避免并发事务以不同顺序锁桶导致死锁
+            for key, (count, overdue) in sorted(deltas.items(), key=lambda item: str(item[0]))
+            if count or overdue
+        ]
+        if not rows:
+            return
+
+        table = ResumeStatsDaily.__table__
+        stmt = upsert(self.db, table)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[c.name for c in table.primary_key.columns],
+            set_={
+                "count": table.c.count + stmt.excluded.count,
+                "overdue_count": table.c.overdue_count + stmt.excluded.overdue_count,
+            },
+        )
+        self.db.execute(stmt, rows)
+
+    def _day_expression(self):
+        """简历上传日期（UTC）的SQL表达式"""
+        if self.db.get_bind().dialect.name == "postgresql":
+            return cast(func.timezone("UTC", Resume.created_at), Date)
+        return func.date(Resume.created_at)
+
+    def rebuild(self) -> int:
+        """根据 resumes 表全量重建汇总表（用于回填或校正），返回桶数量"""
+        self.db.query(ResumeStatsDaily).delete(synchronize_session=False)
+
+        day = self._day_expression()
+        l2 = func.coalesce(Resume.l2_department_id, "")
+        l3 = func.coalesce(Resume.l3_department_id, "")
+        source_query = select(
+            day,
+            Resume.status,
+            Resume.source,
+            l2,
+            l3,
+            func.count(),
+            func.count().filter(Resume.is_overdue == True),
+        ).group_by(day, Resume.status, Resume.source, l2, l3)
+
+        result = self.db.execute(
+            insert(ResumeStatsDaily).from_select(
+                ["day", "status", "source", "l2_department_id", "l3_department_id",
+                 "count", "overdue_count"],
+                source_query,
+            )
+        )
+        return result.rowcount
+
+    def bucket_rows(
+        self,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        today: Optional[date] = None
+    ) -> List[tuple]:
+        """按 (二层部门, 三层部门, 状态, 来源) 汇总的统计行
+
+        每行为 (l2_department_id, l3_department_id, status, source, count, overdue, today_count)
+        """
+        today = today or datetime.utcnow().date()
+        t = ResumeStatsDaily
+        query = self.db.query(
+            t.l2_department_id,
+            t.l3_department_id,
+            t.status,
+            t.source,
+            func.coalesce(func.sum(t.count), 0),
+            func.coalesce(func.sum(t.overdue_count), 0),
+            func.coalesce(func.sum(t.count).filter(t.day == today), 0),
+        )
+        if start_date:
+            query = query.filter(t.day >= start_date)
+        if end_date:
+            query = query.filter(t.day <= end_date)
+        return query.group_by(t.l2_department_id, t.l3_department_id, t.status, t.source).all()
+
+    def overdue_by_status(self) -> Dict[ResumeStatus, int]:
+        """各状态的超期数量"""
+        t = ResumeStatsDaily
+        rows = self.db.query(t.status, func.sum(t.overdue_count)).group_by(t.status).all()
+        return {status: int(count or 0) for status, count in rows}
@@ -1,13 +1,22 @@
 """
 简历工作流服务 - 核心业务逻辑
 """
-from datetime import datetime, timedelta
-from typing import Optional, List, Tuple
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Optional, List, Sequence, Tuple
 from sqlalchemy.orm import Session
+from sqlalchemy.orm.exc import StaleDataError
 
-from app.models import Resume, User, Department, WorkflowLog, Notification
+from app.models import Resume, User, Department, WorkflowLog
 from app.models.enums import ResumeStatus, ActionType, Role, NotificationType
 from app.core.config import settings
+from app.services.stats import ResumeStatsService
+from app.services.scheduler import notify_deadline
+from app.services.notifications import NotificationService
+from app.services.search import ResumeSearchService
+
+
+class WorkflowConflict(Exception):
+    """简历已被并发修改（读取后版本号已变化）"""
 
 
 class WorkflowService:
@@ -50,18 +59,27 @@ class WorkflowService:
     
     def __init__(self, db: Session):
         self.db = db
+        self.stats = ResumeStatsService(db)
+        # 本次操作待写入的统计变化、通知与搜索文档，提交前一次性写入
+        self._stats_changes: List[Tuple[tuple, Resume]] = []
+        self._notifications: List[dict] = []
+        self._search_refresh: List[str] = []
     
     def _calculate_duration(self, resume: Resume) -> int:
         """计算在当前状态停留的秒数"""
-        if resume.updated_at:
-            return int((datetime.utcnow() - resume.updated_at).total_seconds())
-        return int((datetime.utcnow() - resume.created_at).total_seconds())
+        since = resume.updated_at or resume.created_at
+        # PostgreSQL 返回带时区的时间，SQLite 返回不带时区的 UTC 时间
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        return int((datetime.now(timezone.utc) - since).total_seconds())
     
     def _set_sla_deadline(self, resume: Resume, status: ResumeStatus) -> None:
         """设置SLA截止时间"""
         if status in self.STATUS_SLA:
             hours = self.STATUS_SLA[status]
             resume.sla_deadline = datetime.utcnow() + timedelta(hours=hours)
+            # 登记截止时间，调度器按需提前唤醒
+            notify_deadline(resume.sla_deadline)
         else:
             resume.sla_deadline = None
     
@@ -84,7 +102,7 @@ class WorkflowService:
             previous_status=prev_status,
             new_status=new_status,
             comment=comment,
-            metadata=metadata,
+            metadata_=metadata,
             duration_seconds=duration
         )
         self.db.add(log)
@@ -99,10 +117,11 @@ class WorkflowService:
         notification_type: NotificationType = NotificationType.INFO,
         current_handler: str = None,
         current_stage: str = None,
-        overdue_time: str = None
-    ) -> Notification:
-        """创建通知"""
-        notification = Notification(
+        overdue_time: str = None,
+        digest_key: str = None
+    ) -> None:
+        """登记通知，提交时统一写入（同类未读通知在窗口内合并为摘要，事务提交后推送给在线用户）"""
+        self._notifications.append(dict(
             user_id=user_id,
             resume_id=resume.id,
             title=title,
@@ -111,10 +130,42 @@ class WorkflowService:
             current_handler=current_handler,
             current_stage=current_stage,
             overdue_time=overdue_time,
-            link=f"/resumes/{resume.id}"
-        )
-        self.db.add(notification)
-        return notification
+            link=f"/resumes/{resume.id}",
+            digest_key=digest_key
+        ))
+    
+    def _commit(self) -> None:
+        """
+        提交：先写入简历（按版本号条件更新），成功后再写统计、通知与搜索文档
+        
+        简历在读取后被其他事务修改时回滚并抛出 WorkflowConflict，不产生重复的日志和通知。
+        """
+        stats_changes, self._stats_changes = self._stats_changes, []
+        notifications, self._notifications = self._notifications, []
+        search_refresh, self._search_refresh = self._search_refresh, []
+        try:
+            self.db.flush()
+        except StaleDataError:
+            self.db.rollback()
+            raise WorkflowConflict("简历已被其他人处理，请刷新后重试")
+        if stats_changes:
+            self.stats.record_changes(stats_changes)
+        if notifications:
+            NotificationService(self.db).create(notifications)
+        if search_refresh:
+            ResumeSearchService(self.db).refresh(search_refresh)
+        self.db.commit()
+    
+    def _check_transition(
+        self,
+        resume: Resume,
+        allowed: Sequence[ResumeStatus],
+        target: ResumeStatus,
+        message: str = "当前状态不允许此操作"
+    ) -> None:
+        """校验操作的前置状态及状态转换规则"""
+        if resume.status not in allowed or target not in self.STATUS_TRANSITIONS.get(resume.status, []):
+            raise ValueError(f"{message}: {resume.status}")
     
     def _get_l2_managers(self, department_id: str) -> List[User]:
         """获取二层部门的经理"""
@@ -129,17 +180,62 @@ class WorkflowService:
             User.is_active == True
         ).all()
     
+    def _get_l3_assistants(self, department_id: str) -> List[User]:
+        """获取三层部门的助理"""
+        return self.db.query(User).filter(
+            User.department_id == department_id,
+            User.role == Role.L3_ASSISTANT,
+            User.is_active == True
+        ).all()
+    
+    def _get_expert(self, expert_id: str) -> User:
+        expert = self.db.query(User).filter(User.id == expert_id).first()
+        if not expert or expert.role != Role.EXPERT:
+            raise ValueError("无效的专家ID")
+        return expert
+    
+    def _get_department(self, department_id: str) -> Department:
+        department = self.db.query(Department).filter(Department.id == department_id).first()
+        if not department:
+            raise ValueError("部门不存在")
+        return department
+    
+    def _run_batch(
+        self,
+        resumes: List[Resume],
+        transition: Callable[[Resume], None]
+    ) -> List[Tuple[str, Optional[str]]]:
+        """
+        在同一事务内对多份简历执行同一操作，返回每份简历的 (简历ID, 错误信息)
+        
+        transition 须在修改简历之前完成校验（校验失败抛出 ValueError，不影响其他简历）；
+        日志随一次 flush 批量插入，通知与统计变化合并后各写入一次。
+        """
+        results = []
+        for resume in resumes:
+            stats_before = self.stats.snapshot(resume)
+            try:
+                transition(resume)
+            except ValueError as e:
+                results.append((resume.id, str(e)))
+                continue
+            self._stats_changes.append((stats_before, resume))
+            results.append((resume.id, None))
+        
+        if self._stats_changes:
+            self._commit()
+        return results
+    
     # ==================== 业务操作 ====================
     
-    def distribute_to_l2(
+    def _distribute_to_l2(
         self,
         resume: Resume,
         operator: User,
-        l2_department_id: str
-    ) -> Resume:
-        """HR分发给二层部门"""
-        if resume.status != ResumeStatus.POOL_HR:
-            raise ValueError(f"当前状态不允许此操作: {resume.status}")
+        l2_department_id: str,
+        managers: List[User]
+    ) -> None:
+        self._check_transition(resume, [ResumeStatus.POOL_HR], ResumeStatus.POOL_L2)
         
         prev_status = resume.status
         resume.l2_department_id = l2_department_id
@@ -149,26 +245,50 @@ class WorkflowService:
         self._log_action(resume, operator, ActionType.DISTRIBUTE_L2, prev_status, resume.status)
         
         # 通知二层经理
-        for manager in self._get_l2_managers(l2_department_id):
+        for manager in managers:
             self._create_notification(
                 manager.id, resume,
                 f"新简历待分发",
                 f"简历【{resume.candidate_name}】已分发至您的部门，请及时处理。",
-                NotificationType.INFO
+                NotificationType.INFO,
+                digest_key="distribute_l2"
             )
-        
-        self.db.commit()
-        return resume
     
-    def distribute_to_l3(
+    def distribute_to_l2(
         self,
         resume: Resume,
         operator: User,
-        l3_department_id: str
+        l2_department_id: str
     ) -> Resume:
-        """二层分发给三层部门"""
-        if resume.status != ResumeStatus.POOL_L2:
-            raise ValueError(f"当前状态不允许此操作: {resume.status}")
+        """HR分发给二层部门"""
+        stats_before = self.stats.snapshot(resume)
+        self._distribute_to_l2(resume, operator, l2_department_id, self._get_l2_managers(l2_department_id))
+        self._stats_changes.append((stats_before, resume))
+        self._commit()
+        return resume
+    
+    def distribute_to_l2_batch(
+        self,
+        resumes: List[Resume],
+        operator: User,
+        l2_department_id: str
+    ) -> List[Tuple[str, Optional[str]]]:
+        """HR批量分发给二层部门"""
+        self._get_department(l2_department_id)
+        managers = self._get_l2_managers(l2_department_id)
+        return self._run_batch(
+            resumes,
+            lambda resume: self._distribute_to_l2(resume, operator, l2_department_id, managers)
+        )
+    
+    def _distribute_to_l3(
+        self,
+        resume: Resume,
+        operator: User,
+        l3_department_id: str,
+        assistants: List[User]
+    ) -> None:
+        self._check_transition(resume, [ResumeStatus.POOL_L2], ResumeStatus.POOL_L3)
         
         prev_status = resume.status
         resume.l3_department_id = l3_department_id
@@ -178,36 +298,51 @@ class WorkflowService:
         self._log_action(resume, operator, ActionType.DISTRIBUTE_L3, prev_status, resume.status)
         
         # 通知三层助理
-        assistants = self.db.query(User).filter(
-            User.department_id == l3_department_id,
-            User.role == Role.L3_ASSISTANT,
-            User.is_active == True
-        ).all()
         for assistant in assistants:
             self._create_notification(
                 assistant.id, resume,
                 f"新简历待指派专家",
                 f"简历【{resume.candidate_name}】已分发至您的团队，请指派专家。",
-                NotificationType.INFO
+                NotificationType.INFO,
+                digest_key="distribute_l3"
             )
-        
-        self.db.commit()
-        return resume
     
-    def assign_expert(
+    def distribute_to_l3(
         self,
         resume: Resume,
         operator: User,
-        expert_id: str
+        l3_department_id: str
     ) -> Resume:
-        """三层指派专家"""
-        if resume.status != ResumeStatus.POOL_L3:
-            raise ValueError(f"当前状态不允许此操作: {resume.status}")
-        
-        expert = self.db.query(User).filter(User.id == expert_id).first()
-        if not expert or expert.role != Role.EXPERT:
-            raise ValueError("无效的专家ID")
+        """二层分发给三层部门"""
+        stats_before = self.stats.snapshot(resume)
+        self._distribute_to_l3(resume, operator, l3_department_id, self._get_l3_assistants(l3_department_id))
+        self._stats_changes.append((stats_before, resume))
+        self._commit()
+        return resume
+    
+    def distribute_to_l3_batch(
+        self,
+        resumes: List[Resume],
+        operator: User,
+        l3_department_id: str
+    ) -> List[Tuple[str, Optional[str]]]:
+        """二层批量分发给三层部门"""
+        self._get_department(l3_department_id)
+        assistants = self._get_l3_assistants(l3_department_id)
+        return self._run_batch(
+            resumes,
+            lambda resume: self._distribute_to_l3(resume, operator, l3_department_id, assistants)
+        )
+    
+    def _assign_expert(
+        self,
+        resume: Resume,
+        operator: User,
+        expert: User
+    ) -> None:
+        self._check_transition(resume, [ResumeStatus.POOL_L3], ResumeStatus.WAIT_IDENTIFY)
         
+        expert_id = expert.id
         prev_status = resume.status
         resume.expert_id = expert_id
         resume.current_handler_id = expert_id
@@ -221,12 +356,36 @@ class WorkflowService:
             expert_id, resume,
             f"新简历待识别",
             f"简历【{resume.candidate_name}】已指派给您，请在{settings.SLA_IDENTIFY_HOURS}小时内完成识别。",
-            NotificationType.INFO
+            NotificationType.INFO,
+            digest_key="assign_expert"
         )
+    
+    def assign_expert(
+        self,
+        resume: Resume,
+        operator: User,
+        expert_id: str
+    ) -> Resume:
+        """三层指派专家"""
+        self._check_transition(resume, [ResumeStatus.POOL_L3], ResumeStatus.WAIT_IDENTIFY)
+        expert = self._get_expert(expert_id)
         
-        self.db.commit()
+        stats_before = self.stats.snapshot(resume)
+        self._assign_expert(resume, operator, expert)
+        self._stats_changes.append((stats_before, resume))
+        self._commit()
         return resume
     
+    def assign_expert_batch(
+        self,
+        resumes: List[Resume],
+        operator: User,
+        expert_id: str
+    ) -> List[Tuple[str, Optional[str]]]:
+        """三层批量指派专家"""
+        expert = self._get_expert(expert_id)
+        return self._run_batch(resumes, lambda resume: self._assign_expert(resume, operator, expert))
+    
     def identify(
         self,
         resume: Resume,
@@ -241,6 +400,7 @@ class WorkflowService:
             raise ValueError("只有指派的专家才能进行识别")
         
         prev_status = resume.status
+        stats_before = self.stats.snapshot(resume)
         
         if identified:
             resume.status = ResumeStatus.WAIT_CONTACT_INFO
@@ -251,7 +411,8 @@ class WorkflowService:
                     manager.id, resume,
                     f"请填写联系方式",
                     f"专家已识别简历【{resume.candidate_name}】，请联系推荐人获取联系方式并填写。",
-                    NotificationType.WARNING
+                    NotificationType.WARNING,
+                    digest_key="fill_contact"
                 )
         else:
             resume.status = ResumeStatus.REJECTED
@@ -261,7 +422,8 @@ class WorkflowService:
         resume.sla_deadline = None
         
         self._log_action(resume, operator, action, prev_status, resume.status, comment)
-        self.db.commit()
+        self._stats_changes.append((stats_before, resume))
+        self._commit()
         return resume
     
     def fill_contact_info(
@@ -279,6 +441,7 @@ class WorkflowService:
             raise ValueError("至少需要填写邮箱或电话")
         
         prev_status = resume.status
+        stats_before = self.stats.snapshot(resume)
         resume.email = email
         resume.phone = phone
         resume.status = ResumeStatus.WAIT_CONNECTION
@@ -292,10 +455,14 @@ class WorkflowService:
             resume.expert_id, resume,
             f"请联系候选人",
             f"简历【{resume.candidate_name}】的联系方式已填写，请在{settings.SLA_CONNECTION_HOURS}小时内完成建联。",
-            NotificationType.WARNING
+            NotificationType.WARNING,
+            digest_key="start_connection"
         )
         
-        self.db.commit()
+        self._stats_changes.append((stats_before, resume))
+        # 联系方式进入搜索文档
+        self._search_refresh.append(resume.id)
+        self._commit()
         return resume
     
     def start_connection(
@@ -308,12 +475,14 @@ class WorkflowService:
             raise ValueError(f"当前状态不允许此操作: {resume.status}")
         
         prev_status = resume.status
+        stats_before = self.stats.snapshot(resume)
         resume.status = ResumeStatus.WAIT_FEEDBACK
         self._set_sla_deadline(resume, resume.status)
         resume.is_overdue = False
         
         self._log_action(resume, operator, ActionType.CONNECT_START, prev_status, resume.status)
-        self.db.commit()
+        self._stats_changes.append((stats_before, resume))
+        self._commit()
         return resume
     
     def submit_feedback(
@@ -328,6 +497,7 @@ class WorkflowService:
             raise ValueError(f"当前状态不允许此操作: {resume.status}")
         
         prev_status = resume.status
+        stats_before = self.stats.snapshot(resume)
         if archive:
             resume.status = ResumeStatus.ARCHIVED
         
@@ -335,22 +505,21 @@ class WorkflowService:
         resume.sla_deadline = None
         
         self._log_action(resume, operator, ActionType.FEEDBACK, prev_status, resume.status, feedback)
-        self.db.commit()
+        self._stats_changes.append((stats_before, resume))
+        self._commit()
         return resume
     
-    def release(
+    def _release(
         self,
         resume: Resume,
         operator: User,
         reason: str = None
-    ) -> Resume:
-        """释放简历（重新分发）"""
+    ) -> None:
         allowed_statuses = [
             ResumeStatus.WAIT_CONNECTION,
             ResumeStatus.WAIT_FEEDBACK
         ]
-        if resume.status not in allowed_statuses:
-            raise ValueError(f"当前状态不允许释放: {resume.status}")
+        self._check_transition(resume, allowed_statuses, ResumeStatus.RELEASED, "当前状态不允许释放")
         
         prev_status = resume.status
         resume.status = ResumeStatus.RELEASED
@@ -364,10 +533,29 @@ class WorkflowService:
         
         # 释放后自动回到二层待分发
         resume.status = ResumeStatus.POOL_L2
-        
-        self.db.commit()
+    
+    def release(
+        self,
+        resume: Resume,
+        operator: User,
+        reason: str = None
+    ) -> Resume:
+        """释放简历（重新分发）"""
+        stats_before = self.stats.snapshot(resume)
+        self._release(resume, operator, reason)
+        self._stats_changes.append((stats_before, resume))
+        self._commit()
         return resume
     
+    def release_batch(
+        self,
+        resumes: List[Resume],
+        operator: User,
+        reason: str = None
+    ) -> List[Tuple[str, Optional[str]]]:
+        """批量释放简历"""
+        return self._run_batch(resumes, lambda resume: self._release(resume, operator, reason))
+    
     def submit_overdue_reason(
         self,
         resume: Resume,
@@ -383,5 +571,5 @@ class WorkflowService:
             resume, operator, ActionType.OVERDUE_REASON,
             resume.status, resume.status, reason
         )
-        self.db.commit()
+        self._commit()
         return resume
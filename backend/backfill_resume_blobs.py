@@ -0,0 +1,34 @@
+"""
+回填简历文件引用计数（resume_blobs）
+
+内容寻址存储上线前上传的简历没有文件哈希，也不在 resume_blobs 中：
+先按文件内容回填 resumes.file_hash / file_size，再根据 resumes 表全量重建引用计数。
+重建期间的上传可能与之冲突，请在维护窗口运行：
+    python backfill_resume_blobs.py
+"""
+import sys
+sys.path.insert(0, '.')
+
+from app.core.database import SessionLocal
+from app.services.blobs import ResumeBlobService
+
+
+def backfill_resume_blobs():
+    db = SessionLocal()
+    try:
+        blobs = ResumeBlobService(db)
+        filled, missing = blobs.backfill_hashes()
+        print(f"已回填 {filled} 份简历的文件哈希，{missing} 份文件缺失")
+        files = blobs.rebuild()
+        db.commit()
+        print(f"✅ 引用计数重建完成，共 {files} 个文件")
+    except Exception as e:
+        print(f"❌ 回填失败: {e}")
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    backfill_resume_blobs()
@@ -0,0 +1,107 @@
+"""
+登录压测：并发登录时其他接口的延迟
+
+对运行中的服务发起一波并发登录，同时持续请求一个普通接口，
+对比无登录负载与登录高峰期间该接口的延迟：
+    python bench_login.py --base-url http://localhost:8000 --logins 200 --concurrency 50
+"""
+import argparse
+import json
+import statistics
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+
+def request(url, data=None, headers=None):
+    """发送请求，返回 (状态码, 耗时秒)"""
+    req = urllib.request.Request(url, data=data, headers=headers or {})
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(req, timeout=60) as resp:
+            resp.read()
+            code = resp.status
+    except urllib.error.HTTPError as e:
+        code = e.code
+    return code, time.perf_counter() - start
+
+
+def login(base_url, username, password):
+    data = urllib.parse.urlencode({"username": username, "password": password}).encode()
+    return request(
+        f"{base_url}/api/auth/login",
+        data=data,
+        headers={"Content-Type": "application/x-www-form-urlencoded"},
+    )
+
+
+def probe(base_url, path, token, stop, samples):
+    """持续请求普通接口，记录延迟"""
+    headers = {"Authorization": f"Bearer {token}"} if token else {}
+    while not stop.is_set():
+        samples.append(request(f"{base_url}{path}", headers=headers)[1])
+
+
+def summarize(name, samples):
+    if not samples:
+        print(f"{name}: 无数据")
+        return
+    ordered = sorted(samples)
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    print(
+        f"{name}: n={len(ordered)} p50={statistics.median(ordered) * 1000:.1f}ms "
+        f"p95={p95 * 1000:.1f}ms max={ordered[-1] * 1000:.1f}ms"
+    )
+
+
+def run(args):
+    code, _ = login(args.base_url, args.username, args.password)
+    if code != 200:
+        raise SystemExit(f"登录失败（{code}），请检查账号密码")
+    data = urllib.parse.urlencode({"username": args.username, "password": args.password}).encode()
+    with urllib.request.urlopen(f"{args.base_url}/api/auth/login", data=data) as resp:
+        token = json.load(resp)["access_token"]
+
+    # 基线：无登录负载
+    baseline, stop = [], threading.Event()
+    worker = threading.Thread(target=probe, args=(args.base_url, args.probe_path, token, stop, baseline))
+    worker.start()
+    time.sleep(args.baseline_seconds)
+    stop.set()
+    worker.join()
+
+    # 登录高峰
+    loaded, stop = [], threading.Event()
+    worker = threading.Thread(target=probe, args=(args.base_url, args.probe_path, token, stop, loaded))
+    worker.start()
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        results = list(pool.map(
+            lambda _: login(args.base_url, args.username, args.password), range(args.logins)
+        ))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    worker.join()
+
+    codes = {}
+    for code, _ in results:
+        codes[code] = codes.get(code, 0) + 1
+    print(f"登录 {args.logins} 次，并发 {args.concurrency}，耗时 {elapsed:.1f}s，状态码 {codes}")
+    summarize("登录", [t for _, t in results])
+    summarize(f"{args.probe_path}（基线）", baseline)
+    summarize(f"{args.probe_path}（登录高峰）", loaded)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="并发登录压测")
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--username", default="hr")
+    parser.add_argument("--password", default="hr123")
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--probe-path", default="/api/auth/me")
+    parser.add_argument("--baseline-seconds", type=float, default=3.0)
+    run(parser.parse_args())
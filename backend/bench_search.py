@@ -0,0 +1,122 @@
+"""
+简历搜索压测：生成模拟简历并统计搜索延迟
+
+请在独立的压测数据库上运行（会写入大量模拟简历，且不更新统计汇总）：
+    DATABASE_URL=postgresql://.../resume_bench python bench_search.py --seed 1000000
+    DATABASE_URL=postgresql://.../resume_bench python bench_search.py --queries 500
+"""
+import argparse
+import random
+import statistics
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, '.')
+
+from sqlalchemy import insert
+
+from app.core.database import SessionLocal
+from app.models import Department, Resume, ResumeText, User
+from app.models.enums import ExtractionStatus, ResumeStatus, Role, Source
+from app.services.search import ResumeSearchService
+
+SURNAMES = "王李张刘陈杨黄赵吴周徐孙马朱胡郭何高林罗郑梁谢宋唐许韩冯邓曹彭曾"
+GIVEN = "伟芳娜秀敏静丽强磊军洋勇艳杰娟涛明超秀兰霞平刚桂英华玉萍红"
+SKILLS = [
+    "Python", "Java", "Go", "Kubernetes", "PostgreSQL", "React", "TypeScript", "Spark",
+    "机器学习", "深度学习", "分布式系统", "高并发", "微服务", "数据仓库", "推荐算法", "嵌入式",
+    "产品经理", "项目管理", "前端开发", "后端开发", "测试开发", "运维", "架构设计", "大模型",
+]
+SCHOOLS = ["清华大学", "北京大学", "浙江大学", "复旦大学", "上海交通大学", "南京大学", "武汉大学", "中山大学"]
+QUERIES = ["Python", "分布式系统", "王伟", "Kubernetes 微服务", "浙江大学 推荐算法", "张", "深度学习 Python", "react"]
+
+
+def fake_resume_text(name: str) -> str:
+    skills = random.sample(SKILLS, 6)
+    return (
+        f"{name}\n教育经历：{random.choice(SCHOOLS)} 计算机科学与技术\n"
+        f"工作经历：负责{skills[0]}与{skills[1]}相关系统的设计与实现，参与{skills[2]}平台建设。\n"
+        f"技能：{'、'.join(skills[3:])}\n" * 3
+    )
+
+
+def seed(count: int, batch_size: int = 5000):
+    db = SessionLocal()
+    try:
+        uploader = db.query(User).filter(User.role == Role.HR).first()
+        departments = [d.id for d in db.query(Department).filter(Department.level == 2)]
+        if uploader is None or not departments:
+            raise SystemExit("请先运行 init_db.py 初始化默认账号与部门")
+        search = ResumeSearchService(db)
+        now = datetime.now(timezone.utc)
+        for start in range(0, count, batch_size):
+            resumes, texts = [], []
+            for i in range(min(batch_size, count - start)):
+                name = random.choice(SURNAMES) + "".join(random.sample(GIVEN, random.choice([1, 2])))
+                content = fake_resume_text(name)
+                resume_id = str(uuid.uuid4())
+                created_at = now - timedelta(minutes=start + i)
+                resumes.append({
+                    "id": resume_id,
+                    "candidate_name": name,
+                    "source": random.choice(list(Source)),
+                    "status": random.choice([ResumeStatus.POOL_HR, ResumeStatus.POOL_L2]),
+                    "resume_url": f"/uploads/bench/{resume_id}.pdf",
+                    "uploader_id": uploader.id,
+                    "l2_department_id": random.choice(departments),
+                    "is_overdue": False,
+                    "created_at": created_at,
+                })
+                texts.append({
+                    "resume_id": resume_id,
+                    "status": ExtractionStatus.DONE,
+                    "content": content,
+                    "char_count": len(content),
+                    "search_vector": search.document(name, None, None, content),
+                    "created_at": created_at,
+                })
+            db.execute(insert(Resume), resumes)
+            db.execute(insert(ResumeText), texts)
+            db.commit()
+            print(f"已生成 {start + len(resumes)}/{count}")
+    finally:
+        db.close()
+
+
+def run(queries: int, limit: int):
+    db = SessionLocal()
+    try:
+        search = ResumeSearchService(db)
+        department = db.query(Department).filter(Department.level == 2).first()
+        scopes = {
+            "HR（全部）": None,
+            "二层经理（本部门）": Resume.l2_department_id == department.id,
+        }
+        for scope_name, visibility in scopes.items():
+            timings = []
+            for i in range(queries):
+                query = QUERIES[i % len(QUERIES)]
+                start = time.perf_counter()
+                search.search(query, visibility, limit)
+                timings.append(time.perf_counter() - start)
+            timings.sort()
+            p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+            print(
+                f"{scope_name}: n={len(timings)} p50={statistics.median(timings) * 1000:.1f}ms "
+                f"p95={p95 * 1000:.1f}ms max={timings[-1] * 1000:.1f}ms"
+            )
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="简历搜索压测")
+    parser.add_argument("--seed", type=int, default=0, help="生成多少份模拟简历")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--limit", type=int, default=20)
+    args = parser.parse_args()
+    if args.seed:
+        seed(args.seed)
+    run(args.queries, args.limit)
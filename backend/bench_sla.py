@@ -0,0 +1,160 @@
+"""
+SLA 超期检测压测：按截止时间唤醒 vs 固定间隔轮询
+
+在 --window 秒内均匀安排 --due 份简历到期，另有 --background 份仍在计时、远未到期的简历；
+分别用两种方式执行同一套 SLAService 检查，统计：
+- 检测延迟：简历被标记超期的时刻 - 截止时间
+- 数据库负载：检查次数、SQL 语句数、语句累计耗时
+
+    轮询：每 --poll-seconds 秒执行一次检查（原定时任务为 30 分钟，按比例缩短）
+    按截止时间：检查后用 next_due_time() 安排下一次唤醒，最长休眠 --max-sleep-seconds 秒
+
+会写入模拟简历与超期通知，请在独立的压测数据库上运行：
+    DATABASE_URL=postgresql://.../resume_bench python bench_sla.py --background 100000 --due 200 --window 60
+"""
+import argparse
+import statistics
+import sys
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+
+sys.path.insert(0, '.')
+
+from sqlalchemy import delete, event, insert
+
+from app.core.config import settings
+from app.core.database import SessionLocal, engine
+from app.models import Notification, Resume, User
+from app.models.enums import ResumeStatus, Role, Source
+from app.services.sla import SLAService, _as_naive_utc
+
+BENCH_PREFIX = "/uploads/bench-sla/"
+
+
+class StatementCounter:
+    """统计语句数与累计耗时"""
+
+    def __init__(self):
+        self.statements = 0
+        self.seconds = 0.0
+        self._local = threading.local()
+
+    def before(self, conn, cursor, statement, parameters, context, executemany):
+        self._local.start = time.perf_counter()
+
+    def after(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements += 1
+        self.seconds += time.perf_counter() - self._local.start
+
+    def __enter__(self):
+        event.listen(engine, "before_cursor_execute", self.before)
+        event.listen(engine, "after_cursor_execute", self.after)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(engine, "before_cursor_execute", self.before)
+        event.remove(engine, "after_cursor_execute", self.after)
+
+
+def seed(background: int, due: int, window: float, batch_size: int = 5000) -> None:
+    """清理上一轮的压测简历，写入远未到期的背景简历和 window 秒内依次到期的简历"""
+    db = SessionLocal()
+    try:
+        uploader = db.query(User).filter(User.role == Role.HR).first()
+        if uploader is None:
+            raise SystemExit("请先运行 init_db.py 初始化默认账号")
+        bench_ids = db.query(Resume.id).filter(Resume.resume_url.startswith(BENCH_PREFIX)).subquery()
+        db.execute(delete(Notification).where(Notification.resume_id.in_(bench_ids.select())))
+        db.execute(delete(Resume).where(Resume.resume_url.startswith(BENCH_PREFIX)))
+        db.commit()
+
+        def insert_resumes(deadlines):
+            for start in range(0, len(deadlines), batch_size):
+                rows = []
+                for deadline in deadlines[start:start + batch_size]:
+                    resume_id = str(uuid.uuid4())
+                    rows.append({
+                        "id": resume_id,
+                        "candidate_name": f"SLA压测{resume_id[:8]}",
+                        "source": Source.A,
+                        "status": ResumeStatus.WAIT_IDENTIFY,
+                        "resume_url": f"{BENCH_PREFIX}{resume_id}.pdf",
+                        "uploader_id": uploader.id,
+                        "sla_deadline": deadline,
+                        "is_overdue": False,
+                    })
+                db.execute(insert(Resume), rows)
+                db.commit()
+
+        now = datetime.utcnow()
+        insert_resumes([now + timedelta(days=7, seconds=i) for i in range(background)])
+        # 背景数据写完后再计时，避免写入期间就有简历到期
+        now = datetime.utcnow()
+        insert_resumes([now + timedelta(seconds=window * (i + 1) / due) for i in range(due)])
+    finally:
+        db.close()
+
+
+def check() -> tuple:
+    """执行一次SLA检查（与 check_sla_job 相同），返回 (各超期简历的检测延迟秒数, 下一个截止时间)"""
+    db = SessionLocal()
+    try:
+        sla_service = SLAService(db)
+        overdue = sla_service.check_overdue_resumes()
+        sla_service.check_upcoming_deadlines()
+        db.commit()
+        detected_at = datetime.utcnow()
+        latencies = [
+            (detected_at - _as_naive_utc(row.sla_deadline)).total_seconds()
+            for row in overdue if row.candidate_name.startswith("SLA压测")
+        ]
+        return latencies, sla_service.next_due_time()
+    finally:
+        db.close()
+
+
+def run(mode: str, args) -> None:
+    seed(args.background, args.due, args.window)
+    end = time.monotonic() + args.window + max(args.poll_seconds, args.max_sleep_seconds) + 1
+    latencies, checks = [], 0
+    with StatementCounter() as counter:
+        while len(latencies) < args.due and time.monotonic() < end:
+            detected, next_due = check()
+            latencies += detected
+            checks += 1
+            if mode == "poll":
+                sleep = args.poll_seconds
+            else:
+                # 与 schedule_next_sla_check 相同：在下一个截止时间唤醒，最长不超过 max_sleep
+                sleep = args.max_sleep_seconds
+                if next_due is not None:
+                    sleep = min(sleep, max(0.0, (next_due - datetime.utcnow()).total_seconds()))
+            time.sleep(sleep)
+
+    if not latencies:
+        print(f"{mode}: 未检测到超期简历")
+        return
+    latencies.sort()
+    p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+    print(
+        f"{mode}: 检测 {len(latencies)}/{args.due} 份，延迟 p50={statistics.median(latencies) * 1000:.0f}ms "
+        f"p95={p95 * 1000:.0f}ms max={latencies[-1] * 1000:.0f}ms；"
+        f"检查 {checks} 次，SQL {counter.statements} 条，语句耗时 {counter.seconds * 1000:.0f}ms"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="SLA 超期检测压测")
+    parser.add_argument("--background", type=int, default=100000, help="远未到期的计时中简历数")
+    parser.add_argument("--due", type=int, default=200, help="压测窗口内到期的简历数")
+    parser.add_argument("--window", type=float, default=60, help="到期时间分布的窗口（秒）")
+    parser.add_argument("--poll-seconds", type=float, default=10, help="轮询间隔（秒）")
+    parser.add_argument("--max-sleep-seconds", type=float, default=30, help="按截止时间唤醒的最长休眠（秒）")
+    parser.add_argument("--mode", choices=["poll", "deadline", "both"], default="both")
+    args = parser.parse_args()
+    # 只比较超期检测；提醒档位会让所有窗口内的简历在第一次检查时就进入提醒
+    settings.SLA_REMINDER_HOURS = []
+    for mode in (["poll", "deadline"] if args.mode == "both" else [args.mode]):
+        run(mode, args)
@@ -0,0 +1,150 @@
+"""
+工作流并发压测：多个客户端同时对同一批简历执行同一流转
+
+对运行中的服务，每份简历并发发起多次相同的单条流转请求，同时发起一次覆盖全部简历的批量请求，
+检查每份简历只成功一次（其余请求返回 409/400 或在批量结果中记为失败），且只写入一条对应日志。
+会推进简历状态（HR待分发 -> 二层 -> 三层 -> 待识别），请在测试环境运行：
+    python bench_workflow.py --base-url http://localhost:8000 --resumes 20 --parallel 8
+"""
+import argparse
+import json
+import statistics
+import sys
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+
+def request(base_url, path, token, body=None):
+    """发送请求，返回 (状态码, 响应JSON, 耗时秒)"""
+    data = json.dumps(body).encode() if body is not None else None
+    headers = {"Authorization": f"Bearer {token}", "Content-Type": "application/json"}
+    req = urllib.request.Request(f"{base_url}{path}", data=data, headers=headers)
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(req, timeout=60) as resp:
+            code, payload = resp.status, json.load(resp)
+    except urllib.error.HTTPError as e:
+        code, payload = e.code, None
+    return code, payload, time.perf_counter() - start
+
+
+def login(base_url, username, password):
+    data = urllib.parse.urlencode({"username": username, "password": password}).encode()
+    try:
+        with urllib.request.urlopen(f"{base_url}/api/auth/login", data=data) as resp:
+            return json.load(resp)["access_token"]
+    except urllib.error.HTTPError as e:
+        raise SystemExit(f"{username} 登录失败（{e.code}），请检查账号密码")
+
+
+def find_by_name(items, name, key="name"):
+    for item in items:
+        if item[key] == name:
+            return item["id"]
+    raise SystemExit(f"未找到 {name}，请先运行 init_db.py 初始化默认账号与部门")
+
+
+def summarize(name, samples):
+    ordered = sorted(samples)
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    print(
+        f"  延迟 n={len(ordered)} p50={statistics.median(ordered) * 1000:.1f}ms "
+        f"p95={p95 * 1000:.1f}ms max={ordered[-1] * 1000:.1f}ms"
+    )
+
+
+def race(base_url, token, action, resume_ids, body, parallel):
+    """对每份简历并发发起 parallel 次单条请求，外加一次批量请求；返回每份简历的成功次数"""
+    requests = [(f"/api/resumes/{resume_id}/{action}", body, resume_id) for resume_id in resume_ids]
+    requests = requests * parallel + [(f"/api/resumes/batch/{action}", {**body, "resume_ids": resume_ids}, None)]
+    barrier = threading.Barrier(len(requests))
+
+    def fire(entry):
+        path, payload, resume_id = entry
+        barrier.wait()
+        return resume_id, request(base_url, path, token, payload)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=len(requests)) as pool:
+        results = list(pool.map(fire, requests))
+    elapsed = time.perf_counter() - start
+
+    successes = {resume_id: 0 for resume_id in resume_ids}
+    codes, batch_failures = {}, {}
+    for resume_id, (code, payload, _) in results:
+        codes[code] = codes.get(code, 0) + 1
+        if resume_id is not None:
+            successes[resume_id] += int(code == 200)
+        elif code == 200:
+            for item in payload["items"]:
+                if item["success"]:
+                    successes[item["resume_id"]] += 1
+                else:
+                    batch_failures[item["error"]] = batch_failures.get(item["error"], 0) + 1
+    print(f"{action}: {len(requests)} 个请求，耗时 {elapsed:.2f}s，状态码 {codes}，批量失败原因 {batch_failures}")
+    summarize(action, [t for _, (_, _, t) in results])
+    return successes
+
+
+def check_logs(base_url, token, action_type, resume_ids):
+    """返回日志中该操作不是恰好一条的简历"""
+    wrong = {}
+    for resume_id in resume_ids:
+        _, logs, _ = request(base_url, f"/api/resumes/{resume_id}/logs", token)
+        count = sum(1 for log in logs if log["action"] == action_type)
+        if count != 1:
+            wrong[resume_id] = count
+    return wrong
+
+
+def run(args):
+    hr = login(args.base_url, "hr", args.hr_password)
+    l2 = login(args.base_url, "l2_manager_1", args.l2_password)
+    l3 = login(args.base_url, "l3_assistant_1", args.l3_password)
+
+    _, l2_departments, _ = request(args.base_url, "/api/departments/l2", hr)
+    _, l3_departments, _ = request(args.base_url, "/api/departments/l3", hr)
+    _, experts, _ = request(args.base_url, "/api/users/?role=EXPERT", hr)
+    l2_department_id = find_by_name(l2_departments, args.l2_department)
+    l3_department_id = find_by_name(l3_departments, args.l3_department)
+    expert_id = find_by_name(experts, "expert_1", key="username")
+
+    _, page, _ = request(args.base_url, f"/api/resumes/?status=POOL_HR&page_size={args.resumes}", hr)
+    resume_ids = [item["id"] for item in page["items"]]
+    if not resume_ids:
+        raise SystemExit("没有HR待分发的简历，请先上传")
+    print(f"简历 {len(resume_ids)} 份，每份并发 {args.parallel} 个单条请求 + 1 个批量请求")
+
+    stages = [
+        (hr, "distribute-l2", {"l2_department_id": l2_department_id}, "DISTRIBUTE_L2"),
+        (l2, "distribute-l3", {"l3_department_id": l3_department_id}, "DISTRIBUTE_L3"),
+        (l3, "assign-expert", {"expert_id": expert_id}, "ASSIGN_EXPERT"),
+    ]
+    failed = False
+    for token, action, body, action_type in stages:
+        successes = race(args.base_url, token, action, resume_ids, body, args.parallel)
+        wrong_successes = {k: v for k, v in successes.items() if v != 1}
+        wrong_logs = check_logs(args.base_url, hr, action_type, resume_ids)
+        if wrong_successes or wrong_logs:
+            failed = True
+            print(f"  失败：成功次数不为1 {wrong_successes}，日志条数不为1 {wrong_logs}")
+        else:
+            print("  通过：每份简历恰好成功一次、一条日志")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="工作流并发压测")
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--resumes", type=int, default=20, help="参与压测的HR待分发简历数（最多100）")
+    parser.add_argument("--parallel", type=int, default=8, help="每份简历并发的单条请求数")
+    parser.add_argument("--l2-department", default="业务一部")
+    parser.add_argument("--l3-department", default="业务一部-团队A")
+    parser.add_argument("--hr-password", default="hr123")
+    parser.add_argument("--l2-password", default="l2123")
+    parser.add_argument("--l3-password", default="l3123")
+    run(parser.parse_args())
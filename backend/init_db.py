@@ -2,9 +2,13 @@
 初始化数据库脚本 - 创建默认用户和部门
 """
 import asyncio
+import os
 import sys
 sys.path.insert(0, '.')
 
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import inspect
 from sqlalchemy.orm import Session
 from app.core.database import SessionLocal, engine, Base
 from app.models import User, Department
@@ -12,10 +16,24 @@ from app.models.enums import Role
 from app.core.security import get_password_hash
 
 
+def migrate_db():
+    """建表或升级表结构
+
+    全新数据库直接按模型建表并标记为最新迁移版本；
+    已有数据库通过 Alembic 执行增量迁移（索引、新表、新列）。
+    """
+    alembic_cfg = Config(os.path.join(os.path.dirname(os.path.abspath(__file__)), "alembic.ini"))
+    if not inspect(engine).has_table("resumes"):
+        Base.metadata.create_all(bind=engine)
+        command.stamp(alembic_cfg, "head")
+    else:
+        command.upgrade(alembic_cfg, "head")
+
+
 def init_db():
     """初始化数据库表和默认数据"""
-    # 创建表
-    Base.metadata.create_all(bind=engine)
+    # 创建/升级表
+    migrate_db()
     
     db = SessionLocal()
     try:
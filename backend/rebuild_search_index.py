@@ -0,0 +1,31 @@
+"""
+重建简历搜索文档（PostgreSQL 为 resume_texts.search_vector，其他数据库为倒排索引文件）
+
+用于首次上线回填，或调整切词规则后全量重建：
+    python rebuild_search_index.py
+"""
+import sys
+sys.path.insert(0, '.')
+
+from app.core.database import SessionLocal
+from app.services.search import search_backend
+
+BATCH_SIZE = 1000
+
+
+def rebuild_search_index():
+    """按批次重新生成所有简历的搜索文档"""
+    db = SessionLocal()
+    try:
+        total = search_backend.rebuild(db, BATCH_SIZE)
+        print(f"✅ 搜索文档重建完成，共 {total} 份简历")
+    except Exception as e:
+        print(f"❌ 重建失败: {e}")
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    rebuild_search_index()
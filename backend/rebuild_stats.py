@@ -0,0 +1,30 @@
+"""
+重建简历统计汇总表（resume_stats_daily）
+
+用于首次上线回填，或统计出现偏差时全量校正：
+    python rebuild_stats.py
+"""
+import sys
+sys.path.insert(0, '.')
+
+from app.core.database import SessionLocal
+from app.services.stats import ResumeStatsService
+
+
+def rebuild_stats():
+    """根据 resumes 表全量重建统计汇总"""
+    db = SessionLocal()
+    try:
+        buckets = ResumeStatsService(db).rebuild()
+        db.commit()
+        print(f"✅ 统计汇总重建完成，共 {buckets} 个统计桶")
+    except Exception as e:
+        print(f"❌ 重建失败: {e}")
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    rebuild_stats()
@@ -0,0 +1,134 @@
+"""
+测试公共夹具
+
+默认使用临时目录下新建的 SQLite 数据库（设置 TEST_DATABASE_URL 可改用 PostgreSQL 测试库），
+TestClient 不进入应用生命周期，不启动调度器、解析进程池等后台任务。
+"""
+import os
+import sys
+import tempfile
+import uuid
+from contextlib import contextmanager
+
+TEST_DIR = tempfile.mkdtemp(prefix="resume_tracker_test_")
+os.environ["DATABASE_URL"] = os.environ.get(
+    "TEST_DATABASE_URL", f"sqlite:///{os.path.join(TEST_DIR, 'test.db')}"
+)
+os.environ["UPLOAD_DIR"] = os.path.join(TEST_DIR, "uploads")
+os.environ["SEARCH_INDEX_PATH"] = os.path.join(TEST_DIR, "search.idx")
+os.environ["SCHEDULER_LOCK_FILE"] = os.path.join(TEST_DIR, "scheduler.lock")
+os.environ["TEXT_EXTRACTION_ENABLED"] = "false"
+os.environ["BCRYPT_ROUNDS"] = "4"
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+import init_db
+from app.core.database import SessionLocal, engine
+from app.core.security import create_access_token
+from app.main import app
+from app.models import Department, Resume, User
+from app.models.enums import ResumeStatus, Source
+from app.services.search import InvertedIndexSearchBackend
+from app.services.stats import ResumeStatsService
+
+
+@pytest.fixture(scope="session", autouse=True)
+def database():
+    """建表并写入默认账号与部门"""
+    init_db.init_db()
+
+
+@pytest.fixture
+def db():
+    session = SessionLocal()
+    yield session
+    session.close()
+
+
+@pytest.fixture(scope="session")
+def client():
+    return TestClient(app)
+
+
+@pytest.fixture
+def user(db):
+    """按用户名取默认账号"""
+    return lambda username: db.query(User).filter(User.username == username).one()
+
+
+@pytest.fixture
+def department(db):
+    """按名称取默认部门"""
+    return lambda name: db.query(Department).filter(Department.name == name).one()
+
+
+@pytest.fixture
+def auth_headers(user):
+    """默认账号的认证请求头（直接签发令牌，不经过密码哈希）"""
+    def headers(username: str) -> dict:
+        account = user(username)
+        token = create_access_token({"sub": account.id, "role": account.role.value})
+        return {"Authorization": f"Bearer {token}"}
+    return headers
+
+
+@pytest.fixture
+def make_resume(db, user):
+    """直接写入一份简历（默认 HR 待分发），同步统计汇总"""
+    def make(status: ResumeStatus = ResumeStatus.POOL_HR, **fields) -> Resume:
+        resume_id = str(uuid.uuid4())
+        resume = Resume(
+            id=resume_id,
+            candidate_name=fields.pop("candidate_name", f"测试{resume_id[:8]}"),
+            source=fields.pop("source", Source.A),
+            status=status,
+            resume_url=fields.pop("resume_url", f"/uploads/{resume_id}.pdf"),
+            uploader_id=user("hr").id,
+            **fields
+        )
+        db.add(resume)
+        db.flush()
+        ResumeStatsService(db).record_upload(resume)
+        db.commit()
+        return resume
+    return make
+
+
+@pytest.fixture
+def capture_statements():
+    """上下文管理器：记录期间执行的 SQL 语句 [(语句, 参数)]"""
+    @contextmanager
+    def capture():
+        statements = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append((statement, parameters))
+
+        event.listen(engine, "before_cursor_execute", record)
+        try:
+            yield statements
+        finally:
+            event.remove(engine, "before_cursor_execute", record)
+    return capture
+
+
+@pytest.fixture
+def inverted_index_backend(tmp_path):
+    """创建使用临时索引文件的倒排索引后端（与 SQLite/PostgreSQL 无关）；结束时注销会话事件"""
+    created = []
+
+    def create() -> InvertedIndexSearchBackend:
+        backend = InvertedIndexSearchBackend(str(tmp_path / "search.idx"), save_every=500)
+        created.append(backend)
+        return backend
+
+    yield create
+    for backend in created:
+        event.remove(Session, "after_commit", backend._after_commit)
+        event.remove(Session, "after_rollback", backend._after_rollback)
+        backend.shutdown()
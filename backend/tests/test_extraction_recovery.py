@@ -0,0 +1,41 @@
+"""
+文本提取补投：超时的 PROCESSING 重置为 PENDING，遗留的 PENDING 按上传顺序分批投递
+"""
+from datetime import datetime, timedelta, timezone
+
+from app.core.config import settings
+from app.models import ResumeText
+from app.models.enums import ExtractionStatus
+from app.services.extraction import TextExtractionQueue
+
+
+def test_recover_submits_bounded_batches(db, make_resume, monkeypatch):
+    monkeypatch.setattr(settings, "TEXT_EXTRACTION_ENABLED", True)
+    monkeypatch.setattr(settings, "TEXT_EXTRACTION_RECOVER_BATCH_SIZE", 2)
+    long_ago = datetime(2000, 1, 1, tzinfo=timezone.utc)
+
+    def text(status, created_at, updated_at=None):
+        resume = make_resume()
+        db.add(ResumeText(resume_id=resume.id, status=status, created_at=created_at, updated_at=updated_at))
+        db.commit()
+        return resume.id
+
+    stale = text(ExtractionStatus.PROCESSING, long_ago, updated_at=long_ago)
+    oldest = text(ExtractionStatus.PENDING, long_ago - timedelta(days=1))
+    older = text(ExtractionStatus.PENDING, long_ago + timedelta(days=1))
+    # 刚上传的记录仍在上传进程的队列中，不补投
+    text(ExtractionStatus.PENDING, datetime.now(timezone.utc))
+
+    queue = TextExtractionQueue()
+    submitted = []
+    monkeypatch.setattr(queue, "submit", lambda resume_ids: submitted.append(list(resume_ids)))
+
+    assert queue.recover() == 2
+    assert submitted == [[oldest, stale]]
+    db.expire_all()
+    assert db.get(ResumeText, stale).status == ExtractionStatus.PENDING
+
+    # 本进程队列已满时不再投递
+    queue._queued = 2
+    assert queue.recover() == 0
+    assert older not in sum(submitted, [])
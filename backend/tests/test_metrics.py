@@ -0,0 +1,18 @@
+"""
+运行指标：仅管理员或持有 METRICS_TOKEN 的监控系统可访问
+"""
+from app.core.config import settings
+
+
+def test_metrics_requires_admin(client, auth_headers):
+    assert client.get("/metrics").status_code == 401
+    assert client.get("/metrics", headers=auth_headers("hr")).status_code == 403
+    response = client.get("/metrics", headers=auth_headers("admin"))
+    assert response.status_code == 200
+    assert "scheduler" in response.json()
+
+
+def test_metrics_token(client, monkeypatch):
+    monkeypatch.setattr(settings, "METRICS_TOKEN", "scrape-secret")
+    assert client.get("/metrics", headers={"Authorization": "Bearer scrape-secret"}).status_code == 200
+    assert client.get("/metrics", headers={"Authorization": "Bearer wrong"}).status_code == 401
@@ -0,0 +1,99 @@
+"""
+内容寻址文件的引用计数：失败上传的清理不删除已被引用的文件，存量简历可回填
+"""
+import hashlib
+import os
+import uuid
+
+import pytest
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.storage import StoredFile, blob_name
+from app.models import Resume, ResumeBlob
+from app.services.blobs import BlobMissing, ResumeBlobService
+
+
+def _stored(content: bytes, created: bool = True) -> StoredFile:
+    sha256 = hashlib.sha256(content).hexdigest()
+    name = blob_name(sha256, ".pdf")
+    path = os.path.join(settings.UPLOAD_DIR, name)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(content)
+    return StoredFile(name, path, len(content), sha256, created)
+
+
+def _content() -> bytes:
+    return f"%PDF-1.4 {uuid.uuid4()}".encode()
+
+
+def test_discard_keeps_file_referenced_by_concurrent_upload(db):
+    content = _content()
+    mine = _stored(content, created=True)
+    # 另一个上传看到文件已存在，先提交了引用
+    other = SessionLocal()
+    try:
+        ResumeBlobService(other).add_references([_stored(content, created=False)])
+        other.commit()
+    finally:
+        other.close()
+
+    ResumeBlobService(db).discard([mine])
+
+    assert os.path.isfile(mine.path)
+    assert db.get(ResumeBlob, mine.sha256).ref_count == 1
+
+
+def test_discard_removes_unreferenced_file(db):
+    stored = _stored(_content())
+    ResumeBlobService(db).discard([stored])
+
+    assert not os.path.exists(stored.path)
+    assert db.get(ResumeBlob, stored.sha256) is None
+
+
+def test_reference_to_discarded_file_is_rejected(db):
+    content = _content()
+    stored = _stored(content)
+    # 同一内容的另一次上传看到了文件，但在引用之前文件被清理
+    seen = StoredFile(stored.name, stored.path, stored.size, stored.sha256, created=False)
+    ResumeBlobService(db).discard([stored])
+
+    with pytest.raises(BlobMissing):
+        ResumeBlobService(db).add_references([seen])
+    db.rollback()
+    assert db.get(ResumeBlob, stored.sha256) is None
+
+
+def test_upload_counts_references(client, auth_headers, db):
+    content = _content()
+    for _ in range(2):
+        response = client.post(
+            "/api/resumes/upload",
+            headers=auth_headers("hr"),
+            data={"candidate_name": "张三", "source": "A"},
+            files={"file": ("r.pdf", content, "application/pdf")},
+        )
+        assert response.status_code == 200, response.text
+    assert response.json()["duplicates"]
+    assert db.get(ResumeBlob, hashlib.sha256(content).hexdigest()).ref_count == 2
+
+
+def test_backfill_legacy_uploads(db, make_resume):
+    content = _content()
+    name = f"{uuid.uuid4()}.pdf"
+    with open(os.path.join(settings.UPLOAD_DIR, name), "wb") as f:
+        f.write(content)
+    legacy = [make_resume(resume_url=f"/uploads/{name}") for _ in range(2)]
+
+    blobs = ResumeBlobService(db)
+    filled, _ = blobs.backfill_hashes()
+    blobs.rebuild()
+    db.commit()
+
+    sha256 = hashlib.sha256(content).hexdigest()
+    assert filled >= 2
+    assert {db.get(Resume, resume.id).file_hash for resume in legacy} == {sha256}
+    blob = db.get(ResumeBlob, sha256)
+    assert (blob.ref_count, blob.path, blob.size) == (2, name, len(content))
@@ -0,0 +1,30 @@
+"""
+简历文件下载：按角色/部门校验可见范围，且不开放无鉴权的静态访问
+"""
+import os
+
+from app.core.config import settings
+from app.models.enums import ResumeStatus
+
+
+def _resume_with_file(make_resume, **fields):
+    resume = make_resume(ResumeStatus.POOL_L2, **fields)
+    with open(os.path.join(settings.UPLOAD_DIR, f"{resume.id}.pdf"), "wb") as f:
+        f.write(b"%PDF-1.4 test")
+    return resume
+
+
+def test_file_download_follows_visibility(client, auth_headers, make_resume, department):
+    resume = _resume_with_file(make_resume, l2_department_id=department("业务一部").id)
+
+    assert client.get(f"/api/resumes/{resume.id}/file", headers=auth_headers("hr")).status_code == 200
+    assert client.get(f"/api/resumes/{resume.id}/file", headers=auth_headers("l2_manager_1")).status_code == 200
+    # 其他部门的二层经理、未被指派的专家看不到
+    assert client.get(f"/api/resumes/{resume.id}/file", headers=auth_headers("l2_manager_2")).status_code == 404
+    assert client.get(f"/api/resumes/{resume.id}/file", headers=auth_headers("expert_1")).status_code == 404
+    assert client.get(f"/api/resumes/{resume.id}/file").status_code == 401
+
+
+def test_uploads_not_served_statically(client, make_resume, department):
+    resume = _resume_with_file(make_resume, l2_department_id=department("业务一部").id)
+    assert client.get(resume.resume_url).status_code == 404
@@ -0,0 +1,96 @@
+"""
+简历查询索引回归：列表、待办、SLA 扫描的实际语句能用上对应的组合索引/部分索引
+
+EXPLAIN 依赖 PostgreSQL 的部分索引匹配，只在 TEST_DATABASE_URL 指向 PostgreSQL 时运行。
+测试数据量很小，关闭顺序扫描后检查执行计划，只验证索引与查询条件匹配（不验证代价选择）。
+"""
+import importlib.util
+import os
+import re
+
+import pytest
+
+from app.core.database import engine
+from app.models.enums import ResumeStatus
+from app.models.resume import SLA_PENDING_CONDITION
+from app.services.sla import SLAService
+
+postgres_only = pytest.mark.skipif(
+    engine.dialect.name != "postgresql", reason="EXPLAIN 检查仅在 PostgreSQL 上运行"
+)
+
+
+def _plans(statements):
+    """对捕获的 resumes 查询逐条 EXPLAIN（不执行），返回执行计划文本"""
+    plans = []
+    with engine.connect() as conn:
+        conn.exec_driver_sql("SET enable_seqscan = off")
+        for statement, parameters in statements:
+            if "FROM resumes" not in statement and not statement.startswith("UPDATE resumes"):
+                continue
+            rows = conn.exec_driver_sql(f"EXPLAIN {statement}", parameters).all()
+            plans.append("\n".join(row[0] for row in rows))
+        conn.rollback()
+    return plans
+
+
+def _uses(plans, index_prefix):
+    return any(index_prefix in plan for plan in plans)
+
+
+@pytest.fixture
+def get_plans(client, auth_headers, capture_statements):
+    def get(username, path):
+        headers = auth_headers(username)
+        client.get("/api/resumes/?page_size=1", headers=headers)  # 预热当前用户缓存
+        with capture_statements() as statements:
+            assert client.get(path, headers=headers).status_code == 200
+        return _plans(statements)
+    return get
+
+
+@postgres_only
+@pytest.mark.parametrize("username, path, index_prefix", [
+    ("hr", "/api/resumes/?with_total=false", "ix_resumes_created_at_id"),
+    ("hr", "/api/resumes/?status=POOL_HR&with_total=false", "ix_resumes_status_created_at"),
+    ("l2_manager_1", "/api/resumes/?with_total=false", "ix_resumes_l2_dept"),
+    ("l2_manager_1", "/api/resumes/?is_overdue=true&with_total=false", "ix_resumes_l2_dept_overdue"),
+    ("l3_assistant_1", "/api/resumes/?status=POOL_L3&with_total=false", "ix_resumes_l3_dept"),
+    ("expert_1", "/api/resumes/my-tasks", "ix_resumes_expert_status_created_at"),
+    ("l2_manager_1", "/api/resumes/my-tasks", "ix_resumes_l2_dept_overdue"),
+])
+def test_list_queries_use_indexes(get_plans, username, path, index_prefix):
+    plans = get_plans(username, path)
+    assert _uses(plans, index_prefix), "\n\n".join(plans)
+
+
+@postgres_only
+def test_sla_queries_use_partial_index(db, make_resume, capture_statements):
+    make_resume(ResumeStatus.WAIT_IDENTIFY)
+    service = SLAService(db)
+    with capture_statements() as statements:
+        service.check_overdue_resumes()
+        service.next_due_time()
+    db.rollback()
+
+    plans = _plans(statements)
+    assert plans
+    assert all("ix_resumes_sla_pending" in plan for plan in plans), "\n\n".join(plans)
+
+
+def test_sla_pending_condition_in_sync():
+    """部分索引条件与最近一次建索引的迁移、SLAService.SLA_STATUSES 一致"""
+    versions = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "alembic", "versions")
+    conditions = []
+    for name in sorted(os.listdir(versions)):
+        if not name.endswith(".py"):
+            continue
+        spec = importlib.util.spec_from_file_location(f"migration_{name[:-3]}", os.path.join(versions, name))
+        migration = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(migration)
+        if hasattr(migration, "SLA_PENDING_CONDITION"):
+            conditions.append(migration.SLA_PENDING_CONDITION)
+
+    assert conditions[-1] == SLA_PENDING_CONDITION
+    statuses = re.findall(r"'(\w+)'", SLA_PENDING_CONDITION)
+    assert statuses == [status.value for status in SLAService.SLA_STATUSES]
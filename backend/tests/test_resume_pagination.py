@@ -0,0 +1,110 @@
+"""
+简历列表分页：游标模式逐页遍历不重不漏（含相同 created_at），游标校验、总数统计与页码模式
+"""
+import base64
+import json
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models import Resume, User
+from app.models.enums import ResumeStatus, Source
+
+# 本文件的简历使用独有的状态+来源组合，列表筛选后只包含这些简历
+FILTER = "status=POOL_L3&source=F"
+COUNT = 23
+
+
+@pytest.fixture(scope="module")
+def resume_ids(database):
+    """COUNT 份简历，每 5 份共用同一个 created_at；返回按 (created_at, id) 倒序排列的ID"""
+    db = SessionLocal()
+    try:
+        uploader = db.query(User).filter(User.username == "hr").one()
+        base = datetime(2001, 1, 1)
+        rows = []
+        for i in range(COUNT):
+            resume = Resume(
+                id=str(uuid.uuid4()),
+                candidate_name=f"分页{i}",
+                source=Source.F,
+                status=ResumeStatus.POOL_L3,
+                resume_url=f"/uploads/pagination-{i}.pdf",
+                uploader_id=uploader.id,
+                created_at=base + timedelta(seconds=i // 5),
+            )
+            db.add(resume)
+            rows.append((resume.created_at, resume.id))
+        db.commit()
+    finally:
+        db.close()
+    return [resume_id for _, resume_id in sorted(rows, reverse=True)]
+
+
+@pytest.fixture
+def get(client, auth_headers):
+    headers = auth_headers("hr")
+
+    def request(query: str, expected_status: int = 200) -> dict:
+        response = client.get(f"/api/resumes/?{FILTER}&{query}", headers=headers)
+        assert response.status_code == expected_status, response.text
+        return response.json()
+    return request
+
+
+def _cursor(payload) -> str:
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip("=")
+
+
+def test_cursor_walk_returns_every_row_once(get, resume_ids):
+    seen = []
+    page = get("page_size=4&with_total=false")
+    first_cursor = page["next_cursor"]
+    while True:
+        seen += [item["id"] for item in page["items"]]
+        if page["next_cursor"] is None:
+            break
+        page = get(f"page_size=4&cursor={page['next_cursor']}")
+    assert seen == resume_ids
+    assert first_cursor is not None
+
+
+@pytest.mark.parametrize("cursor", [
+    "not-a-cursor!",
+    _cursor(["2001-01-01T00:00:00"]),
+    _cursor([1, 2]),
+    _cursor({"created_at": "2001-01-01T00:00:00"}),
+    _cursor(["yesterday", "id"]),
+])
+def test_invalid_cursor_returns_400(get, resume_ids, cursor):
+    get(f"cursor={cursor}", expected_status=400)
+
+
+def test_cursor_mode_totals(get, resume_ids, monkeypatch):
+    cursor = get("page_size=4")["next_cursor"]
+
+    # 游标模式默认不统计总数
+    page = get(f"page_size=4&cursor={cursor}")
+    assert page["total"] is None and page["total_is_exact"] is True
+
+    page = get(f"page_size=4&cursor={cursor}&with_total=true")
+    assert (page["total"], page["total_is_exact"]) == (COUNT, True)
+
+    # 超过上限时只数到上限，并标记为下限
+    monkeypatch.setattr(settings, "RESUME_COUNT_CAP", 10)
+    page = get(f"page_size=4&cursor={cursor}&with_total=true")
+    assert (page["total"], page["total_is_exact"]) == (10, False)
+
+
+def test_page_mode(get, resume_ids):
+    pages = [get(f"page={page}&page_size=10") for page in (1, 2, 3)]
+    assert all(page["total"] == COUNT and page["total_is_exact"] for page in pages)
+    assert [page["page"] for page in pages] == [1, 2, 3]
+    assert sum(([item["id"] for item in page["items"]] for page in pages), []) == resume_ids
+    assert pages[1]["next_cursor"] is not None and pages[2]["next_cursor"] is None
+
+    # 页码模式可关闭总数统计
+    assert get("page=1&page_size=10&with_total=false")["total"] is None
@@ -0,0 +1,66 @@
+"""
+简历列表/详情的 SQL 语句数：部门、上传人、处理人、专家随主查询加载，不随行数增加
+"""
+import pytest
+
+from app.models.enums import ResumeStatus, Source
+
+# 本文件的简历使用独有的来源，列表按状态+来源筛选后只包含这些简历
+LIST_FILTER = "status=WAIT_IDENTIFY&source=G&with_total=false"
+RELATION_NAMES = {
+    "l2_department_name": "业务一部",
+    "l3_department_name": "业务一部-团队A",
+    "uploader_name": "hr",
+    "current_handler_name": "l3_assistant_1",
+    "expert_name": "expert_1",
+}
+
+
+@pytest.fixture
+def resumes(make_resume, user, department):
+    """一批关联字段全部填写的简历"""
+    return [
+        make_resume(
+            ResumeStatus.WAIT_IDENTIFY,
+            source=Source.G,
+            l2_department_id=department("业务一部").id,
+            l3_department_id=department("业务一部-团队A").id,
+            expert_id=user("expert_1").id,
+            current_handler_id=user("l3_assistant_1").id,
+        )
+        for _ in range(30)
+    ]
+
+
+@pytest.fixture
+def get(client, auth_headers, capture_statements):
+    """以 HR 身份请求，返回 (响应JSON, 语句数)；先预热当前用户缓存"""
+    headers = auth_headers("hr")
+    client.get("/api/resumes/?page_size=1", headers=headers)
+
+    def request(path):
+        with capture_statements() as statements:
+            response = client.get(path, headers=headers)
+        assert response.status_code == 200, response.text
+        return response.json(), len(statements)
+    return request
+
+
+def relation_names(item: dict) -> dict:
+    return {key: item[key] for key in RELATION_NAMES}
+
+
+def test_list_statement_count_is_independent_of_page_size(get, resumes):
+    counts = {}
+    for page_size in (1, 10, 30):
+        page, counts[page_size] = get(f"/api/resumes/?{LIST_FILTER}&page_size={page_size}")
+        assert len(page["items"]) == page_size
+        # 关联名称随同一语句加载（去掉预加载会多出按外键逐个查询的语句）
+        assert all(relation_names(item) == RELATION_NAMES for item in page["items"])
+    assert set(counts.values()) == {1}, counts
+
+
+def test_detail_statement_count(get, resumes):
+    detail, count = get(f"/api/resumes/{resumes[0].id}")
+    assert relation_names(detail) == RELATION_NAMES
+    assert count == 1
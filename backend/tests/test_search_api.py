@@ -0,0 +1,95 @@
+"""
+简历搜索接口：中文二元组、英文前缀匹配，结果按角色可见范围过滤
+
+进程内倒排索引后端总是运行；tsvector 后端只在 TEST_DATABASE_URL 指向 PostgreSQL 时运行。
+"""
+import uuid
+
+import pytest
+
+from app.core.config import settings
+from app.core.database import engine
+from app.services import search
+
+ALL_ACCOUNTS = [
+    "admin", "hr", "l2_manager_1", "l2_manager_2", "l3_assistant_1", "l3_assistant_2", "expert_1", "expert_2",
+]
+HR_ACCOUNTS = ["admin", "hr"]
+
+
+@pytest.fixture(autouse=True, params=["inverted_index", "postgres_tsvector"])
+def index(request, inverted_index_backend, monkeypatch):
+    """接口与上传使用同一个搜索后端（倒排索引为每个测试独立创建）"""
+    if request.param == "postgres_tsvector":
+        if engine.dialect.name != "postgresql":
+            pytest.skip("tsvector 后端仅在 PostgreSQL 上运行")
+        backend = search.PostgresSearchBackend()
+    else:
+        backend = inverted_index_backend()
+        backend.start()
+    monkeypatch.setattr(search, "search_backend", backend)
+    return backend
+
+
+@pytest.fixture
+def upload(client, auth_headers):
+    def upload(candidate_name: str) -> str:
+        response = client.post(
+            "/api/resumes/upload",
+            headers=auth_headers("hr"),
+            data={"candidate_name": candidate_name, "source": "A"},
+            files={"file": ("r.pdf", f"%PDF-1.4 {uuid.uuid4()}".encode(), "application/pdf")},
+        )
+        assert response.status_code == 200, response.text
+        return response.json()["id"]
+    return upload
+
+
+@pytest.fixture
+def hits(client, auth_headers):
+    def hits(username: str, q: str) -> list:
+        response = client.get("/api/resumes/search", params={"q": q, "limit": 100}, headers=auth_headers(username))
+        assert response.status_code == 200, response.text
+        return [item["id"] for item in response.json()["items"]]
+    return hits
+
+
+def test_chinese_bigram_match(upload, hits):
+    resume_id = upload("张三丰")
+    assert resume_id in hits("hr", "张三")
+    assert resume_id in hits("hr", "三丰")
+    assert resume_id not in hits("hr", "张无忌")
+    # 第一个二元组（张三）命中，完整条件（丰收）不满足
+    assert resume_id not in hits("hr", "张三丰收")
+
+
+def test_english_prefix_match(upload, hits):
+    resume_id = upload("Alice Smith")
+    assert resume_id in hits("hr", "ali")
+    assert resume_id in hits("hr", "ALICE smi")
+    assert resume_id not in hits("hr", "bob")
+
+
+def test_results_follow_role_visibility(upload, hits, client, auth_headers, department):
+    resume_id = upload("欧阳锋")
+    # HR 待分发：只有 HR/管理员可见
+    for username in ALL_ACCOUNTS:
+        assert (resume_id in hits(username, "欧阳")) == (username in HR_ACCOUNTS), username
+
+    # 分发给业务一部后，该部门二层经理也可见
+    response = client.post(
+        f"/api/resumes/{resume_id}/distribute-l2",
+        json={"l2_department_id": department("业务一部").id},
+        headers=auth_headers("hr"),
+    )
+    assert response.status_code == 200, response.text
+    for username in ALL_ACCOUNTS:
+        assert (resume_id in hits(username, "欧阳")) == (username in HR_ACCOUNTS + ["l2_manager_1"]), username
+
+
+@pytest.mark.parametrize("index", ["postgres_tsvector"], indirect=True)
+def test_postgres_ranks_most_recent_matches(upload, hits, monkeypatch):
+    monkeypatch.setattr(settings, "SEARCH_MAX_CANDIDATES", 2)
+    resume_ids = [upload("令狐冲") for _ in range(3)]
+    # 只有最近的 2 个匹配参与计分；得分相同按上传时间倒序
+    assert hits("hr", "令狐") == resume_ids[:0:-1]
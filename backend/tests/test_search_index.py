@@ -0,0 +1,111 @@
+"""
+进程内倒排索引：事务提交后增量更新、回滚丢弃，启动时从磁盘索引补齐，
+后台合并写盘期间的变更不丢失，索引文件只允许一个进程使用
+"""
+import os
+
+import pytest
+
+from app.models import ResumeText
+from app.models.enums import ExtractionStatus
+from app.services.search_index import InvertedIndex
+
+
+def test_changes_during_save_are_kept(tmp_path, monkeypatch):
+    index = InvertedIndex()
+    index.add("kept", {"python": 10})
+    index.add("updated", {"python": 10})
+    index.add("removed", {"python": 10})
+
+    write = InvertedIndex._write
+
+    def write_while_changing(snapshot, path, built_at):
+        # 写盘期间其他请求继续提交
+        index.add("added", {"python": 20})
+        index.add("updated", {"java": 5})
+        index.remove("removed")
+        write(snapshot, path, built_at)
+
+    monkeypatch.setattr(InvertedIndex, "_write", write_while_changing)
+    index.save(str(tmp_path / "search.idx"), 0.0)
+
+    assert index.search(["python"]) == [("added", 20), ("kept", 10)]
+    assert index.search(["java"]) == [("updated", 5)]
+    # 写盘后的变更仍在增量段，下次保存再合并
+    assert index.delta_documents == 2
+    monkeypatch.undo()
+    index.save(str(tmp_path / "search.idx"), 0.0)
+    assert InvertedIndex.load(str(tmp_path / "search.idx")).search(["python"]) == [("added", 20), ("kept", 10)]
+
+
+def test_index_file_is_exclusive(tmp_path, inverted_index_backend):
+    first = inverted_index_backend()
+    first._claim()
+    with pytest.raises(RuntimeError):
+        inverted_index_backend()._claim()
+    first.shutdown()
+    # 前一个进程退出后可以接管
+    inverted_index_backend()._claim()
+    assert os.path.exists(str(tmp_path / "search.idx.lock"))
+
+
+def _with_text(db, make_resume, content: str) -> str:
+    resume = make_resume()
+    db.add(ResumeText(resume_id=resume.id, status=ExtractionStatus.DONE, content=content))
+    db.commit()
+    return resume.id
+
+
+def _hits(backend, db, query: str):
+    return [resume_id for resume_id, _ in backend.search(db, query, None, 100)]
+
+
+def test_refresh_applies_on_commit_and_drops_on_rollback(db, make_resume, inverted_index_backend):
+    search = inverted_index_backend()
+    search.start()
+    resume_id = _with_text(db, make_resume, "量子退火")
+    assert resume_id not in _hits(search, db, "量子退火")
+
+    # 回滚：暂存的词条丢弃，索引不变
+    db.query(ResumeText).filter(ResumeText.resume_id == resume_id).update({ResumeText.content: "拓扑绝缘体"})
+    search.refresh(db, [resume_id])
+    assert search.pending_key in db.info
+    db.rollback()
+    assert search.pending_key not in db.info
+    assert resume_id not in _hits(search, db, "拓扑绝缘体")
+
+    # 提交：提交后才写入索引
+    search.refresh(db, [resume_id])
+    assert resume_id not in _hits(search, db, "量子退火")
+    db.commit()
+    assert resume_id in _hits(search, db, "量子退火")
+
+    # 更新后旧词条不再命中
+    db.query(ResumeText).filter(ResumeText.resume_id == resume_id).update({ResumeText.content: "拓扑绝缘体"})
+    search.refresh(db, [resume_id])
+    db.commit()
+    assert resume_id in _hits(search, db, "拓扑绝缘体")
+    assert resume_id not in _hits(search, db, "量子退火")
+
+
+def test_start_catches_up_from_saved_index(db, make_resume, inverted_index_backend, monkeypatch):
+    first = inverted_index_backend()
+    first.start()
+    changed = _with_text(db, make_resume, "超导磁体")
+    first.refresh(db, [changed])
+    db.commit()
+    first.shutdown()
+    assert first.saves >= 1
+
+    # 进程停止期间的变更：新增一份、修改一份（没有进程内钩子）
+    added = _with_text(db, make_resume, "冷原子钟")
+    db.query(ResumeText).filter(ResumeText.resume_id == changed).update({ResumeText.content: "引力波探测"})
+    db.commit()
+
+    second = inverted_index_backend()
+    # 必须从磁盘索引加载并补齐，而不是全量重建
+    monkeypatch.setattr(second, "_index_all", lambda *args, **kwargs: pytest.fail("不应全量重建"))
+    second.start()
+    assert added in _hits(second, db, "冷原子钟")
+    assert changed in _hits(second, db, "引力波探测")
+    assert changed not in _hits(second, db, "超导磁体")
@@ -0,0 +1,29 @@
+"""
+创建用户：密码哈希线程池排满时返回 503（与登录一致），不返回 500
+"""
+from app.api import users
+from app.core.security import PasswordHasherBusy
+
+
+def test_create_user_when_hasher_busy(client, auth_headers, monkeypatch):
+    def busy(password):
+        raise PasswordHasherBusy()
+
+    monkeypatch.setattr(users, "get_password_hash", busy)
+    response = client.post(
+        "/api/users/",
+        headers=auth_headers("admin"),
+        json={"username": "busy_user", "email": "busy@example.com", "password": "secret123", "role": "HR"},
+    )
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+
+
+def test_create_user(client, auth_headers):
+    response = client.post(
+        "/api/users/",
+        headers=auth_headers("admin"),
+        json={"username": "new_hr", "email": "new_hr@example.com", "password": "secret123", "role": "HR"},
+    )
+    assert response.status_code == 200, response.text
+    assert response.json()["username"] == "new_hr"
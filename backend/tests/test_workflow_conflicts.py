@@ -0,0 +1,133 @@
+"""
+工作流乐观锁：读取了旧版本的流转提交时冲突且整体回滚
+
+- 两个会话读取同一份简历后先后流转，后提交的一方冲突；
+- 多个线程通过接口并发执行同一流转，每份简历只有一个请求成功，其余返回 409。
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.core.database import SessionLocal
+from app.models import Resume, User, WorkflowLog
+from app.models.enums import ActionType, ResumeStatus
+from app.services.workflow import WorkflowConflict, WorkflowService
+
+CASES = [
+    (
+        ResumeStatus.POOL_L3,
+        ActionType.ASSIGN_EXPERT,
+        "l3_assistant_1",
+        lambda workflow, resume, operator, expert: workflow.assign_expert(resume, operator, expert.id),
+    ),
+    (
+        ResumeStatus.WAIT_IDENTIFY,
+        ActionType.IDENTIFY_YES,
+        "expert_1",
+        lambda workflow, resume, operator, expert: workflow.identify(resume, operator, True),
+    ),
+    (
+        ResumeStatus.WAIT_CONTACT_INFO,
+        ActionType.FILL_CONTACT,
+        "l2_manager_1",
+        lambda workflow, resume, operator, expert: workflow.fill_contact_info(resume, operator, "a@example.com"),
+    ),
+    (
+        ResumeStatus.WAIT_CONNECTION,
+        ActionType.CONNECT_START,
+        "expert_1",
+        lambda workflow, resume, operator, expert: workflow.start_connection(resume, operator),
+    ),
+]
+
+
+@pytest.mark.parametrize("status, action, operator_name, transition", CASES, ids=[c[1].value for c in CASES])
+def test_second_stale_session_conflicts(db, make_resume, user, department, status, action, operator_name, transition):
+    expert = user("expert_1")
+    resume = make_resume(
+        status,
+        expert_id=expert.id,
+        l2_department_id=department("业务一部").id,
+        l3_department_id=department("业务一部-团队A").id,
+    )
+
+    first, second = SessionLocal(), SessionLocal()
+    try:
+        # 两个会话都读到了同一版本
+        resume_a = first.get(Resume, resume.id)
+        resume_b = second.get(Resume, resume.id)
+        operator_a = first.get(User, user(operator_name).id)
+        operator_b = second.get(User, user(operator_name).id)
+
+        transition(WorkflowService(first), resume_a, operator_a, first.get(User, expert.id))
+        with pytest.raises(WorkflowConflict):
+            transition(WorkflowService(second), resume_b, operator_b, second.get(User, expert.id))
+    finally:
+        first.close()
+        second.close()
+
+    db.expire_all()
+    logs = db.query(WorkflowLog).filter(WorkflowLog.resume_id == resume.id, WorkflowLog.action == action).count()
+    assert logs == 1
+    assert db.get(Resume, resume.id).version == 2
+
+
+def test_conflict_returns_session_to_usable_state(db, make_resume, user):
+    resume = make_resume(ResumeStatus.WAIT_CONNECTION, expert_id=user("expert_1").id)
+    stale = SessionLocal()
+    try:
+        stale_resume = stale.get(Resume, resume.id)
+        operator = stale.get(User, user("expert_1").id)
+        # 其他事务（如超期扫描）修改了简历
+        db.query(Resume).filter(Resume.id == resume.id).update({Resume.version: Resume.version + 1})
+        db.commit()
+
+        with pytest.raises(WorkflowConflict):
+            WorkflowService(stale).start_connection(stale_resume, operator)
+        # 回滚后重新读取即可继续流转
+        fresh = stale.get(Resume, resume.id)
+        WorkflowService(stale).start_connection(fresh, operator)
+        assert fresh.status == ResumeStatus.WAIT_FEEDBACK
+    finally:
+        stale.close()
+
+
+PARALLEL_RESUMES = 4
+PARALLEL_REQUESTS = 6
+
+
+def test_parallel_api_transitions(client, auth_headers, make_resume, department, db, monkeypatch):
+    resume_ids = [make_resume().id for _ in range(PARALLEL_RESUMES)]
+    body = {"l2_department_id": department("业务一部").id}
+    headers = auth_headers("hr")
+    requests = resume_ids * PARALLEL_REQUESTS
+
+    # 所有请求都读到旧版本、通过状态校验后才开始写入，使并发写入必然经过版本号检查
+    # （否则后到的请求可能读到新状态而返回 400）
+    barrier = threading.Barrier(len(requests), timeout=30)
+    commit = WorkflowService._commit
+
+    def commit_together(self):
+        barrier.wait()
+        commit(self)
+
+    monkeypatch.setattr(WorkflowService, "_commit", commit_together)
+
+    def fire(resume_id):
+        response = client.post(f"/api/resumes/{resume_id}/distribute-l2", json=body, headers=headers)
+        return resume_id, response.status_code
+
+    with ThreadPoolExecutor(max_workers=len(requests)) as pool:
+        results = list(pool.map(fire, requests))
+
+    db.expire_all()
+    for resume_id in resume_ids:
+        codes = sorted(code for rid, code in results if rid == resume_id)
+        assert codes == [200] + [409] * (PARALLEL_REQUESTS - 1), codes
+        logs = db.query(WorkflowLog).filter(
+            WorkflowLog.resume_id == resume_id, WorkflowLog.action == ActionType.DISTRIBUTE_L2
+        ).count()
+        assert logs == 1
+        resume = db.get(Resume, resume_id)
+        assert (resume.status, resume.version) == (ResumeStatus.POOL_L2, 2)